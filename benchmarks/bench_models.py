@@ -0,0 +1,259 @@
+# Accuracy/cost trade-off of embedding models and backends for JD similarity.
+# Resumes in hypothesis/Resume.csv are ranked against one job description per
+# `Category`; a resume is relevant to the query of its own category.
+#
+#   python -m benchmarks.bench_models
+#   python -m benchmarks.bench_models --candidates "BAAI/bge-large-en-v1.5@torch,BAAI/bge-small-en-v1.5@onnx" --k 10
+#
+# Candidates are MODEL@BACKEND (backends: internal.cv_scanner.EMBEDDING_BACKENDS,
+# or onnx:<file> for a quantized ONNX export; onnx and openvino need the
+# optimum[onnxruntime] / optimum[openvino] extras). Each runs in a fresh process so
+# load time and peak RSS are its own. Reported per candidate: NDCG@k against
+# the labels, Spearman correlation and top-k overlap with the reference
+# (first) candidate's ranking, batched docs/s, single-CV p50/p95 latency,
+# load time and memory. Results go to benchmarks/results/models_<ts>.json.
+import argparse
+import json
+import math
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from benchmarks.bench_scaling import RESULTS_DIR, _git_commit, _peak_rss_mb
+
+CORPUS_PATH = Path("hypothesis/Resume.csv")
+DEFAULT_CANDIDATES = ",".join([
+    "BAAI/bge-large-en-v1.5@torch",
+    "BAAI/bge-base-en-v1.5@torch",
+    "BAAI/bge-small-en-v1.5@torch",
+    "BAAI/bge-small-en-v1.5@torch-int8",
+])
+
+
+def parse_candidate(spec: str) -> Tuple[str, str]:
+    model_id, _, backend = spec.strip().partition("@")
+    return model_id, backend or "torch"
+
+
+def load_labelled_corpus(path: Path, limit: Optional[int] = None) -> Tuple[List[str], List[str]]:
+    """(normalized resume texts, categories), normalized as CVScanner.normalize_cv_text does."""
+    df = pd.read_csv(path, usecols=["Resume_str", "Category"]).dropna()
+    if limit is not None:
+        # keep every category represented when sampling
+        df = df.groupby("Category", group_keys=False).head(max(1, limit // df["Category"].nunique()))
+    texts = [re.sub(r"\s+", " ", t).strip().lower() for t in df["Resume_str"].astype(str)]
+    return texts, df["Category"].astype(str).tolist()
+
+
+def build_queries(categories: List[str], jd_dir: Optional[Path] = None) -> Dict[str, str]:
+    """One JD per category: <jd_dir>/<Category>.txt if given, else title plus library skills."""
+    from utils.skill_utils import load_skills, normalize_text
+
+    skills_map = load_skills()
+    queries = {}
+    for category in sorted(set(categories)):
+        jd_file = jd_dir / f"{category}.txt" if jd_dir else None
+        if jd_file is not None and jd_file.exists():
+            queries[category] = jd_file.read_text(encoding="utf-8")
+            continue
+        title = category.replace("-", " ").replace("_", " ").title()
+        skills = skills_map.get(normalize_text(title), [])
+        queries[category] = f"Job title: {title}\nRequired skills: {', '.join(skills)}" if skills else f"Job title: {title}"
+    return {c: re.sub(r"\s+", " ", q).strip().lower() for c, q in queries.items()}
+
+
+def run_candidate(spec: str, corpus: Path, limit: Optional[int], jd_dir: Optional[Path], batch_size: int, latency_samples: int) -> Dict:
+    """Embed corpus and queries with one candidate in this process; similarities plus cost figures."""
+    import torch
+    from benchmarks.bench_pipeline import percentile
+    from internal.cv_scanner import load_embedding_model
+
+    model_id, backend = parse_candidate(spec)
+    texts, categories = load_labelled_corpus(corpus, limit)
+    queries = build_queries(categories, jd_dir)
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    rss_before_mb = _peak_rss_mb()
+    t0 = time.perf_counter()
+    model = load_embedding_model(model_id, device, backend)
+    load_s = time.perf_counter() - t0
+    rss_loaded_mb = _peak_rss_mb()
+
+    t0 = time.perf_counter()
+    doc_emb = model.encode(texts, normalize_embeddings=True, batch_size=batch_size, device=device)
+    batch_s = time.perf_counter() - t0
+    query_emb = model.encode(list(queries.values()), normalize_embeddings=True, batch_size=batch_size, device=device)
+
+    latencies = []
+    for text in texts[:latency_samples]:
+        t1 = time.perf_counter()
+        model.encode([text], normalize_embeddings=True, device=device)
+        latencies.append(time.perf_counter() - t1)
+    latencies.sort()
+
+    return {
+        "candidate": spec,
+        "model_id": model_id,
+        "backend": backend,
+        "device": device,
+        "docs": len(texts),
+        "max_seq_length": getattr(model, "max_seq_length", None),
+        "dim": int(doc_emb.shape[1]),
+        "load_s": load_s,
+        "docs_per_sec": len(texts) / batch_s if batch_s > 0 else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "model_rss_mb": rss_loaded_mb - rss_before_mb,
+        "peak_rss_mb": _peak_rss_mb(),
+        "query_categories": list(queries),
+        "doc_categories": categories,
+        "similarities": (np.asarray(query_emb) @ np.asarray(doc_emb).T).round(6).tolist(),
+    }
+
+
+def ndcg_at_k(scores: np.ndarray, relevant: np.ndarray, k: int) -> float:
+    """Binary-gain NDCG@k of ranking docs by `scores`."""
+    order = np.argsort(-scores)[:k]
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    dcg = float((relevant[order] * discounts[:len(order)]).sum())
+    ideal = float(discounts[:min(k, int(relevant.sum()))].sum())
+    return dcg / ideal if ideal > 0 else 0.0
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    """Spearman rank correlation (Pearson on average ranks, so ties are handled)."""
+    ra, rb = pd.Series(a).rank().to_numpy(), pd.Series(b).rank().to_numpy()
+    if ra.std() == 0 or rb.std() == 0:
+        return float("nan")
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def quality(run: Dict, reference: Dict, k: int) -> Dict:
+    """NDCG@k against the category labels and agreement with the reference ranking."""
+    sims = np.asarray(run["similarities"])
+    ref = np.asarray(reference["similarities"])
+    doc_categories = np.asarray(run["doc_categories"])
+    ndcgs, rhos, overlaps = [], [], []
+    for qi, category in enumerate(run["query_categories"]):
+        ndcgs.append(ndcg_at_k(sims[qi], (doc_categories == category).astype(float), k))
+        rho = spearman(sims[qi], ref[qi])
+        rhos.append(0.0 if math.isnan(rho) else rho)
+        top, ref_top = set(np.argsort(-sims[qi])[:k]), set(np.argsort(-ref[qi])[:k])
+        overlaps.append(len(top & ref_top) / k)
+    return {
+        f"ndcg@{k}": float(np.mean(ndcgs)),
+        "spearman_vs_ref": float(np.mean(rhos)),
+        f"overlap@{k}_vs_ref": float(np.mean(overlaps)),
+    }
+
+
+def pareto_front(rows: List[Dict], quality_key: str) -> List[str]:
+    """Candidates no other candidate beats on quality, throughput and memory at once."""
+    front = []
+    for row in rows:
+        dominated = any(
+            other is not row
+            and other[quality_key] >= row[quality_key]
+            and other["docs_per_sec"] >= row["docs_per_sec"]
+            and other["model_rss_mb"] <= row["model_rss_mb"]
+            and (other[quality_key], other["docs_per_sec"], -other["model_rss_mb"]) != (row[quality_key], row["docs_per_sec"], -row["model_rss_mb"])
+            for other in rows
+        )
+        if not dominated:
+            front.append(row["candidate"])
+    return front
+
+
+def run_in_child(args, spec: str) -> Optional[Dict]:
+    cmd = [sys.executable, "-m", "benchmarks.bench_models", "--run-one", spec, "--corpus", args.corpus,
+           "--batch-size", str(args.batch_size), "--latency-samples", str(args.latency_samples)]
+    if args.limit:
+        cmd += ["--limit", str(args.limit)]
+    if args.jd_dir:
+        cmd += ["--jd-dir", args.jd_dir]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=args.timeout)
+    except subprocess.TimeoutExpired:
+        print(f"Warning: candidate '{spec}' timed out after {args.timeout}s.", file=sys.stderr)
+        return None
+    if proc.returncode != 0:
+        print(f"Error: candidate '{spec}' failed:\n{proc.stderr[-2000:]}", file=sys.stderr)
+        return None
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Ranking quality vs. cost of embedding models and backends.")
+    parser.add_argument("--candidates", default=DEFAULT_CANDIDATES, help="Comma-separated MODEL@BACKEND; the first is the reference")
+    parser.add_argument("--corpus", default=str(CORPUS_PATH))
+    parser.add_argument("--limit", type=int, default=None, help="Sample about N resumes, spread over categories")
+    parser.add_argument("--jd-dir", default=None, help="Directory of <Category>.txt job descriptions")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--latency-samples", type=int, default=50, help="Single-CV encodes timed for p50/p95")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds allowed per candidate")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--run-one", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_one:
+        result = run_candidate(args.run_one, Path(args.corpus), args.limit, Path(args.jd_dir) if args.jd_dir else None,
+                               args.batch_size, args.latency_samples)
+        print(json.dumps(result))
+        return
+
+    _, categories = load_labelled_corpus(Path(args.corpus), args.limit)
+    if len(set(categories)) < 2:
+        print(f"Warning: '{args.corpus}' has a single Category; NDCG is trivially 1.0. "
+              "Use the full Resume.csv (24 categories) for meaningful numbers.", file=sys.stderr)
+
+    runs = []
+    for spec in [c for c in args.candidates.split(",") if c.strip()]:
+        print(f"Info: Benchmarking {spec}...")
+        run = run_in_child(args, spec.strip())
+        if run is not None:
+            runs.append(run)
+    if not runs:
+        print("Error: no candidate finished.", file=sys.stderr)
+        sys.exit(1)
+
+    reference = runs[0]
+    quality_key = f"ndcg@{args.k}"
+    rows = []
+    for run in runs:
+        row = {key: value for key, value in run.items() if key not in ("similarities", "doc_categories", "query_categories")}
+        row.update(quality(run, reference, args.k))
+        row["speedup_vs_ref"] = run["docs_per_sec"] / reference["docs_per_sec"] if reference["docs_per_sec"] else None
+        rows.append(row)
+    front = pareto_front(rows, quality_key)
+
+    print(f"\nReference: {reference['candidate']}  ({reference['docs']} resumes, {len(reference['query_categories'])} categories)")
+    print(f"{'candidate':<40} {quality_key:>8} {'rho':>6} {'ovl':>6} {'docs/s':>8} {'x ref':>6} {'p50 ms':>8} {'p95 ms':>8} {'load s':>7} {'RSS MB':>7}")
+    for row in rows:
+        print(f"{row['candidate']:<40} {row[quality_key]:>8.3f} {row['spearman_vs_ref']:>6.3f} {row[f'overlap@{args.k}_vs_ref']:>6.2f} "
+              f"{row['docs_per_sec']:>8.1f} {row['speedup_vs_ref'] or 0:>6.2f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+              f"{row['load_s']:>7.1f} {row['model_rss_mb']:>7.0f}{'  *' if row['candidate'] in front else ''}")
+    print("* = not dominated on quality, throughput and memory")
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "git_commit": _git_commit(),
+        "corpus": args.corpus,
+        "k": args.k,
+        "reference": reference["candidate"],
+        "pareto_front": front,
+        "candidates": rows,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"models_{datetime.now().strftime('%Y%m%d%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Info: Results written to '{output}'.")
+
+
+if __name__ == "__main__":
+    main()
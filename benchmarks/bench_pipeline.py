@@ -0,0 +1,192 @@
+# Throughput benchmark for the cv_scanner stages, fed with hypothesis/Resume.csv.
+#
+#   python -m benchmarks.bench_pipeline --repeat 5
+#   python -m benchmarks.bench_pipeline --skip-embedding --compare benchmarks/results/<old>.json
+#
+# Reports docs/sec and p50/p95 latency per stage and writes a JSON file under
+# benchmarks/results/ so runs can be compared over time.
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import pandas as pd
+from internal.cv_scanner import (
+    CVScanner,
+    extract_skills_fuzzy,
+    extract_total_months_experience,
+    extract_gpa,
+    extract_word_count,
+    calculate_final_score,
+    scoring_params,
+)
+from utils.skill_utils import load_skills, normalize_text
+
+CORPUS_PATH = Path("hypothesis/Resume.csv")
+RESULTS_DIR = Path("benchmarks/results")
+
+
+def load_corpus(path: Path = CORPUS_PATH, limit: Optional[int] = None, repeat: int = 1) -> List[str]:
+    df = pd.read_csv(path, usecols=["Resume_str"])
+    texts = [t for t in df["Resume_str"].dropna().astype(str).tolist() if t.strip()]
+    if limit is not None:
+        texts = texts[:limit]
+    return texts * repeat
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def time_stage(name: str, fn: Callable, inputs: List) -> Dict:
+    """Run `fn` over every input, timing each call individually."""
+    latencies = []
+    outputs = []
+    start = time.perf_counter()
+    for item in inputs:
+        t0 = time.perf_counter()
+        outputs.append(fn(item))
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+    latencies.sort()
+    stats = {
+        "stage": name,
+        "docs": len(inputs),
+        "total_s": total,
+        "docs_per_sec": len(inputs) / total if total > 0 else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "mean_ms": (sum(latencies) / len(latencies) * 1000) if latencies else 0.0,
+    }
+    print(f"Info: {name:<18} {stats['docs_per_sec']:10.1f} docs/s  p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms")
+    return {"stats": stats, "outputs": outputs}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(args) -> Dict:
+    texts = load_corpus(Path(args.corpus), limit=args.limit, repeat=args.repeat)
+    if not texts:
+        raise ValueError(f"No resume text found in '{args.corpus}'")
+    print(f"Info: Benchmarking {len(texts)} documents from '{args.corpus}'.")
+
+    skills_map = load_skills()
+    skills = skills_map.get(normalize_text(args.job_title), [])
+    if not skills:
+        print(f"Warning: no skills for job title '{args.job_title}', skill matching will be trivial.", file=sys.stderr)
+    jd_text = Path(args.jd).read_text(encoding="utf-8") if args.jd else (
+        f"Job title: {args.job_title}\nRequired skills: {', '.join(skills)}"
+    )
+
+    t0 = time.perf_counter()
+    scanner = CVScanner(model_id=args.model_id, spacy_package=args.spacy_model)
+    model_load_s = time.perf_counter() - t0
+
+    stages = []
+    normalized = time_stage("normalize", scanner.normalize_cv_text, texts)
+    stages.append(normalized["stats"])
+
+    skills_out = time_stage(
+        "skills_fuzzy",
+        lambda t: extract_skills_fuzzy(scanner.nlp, t, skills),
+        texts,
+    )
+    stages.append(skills_out["stats"])
+
+    months_out = time_stage("months_experience", extract_total_months_experience, texts)
+    stages.append(months_out["stats"])
+
+    gpa_out = time_stage("gpa", extract_gpa, texts)
+    stages.append(gpa_out["stats"])
+
+    if args.skip_embedding:
+        similarities = [0.0] * len(texts)
+    else:
+        normalized_jd = scanner.normalize_cv_text(jd_text)
+        embed_out = time_stage(
+            "embedding",
+            lambda t: scanner.calculate_similarity(normalized_jd, t),
+            normalized["outputs"],
+        )
+        stages.append(embed_out["stats"])
+        similarities = embed_out["outputs"]
+
+    features = [
+        (sim, len(sk), months, extract_word_count(norm), gpa)
+        for sim, sk, months, norm, gpa in zip(
+            similarities, skills_out["outputs"], months_out["outputs"], normalized["outputs"], gpa_out["outputs"]
+        )
+    ]
+    params = scoring_params()
+    score_out = time_stage("final_score", lambda f: calculate_final_score(*f, {}, params), features)
+    stages.append(score_out["stats"])
+
+    return {
+        "created_at": datetime.now().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "device": scanner.device,
+        "model_id": args.model_id,
+        "spacy_model": args.spacy_model,
+        "corpus": str(args.corpus),
+        "docs": len(texts),
+        "job_title": args.job_title,
+        "model_load_s": model_load_s,
+        "stages": stages,
+    }
+
+
+def compare(current: Dict, previous: Dict):
+    """Print docs/sec change per stage against an earlier result file."""
+    prev = {s["stage"]: s for s in previous.get("stages", [])}
+    print(f"\nComparison with run from {previous.get('created_at')} ({previous.get('git_commit')}):")
+    for stage in current["stages"]:
+        old = prev.get(stage["stage"])
+        if not old or not old["docs_per_sec"]:
+            continue
+        change = (stage["docs_per_sec"] - old["docs_per_sec"]) / old["docs_per_sec"] * 100
+        print(f"  {stage['stage']:<18} {old['docs_per_sec']:10.1f} -> {stage['docs_per_sec']:10.1f} docs/s ({change:+.1f}%)")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Per-stage throughput benchmark of the CV scan pipeline.")
+    parser.add_argument("--corpus", default=str(CORPUS_PATH))
+    parser.add_argument("--limit", type=int, default=None, help="Use only the first N resumes")
+    parser.add_argument("--repeat", type=int, default=1, help="Cycle the corpus N times for more samples")
+    parser.add_argument("--job-title", default="Software Engineer")
+    parser.add_argument("--jd", default=None, help="Job description file (default: built from the title's skills)")
+    parser.add_argument("--model-id", default="BAAI/bge-large-en-v1.5")
+    parser.add_argument("--spacy-model", default="en_core_web_sm")
+    parser.add_argument("--skip-embedding", action="store_true")
+    parser.add_argument("--output", default=None, help="Result JSON path (default: benchmarks/results/pipeline_<ts>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"pipeline_{datetime.now().strftime('%Y%m%d%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"Info: Results written to '{output}'.")
+
+    if args.compare:
+        compare(result, json.loads(Path(args.compare).read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# Scaling benchmark: scan throughput and peak memory as the CV pool grows
+# from 10 to 100k PDFs, on synthetic PDFs from benchmarks/synth_pdfs.py.
+#
+#   python -m benchmarks.bench_scaling --mode parse                  # text extraction only
+#   python -m benchmarks.bench_scaling --mode scan --sizes 10,100,1000
+#   python -m benchmarks.bench_scaling --mode scan --top-n 50 --sizes 10,1000,10000
+#
+# Each pool size runs in a fresh process so peak RSS is per size, with an
+# empty text cache unless --warm-cache is given. Results are written to
+# benchmarks/results/scaling_<ts>.json.
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from benchmarks.synth_pdfs import CORPUS_PATH, DEFAULT_OUT_DIR, generate_corpus, parse_range, pdf_name
+
+RESULTS_DIR = Path("benchmarks/results")
+DEFAULT_SIZES = "10,100,1000,10000,100000"
+
+
+def _git_commit() -> Optional[str]:
+    # kept local: importing bench_pipeline would load the models in this driver process
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def _peak_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_one(pdf_dir: Path, size: int, mode: str, job_title: str, model_id: str, spacy_model: str, top_n: int = 0) -> Dict:
+    """Scan the first `size` synthetic PDFs in this process and measure it."""
+    names = [pdf_name(i) for i in range(size)]
+    load_s = 0.0
+    if mode == "parse":
+        from internal.pdf_text import iter_parsed
+        from utils.resource_utils import parse_workers
+
+        baseline_mb = _peak_rss_mb()
+        start = time.perf_counter()
+        chars = sum(len(text) for text, _, _ in iter_parsed([pdf_dir / name for name in names], parse_workers()))
+        wall_s = time.perf_counter() - start
+        extra = {"chars": chars}
+    else:
+        from internal.cv_scanner import CVScanner
+        from utils.skill_utils import load_skills, normalize_text
+
+        skills_map = load_skills()
+        jd_text = f"Job title: {job_title}\nRequired skills: {', '.join(skills_map.get(normalize_text(job_title), []))}"
+        t0 = time.perf_counter()
+        scanner = CVScanner(model_id=model_id, spacy_package=spacy_model)
+        load_s = time.perf_counter() - t0
+        baseline_mb = _peak_rss_mb()
+        start = time.perf_counter()
+        if top_n:
+            ranked = scanner.scan_top_n(jd_text, pdf_dir, skills_map, top_n, target_job_title=job_title, pdf_list=names)
+        else:
+            ranked = list(scanner.scan(jd_text, pdf_dir, skills_map, target_job_title=job_title, pdf_list=names).items())
+        wall_s = time.perf_counter() - start
+        extra = {"results_kept": len(ranked), "stage_summary": scanner.last_scan_summary}
+    return {
+        "size": size,
+        "mode": mode,
+        "top_n": top_n or None,
+        "wall_s": wall_s,
+        "pdfs_per_sec": size / wall_s if wall_s > 0 else 0.0,
+        "model_load_s": load_s,
+        "baseline_rss_mb": baseline_mb,
+        "peak_rss_mb": _peak_rss_mb(),
+        "peak_child_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+        **extra,
+    }
+
+
+def run_size(args, size: int) -> Optional[Dict]:
+    """run_one() in a child process; None if it failed or timed out."""
+    cmd = [sys.executable, "-m", "benchmarks.bench_scaling", "--run-one", str(size),
+           "--mode", args.mode, "--pdf-dir", args.pdf_dir, "--job-title", args.job_title,
+           "--model-id", args.model_id, "--spacy-model", args.spacy_model, "--top-n", str(args.top_n)]
+    env = dict(os.environ)
+    with tempfile.TemporaryDirectory(prefix="ads_text_cache_") as cache_dir:
+        if not args.warm_cache:
+            env["ADS_TEXT_CACHE_DIR"] = cache_dir
+        try:
+            proc = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=args.timeout)
+        except subprocess.TimeoutExpired:
+            print(f"Warning: pool size {size} timed out after {args.timeout}s.", file=sys.stderr)
+            return None
+    if proc.returncode != 0:
+        print(f"Error: pool size {size} failed:\n{proc.stderr[-2000:]}", file=sys.stderr)
+        return None
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Scan throughput and peak memory across CV pool sizes.")
+    parser.add_argument("--mode", choices=("parse", "scan"), default="scan")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated pool sizes")
+    parser.add_argument("--top-n", type=int, default=0, help="Use scan_top_n (bounded memory) instead of scan")
+    parser.add_argument("--pdf-dir", default=str(DEFAULT_OUT_DIR))
+    parser.add_argument("--corpus", default=str(CORPUS_PATH))
+    parser.add_argument("--pages", default="1-2")
+    parser.add_argument("--layout", default="mixed")
+    parser.add_argument("--blocks", default="4-8")
+    parser.add_argument("--target-kb", type=int, default=0)
+    parser.add_argument("--gen-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--job-title", default="Software Engineer")
+    parser.add_argument("--model-id", default="BAAI/bge-large-en-v1.5")
+    parser.add_argument("--spacy-model", default="en_core_web_sm")
+    parser.add_argument("--warm-cache", action="store_true", help="Keep the extracted-text cache between sizes")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds allowed per pool size")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--run-one", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_one is not None:
+        result = run_one(Path(args.pdf_dir), args.run_one, args.mode, args.job_title, args.model_id, args.spacy_model, args.top_n)
+        print(json.dumps(result, default=str))
+        return
+
+    sizes = sorted({int(s) for s in args.sizes.split(",") if s.strip()})
+    generate_corpus(sizes[-1], Path(args.pdf_dir), Path(args.corpus), parse_range(args.pages), args.layout,
+                    parse_range(args.blocks), args.target_kb, workers=args.gen_workers)
+
+    runs = []
+    print(f"{'PDFs':>8} {'wall s':>10} {'PDFs/s':>10} {'base MB':>9} {'peak MB':>9} {'pool MB':>9}")
+    for size in sizes:
+        result = run_size(args, size)
+        if result is None:
+            continue
+        runs.append(result)
+        print(f"{size:>8} {result['wall_s']:>10.2f} {result['pdfs_per_sec']:>10.1f} "
+              f"{result['baseline_rss_mb']:>9.0f} {result['peak_rss_mb']:>9.0f} {result['peak_child_rss_mb']:>9.0f}")
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "git_commit": _git_commit(),
+        "mode": args.mode,
+        "top_n": args.top_n or None,
+        "warm_cache": args.warm_cache,
+        "corpus": {"pdf_dir": args.pdf_dir, "pages": args.pages, "layout": args.layout,
+                   "blocks": args.blocks, "target_kb": args.target_kb},
+        "runs": runs,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"scaling_{datetime.now().strftime('%Y%m%d%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    print(f"Info: Results written to '{output}'.")
+
+
+if __name__ == "__main__":
+    main()
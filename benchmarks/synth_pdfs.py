@@ -0,0 +1,209 @@
+# Synthetic resume PDFs for scaling benchmarks, built from the resume text in
+# hypothesis/Resume.csv. Page count, layout, text blocks per page and file
+# size are controllable; file N is always the same for the same options, so
+# a 100k corpus is a superset of the 10-file one and reruns only add files.
+#
+#   python -m benchmarks.synth_pdfs --count 1000 --out .cache/synth_pdfs
+#   python -m benchmarks.synth_pdfs --count 100000 --pages 1-3 --layout mixed --target-kb 200 --workers 8
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import pymupdf
+import pandas as pd
+
+CORPUS_PATH = Path("hypothesis/Resume.csv")
+DEFAULT_OUT_DIR = Path(".cache/synth_pdfs")
+LAYOUTS = ("single", "two-column", "dense")
+PAGE_W, PAGE_H = pymupdf.paper_size("a4")
+MARGIN = 48
+
+_texts: List[str] = []
+_helv = pymupdf.Font("helv")
+_widths: Dict[str, float] = {}
+
+
+def pdf_name(index: int) -> str:
+    return f"synth_{index:06d}.pdf"
+
+
+def parse_range(value: str) -> Tuple[int, int]:
+    """'2' -> (2, 2), '1-3' -> (1, 3)."""
+    lo, _, hi = value.partition("-")
+    return int(lo), int(hi or lo)
+
+
+def _block_rects(layout: str, blocks: int) -> Tuple[List[pymupdf.Rect], float]:
+    """Text rectangles of one page and the font size for a layout."""
+    top, bottom = MARGIN + 40, PAGE_H - MARGIN
+    if layout == "two-column":
+        # narrow sidebar (skills, contact) plus a main column
+        split = MARGIN + (PAGE_W - 2 * MARGIN) * 0.32
+        side = max(1, blocks // 3)
+        columns = [(MARGIN, split - 10, side), (split + 10, PAGE_W - MARGIN, max(1, blocks - side))]
+        fontsize = 9.5
+    else:
+        columns = [(MARGIN, PAGE_W - MARGIN, blocks)]
+        fontsize = 7.5 if layout == "dense" else 10.5
+    rects = []
+    for x0, x1, n in columns:
+        height = (bottom - top) / n
+        rects += [pymupdf.Rect(x0, top + i * height, x1, top + (i + 1) * height - 6) for i in range(n)]
+    return rects, fontsize
+
+
+def _text_width(text: str, fontsize: float) -> float:
+    # Helvetica advances cached per process; pymupdf's own wrapping recomputes them per document
+    widths = [_widths.get(c) for c in text]
+    if None in widths:
+        for c in set(text) - _widths.keys():
+            _widths[c] = _helv.glyph_advance(ord(c))
+        widths = [_widths[c] for c in text]
+    return sum(widths) * fontsize
+
+
+def _wrap(words: List[str], start: int, rect: pymupdf.Rect, fontsize: float) -> Tuple[List[str], int]:
+    """Lines of words from `start` (cycling) that fill `rect`; returns (lines, next start)."""
+    max_lines = int(rect.height / (fontsize * 1.2))
+    space = _text_width(" ", fontsize)
+    lines, line, width, i = [], [], 0.0, start
+    while len(lines) < max_lines:
+        word = words[i % len(words)]
+        word_width = _text_width(word, fontsize)
+        if line and width + space + word_width > rect.width:
+            lines.append(" ".join(line))
+            line, width = [], 0.0
+            continue
+        width += (space if line else 0.0) + word_width
+        line.append(word)
+        i += 1
+    return lines, i - len(line)
+
+
+def _pad_to_size(data: bytes, target_bytes: int, rng: random.Random) -> bytes:
+    """Grow a PDF to about `target_bytes` with an incompressible image on its last page."""
+    missing = target_bytes - len(data)
+    if missing <= 4096:
+        return data
+    side = max(8, int((missing / 3) ** 0.5))
+    pix = pymupdf.Pixmap(pymupdf.csRGB, side, side, rng.randbytes(side * side * 3), 0)
+    doc = pymupdf.open(stream=data, filetype="pdf")
+    doc[-1].insert_image(pymupdf.Rect(PAGE_W - MARGIN - 60, MARGIN, PAGE_W - MARGIN, MARGIN + 60), pixmap=pix)
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data
+
+
+def build_pdf(index: int, text: str, pages: int, layout: str, blocks: int, target_kb: int = 0, seed: int = 0) -> bytes:
+    """One synthetic resume: a unique header plus `text` laid out over `pages` pages."""
+    rng = random.Random(seed * 1_000_003 + index)
+    # base-14 Helvetica has no glyphs past Latin-1, and one such character makes
+    # pymupdf rebuild a 64k-entry width table per document; fold to ASCII
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    words = re.sub(r"\s+", " ", text).strip().split(" ") or ["resume"]
+    doc = pymupdf.open()
+    pos = rng.randrange(len(words))
+    for page_no in range(pages):
+        page = doc.new_page(width=PAGE_W, height=PAGE_H)
+        if page_no == 0:
+            # unique per file, so content-hash caches and dedup see distinct CVs
+            page.insert_text((MARGIN, MARGIN + 16), f"Candidate {index:06d} - Synthetic Resume", fontsize=16)
+        rects, fontsize = _block_rects(layout, blocks)
+        for rect in rects:
+            lines, pos = _wrap(words, pos, rect, fontsize)
+            page.insert_text((rect.x0, rect.y0 + fontsize), lines, fontsize=fontsize, lineheight=1.2)
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return _pad_to_size(data, target_kb * 1024, rng) if target_kb else data
+
+
+def _init_worker(corpus: str):
+    # only the text column; kept free of model imports so workers start fast
+    global _texts
+    df = pd.read_csv(corpus, usecols=["Resume_str"])
+    _texts = [t for t in df["Resume_str"].dropna().astype(str) if t.strip()]
+
+
+def _write_range(out_dir: str, indices: List[int], options: dict) -> int:
+    written = 0
+    for index in indices:
+        target = Path(out_dir) / pdf_name(index)
+        if target.exists():
+            continue
+        rng = random.Random(options["seed"] * 7919 + index)
+        pages = rng.randint(*options["pages"])
+        blocks = rng.randint(*options["blocks"])
+        layout = options["layout"] if options["layout"] != "mixed" else LAYOUTS[index % len(LAYOUTS)]
+        data = build_pdf(index, _texts[index % len(_texts)], pages, layout, blocks, options["target_kb"], options["seed"])
+        tmp_path = target.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, target)
+        written += 1
+    return written
+
+
+def generate_corpus(
+    count: int,
+    out_dir: Path = DEFAULT_OUT_DIR,
+    corpus: Path = CORPUS_PATH,
+    pages: Tuple[int, int] = (1, 2),
+    layout: str = "mixed",
+    blocks: Tuple[int, int] = (4, 8),
+    target_kb: int = 0,
+    seed: int = 0,
+    workers: int = 1,
+) -> List[str]:
+    """
+    Make sure `out_dir` holds synthetic PDFs 0..count-1 (existing files are
+    kept) and return their names in order.
+    """
+    if layout not in LAYOUTS + ("mixed",):
+        raise ValueError(f"Unknown layout '{layout}', expected one of {LAYOUTS + ('mixed',)}")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    names = [pdf_name(i) for i in range(count)]
+    missing = [i for i, name in enumerate(names) if not (out_dir / name).exists()]
+    if not missing:
+        return names
+
+    options = {"pages": pages, "layout": layout, "blocks": blocks, "target_kb": target_kb, "seed": seed}
+    start = time.perf_counter()
+    if workers <= 1:
+        _init_worker(str(corpus))
+        written = _write_range(str(out_dir), missing, options)
+    else:
+        step = max(1, len(missing) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(str(corpus),)) as pool:
+            futures = [pool.submit(_write_range, str(out_dir), missing[i:i + step], options) for i in range(0, len(missing), step)]
+            written = sum(f.result() for f in futures)
+    print(f"Info: Generated {written} synthetic PDFs in '{out_dir}' in {time.perf_counter() - start:.1f}s.")
+    return names
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate synthetic resume PDFs from hypothesis/Resume.csv.")
+    parser.add_argument("--count", type=int, required=True)
+    parser.add_argument("--out", default=str(DEFAULT_OUT_DIR))
+    parser.add_argument("--corpus", default=str(CORPUS_PATH))
+    parser.add_argument("--pages", default="1-2", help="Pages per PDF, N or MIN-MAX")
+    parser.add_argument("--layout", default="mixed", choices=LAYOUTS + ("mixed",))
+    parser.add_argument("--blocks", default="4-8", help="Text blocks per page, N or MIN-MAX")
+    parser.add_argument("--target-kb", type=int, default=0, help="Pad each file to about this size (0 = text only)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+    if not Path(args.corpus).exists():
+        print(f"Error: corpus '{args.corpus}' not found.", file=sys.stderr)
+        sys.exit(1)
+    generate_corpus(args.count, Path(args.out), Path(args.corpus), parse_range(args.pages), args.layout,
+                    parse_range(args.blocks), args.target_kb, args.seed, args.workers)
+
+
+if __name__ == "__main__":
+    main()
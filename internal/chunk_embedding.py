@@ -0,0 +1,149 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Chunked embedding of long resumes. The embedding model truncates input past
+# its max sequence length, so most of a long CV would never be seen; here a
+# CV is split into token windows, the chunks of all CVs in a call are encoded
+# together in shared batches, and per-chunk similarities are pooled (max,
+# mean or mean of the top k). Chunk embeddings are cached on disk per model,
+# chunking settings and CV text, so repeat scans skip the encode.
+
+CHUNK_CACHE_DIR = Path(os.environ.get("ADS_CHUNK_CACHE_DIR", ".cache/chunk_embeddings"))
+POOLING_METHODS = ("max", "mean", "topk")
+
+_lock = threading.Lock()
+_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def chunk_cache_stats() -> Dict[str, int]:
+    with _lock:
+        return dict(_stats)
+
+
+def pool_similarities(chunk_sims: np.ndarray, method: str = "max", top_k: int = 3) -> np.ndarray:
+    """
+    Pool a (chunks x queries) similarity matrix over its chunks: "max" takes
+    the best-matching chunk, "mean" averages all chunks, "topk" averages the
+    best `top_k`. Returns one similarity per query.
+    """
+    if method == "max":
+        return chunk_sims.max(axis=0)
+    if method == "mean":
+        return chunk_sims.mean(axis=0)
+    if method == "topk":
+        k = max(1, min(top_k, chunk_sims.shape[0]))
+        return np.sort(chunk_sims, axis=0)[-k:].mean(axis=0)
+    raise ValueError(f"Unknown pooling method '{method}', expected one of {POOLING_METHODS}")
+
+
+class ChunkEmbedder:
+    """Token-window chunking, shared-batch encoding and caching for one model."""
+
+    def __init__(self, model, model_key: str, device: str, batch_size: int = 128, max_tokens: int = 0, overlap: int = 32, cache_dir: Path = CHUNK_CACHE_DIR):
+        self.model = model
+        self.device = device
+        self.batch_size = batch_size
+        self.tokenizer = getattr(model, "tokenizer", None)
+        # room for the [CLS]/[SEP] tokens the model adds to every chunk
+        limit = int(getattr(model, "max_seq_length", 0) or 512) - 2
+        self.max_tokens = min(max_tokens, limit) if max_tokens and max_tokens > 0 else limit
+        self.overlap = max(0, min(overlap, self.max_tokens // 2))
+        self.cache_dir = Path(cache_dir) / hashlib.sha256(
+            f"{model_key}|{self.max_tokens}|{self.overlap}".encode("utf-8")
+        ).hexdigest()[:16]
+
+    def chunk_text(self, text: str) -> List[str]:
+        """Split `text` into windows of at most max_tokens tokens, `overlap` tokens apart."""
+        if not text:
+            return []
+        step = self.max_tokens - self.overlap
+        if self.tokenizer is not None and getattr(self.tokenizer, "is_fast", False):
+            offsets = self.tokenizer(
+                text, add_special_tokens=False, return_offsets_mapping=True, truncation=False, verbose=False
+            )["offset_mapping"]
+            if len(offsets) <= self.max_tokens:
+                return [text]
+            # slice the original text at token boundaries so no characters are lost
+            return [
+                text[offsets[start][0]:offsets[min(start + self.max_tokens, len(offsets)) - 1][1]]
+                for start in range(0, len(offsets) - self.overlap, step)
+            ]
+        # slow tokenizers have no offsets: approximate tokens with words (~0.75 words per token)
+        words = text.split()
+        words_per_chunk = max(1, int(self.max_tokens * 0.75))
+        word_step = max(1, int(step * 0.75))
+        if len(words) <= words_per_chunk:
+            return [text]
+        return [" ".join(words[i:i + words_per_chunk]) for i in range(0, max(1, len(words) - int(self.overlap * 0.75)), word_step)]
+
+    def _cache_path(self, text: str) -> Path:
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return self.cache_dir / key[:2] / f"{key}.npy"
+
+    def _load(self, text: str) -> Optional[np.ndarray]:
+        path = self._cache_path(text)
+        try:
+            return np.load(path)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, text: str, embeddings: np.ndarray):
+        path = self._cache_path(text)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with tmp_path.open("wb") as f:
+                np.save(f, embeddings.astype(np.float32, copy=False))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            print(f"Warning: could not cache chunk embeddings: {e}")
+
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        (chunks x dim) normalized embeddings per text. Cached texts are read
+        from disk; the chunks of all other texts go through one encode call.
+        """
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if text in pending:
+                pending[text].append(i)
+                continue
+            cached = self._load(text)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending[text] = [i]
+        with _lock:
+            _stats["hits"] += len(texts) - sum(len(v) for v in pending.values())
+            _stats["misses"] += len(pending)
+
+        if pending:
+            spans: List[Tuple[str, int, int]] = []
+            all_chunks: List[str] = []
+            for text in pending:
+                chunks = self.chunk_text(text) or [text]
+                spans.append((text, len(all_chunks), len(all_chunks) + len(chunks)))
+                all_chunks.extend(chunks)
+            encoded = np.asarray(self.model.encode(
+                all_chunks, normalize_embeddings=True, device=self.device, batch_size=self.batch_size
+            ))
+            for text, start, end in spans:
+                embeddings = encoded[start:end]
+                self._store(text, embeddings)
+                for i in pending[text]:
+                    results[i] = embeddings
+        return results
+
+    def similarities(self, query_embeddings: np.ndarray, texts: List[str], pooling: str = "max", top_k: int = 3) -> np.ndarray:
+        """(texts x queries) pooled similarities of each text's chunks to each query embedding."""
+        query_embeddings = np.atleast_2d(query_embeddings)
+        out = np.zeros((len(texts), query_embeddings.shape[0]))
+        for i, chunk_embeddings in enumerate(self.embed(texts)):
+            out[i] = pool_similarities(chunk_embeddings @ query_embeddings.T, pooling, top_k)
+        return out
@@ -1,6 +1,6 @@
 import sys
 from pathlib import Path
-from typing import Dict, List, Union, Optional, Set
+from typing import Dict, List, Union, Optional, Set, Iterable, Iterator, Tuple, Callable
 from sentence_transformers import SentenceTransformer
 import re
 import spacy
@@ -11,43 +11,71 @@ from thefuzz import process, fuzz
 import pymupdf
 import csv
 import io
+import os
+import json
+import hashlib
+import functools
+import heapq
+import itertools
+import importlib.util
 from datetime import datetime
 import torch
+import numpy as np
 import dateparser
 from collections import defaultdict
-import yaml
 from utils.skill_utils import load_skills
+from utils.config_utils import ConfigSnapshot, config_snapshot
 import streamlit as st
+import time
+from utils.timing_utils import StageTimer, summarize_timings, profile_call
+from utils.resource_utils import apply_thread_limits, parse_workers, scan_slot
+from internal.chunk_embedding import ChunkEmbedder, chunk_cache_stats
+from utils import metrics_utils
+from internal.pdf_text import extract_pdf_text, iter_parsed, parse_pdf
+
+def scoring_params(snapshot: Optional[ConfigSnapshot] = None, user_skill_weight: Optional[float] = None, user_experience_weight: Optional[float] = None) -> Dict:
+    """
+    Scoring targets, weights and thresholds for one scan, derived from a
+    config snapshot (the latest one by default) plus per-run weight overrides.
+    """
+    cfg = snapshot or config_snapshot()
+    skill_weight = cfg["user_skill_weight"] if user_skill_weight is None else user_skill_weight
+    experience_weight = cfg["user_experience_weight"] if user_experience_weight is None else user_experience_weight
+    params = {
+        'config_version': cfg.version,
+        'user_skill_weight': skill_weight,
+        'user_experience_weight': experience_weight,
+        'target_jd_similarity': cfg["target_jd_similarity"],
+        'target_skills': cfg["target_skills"],
+        'target_months_experience': cfg["target_months_base"] * experience_weight,
+        'target_word_count': cfg["target_word_count"],
+        'target_gpa': cfg["target_gpa"],
+        'weight_jd': cfg["weight_jd"],
+        'weight_skill': cfg["weight_skill"],
+        'weight_months': cfg["weight_months"],
+        'weight_word': cfg["weight_word"],
+        'weight_gpa': cfg["weight_gpa"],
+        'fuzzy_title_match_threshold': cfg["fuzzy_title_match_threshold"],
+        'fuzzy_skill_match_threshold': cfg["fuzzy_skill_match_threshold"],
+        'embedding_chunking': bool(cfg.get("embedding_chunking", False)),
+        'embedding_chunk_tokens': int(cfg.get("embedding_chunk_tokens", 0) or 0),
+        'embedding_chunk_overlap': int(cfg.get("embedding_chunk_overlap", 32)),
+        'embedding_pooling': cfg.get("embedding_pooling", "max"),
+        'embedding_pooling_top_k': int(cfg.get("embedding_pooling_top_k", 3)),
+        'requirement_coverage': bool(cfg.get("requirement_coverage", False)),
+        'requirement_coverage_threshold': float(cfg.get("requirement_coverage_threshold", 0.65)),
+    }
+    params['max_score_without_gpa'] = (
+        params['weight_jd']
+        + params['weight_skill'] * skill_weight
+        + params['weight_months'] * experience_weight
+        + params['weight_word']
+    )
+    params['max_score_with_gpa'] = params['max_score_without_gpa'] + params['weight_gpa']
+    return params
 
-_config_path = Path(__file__).parent.parent / "config.yaml"
-_cfg = yaml.safe_load(_config_path.read_text())
-
-USER_SKILL_WEIGHT            = _cfg["user_skill_weight"]
-USER_EXPERIENCE_WEIGHT       = _cfg["user_experience_weight"]
-
-TARGET_JD_SIMILARITY         = _cfg["target_jd_similarity"]
-TARGET_SKILLS                = _cfg["target_skills"]
-TARGET_MONTHS_EXPERIENCE     = _cfg["target_months_base"] * USER_EXPERIENCE_WEIGHT
-TARGET_WORD_COUNT            = _cfg["target_word_count"]
-TARGET_GPA                   = _cfg["target_gpa"]
-
-WEIGHT_JD                    = _cfg["weight_jd"]
-WEIGHT_SKILL                 = _cfg["weight_skill"]
-WEIGHT_MONTHS                = _cfg["weight_months"]
-WEIGHT_WORD                  = _cfg["weight_word"]
-WEIGHT_GPA                   = _cfg["weight_gpa"]
-
-MAX_SCORE_WITH_GPA           = (
-    WEIGHT_JD
-    + WEIGHT_SKILL * USER_SKILL_WEIGHT
-    + WEIGHT_MONTHS * USER_EXPERIENCE_WEIGHT
-    + WEIGHT_WORD
-    + WEIGHT_GPA
-)
-MAX_SCORE_WITHOUT_GPA = WEIGHT_JD + (WEIGHT_SKILL * USER_SKILL_WEIGHT) + (WEIGHT_MONTHS * USER_EXPERIENCE_WEIGHT) + WEIGHT_WORD
-
-FUZZY_TITLE_MATCH_THRESHOLD  = _cfg["fuzzy_title_match_threshold"]
-FUZZY_SKILL_MATCH_THRESHOLD  = _cfg["fuzzy_skill_match_threshold"]
+ROLE_EMBEDDING_CACHE_SIZE    = 1024
+SCAN_EMBED_GROUP             = 32      # CVs of a directory scan embedded in one encode call
 
 def normalize_text(txt: str) -> str:
     return txt.strip().lower()
@@ -63,6 +91,8 @@ def load_requirement(req_file_path: Path) -> str:
         print(f"Error loading requirement file '{req_file_path}': {e}", file=sys.stderr)
         raise
 
+TITLE_PREFIXES = ["job title:", "position:", "role:", "title:", "job:", "opportunity:", "hiring:"]
+
 def extract_job_title_from_requirement(req_text: str) -> Optional[str]:
     if not req_text:
         return None
@@ -70,10 +100,9 @@ def extract_job_title_from_requirement(req_text: str) -> Optional[str]:
     if not lines:
         return None
 
-    prefixes = ["job title:", "position:", "role:", "title:", "job:", "opportunity:", "hiring:"]
     for line in lines[:7]:
         normalized_line = normalize_text(line)
-        for prefix in prefixes:
+        for prefix in TITLE_PREFIXES:
             if normalized_line.startswith(prefix):
                 title = line[len(prefix):].strip().rstrip('.,:;-*#')
                 if title and 2 < len(title) < 100:
@@ -91,29 +120,50 @@ def extract_job_title_from_requirement(req_text: str) -> Optional[str]:
     print("Warning: Could not confidently extract job title from requirement.", file=sys.stderr)
     return None
 
-def extract_skills_fuzzy(nlp, text, skill_keywords, threshold=80):
-    text_norm = normalize_text(text.lower())
+class SkillMatcher:
+    """Normalized skill keywords of one job title, matched against a CV's lemmas and text."""
+    def __init__(self, skill_keywords: Iterable[str], threshold: int = 80):
+        self.keywords = sorted({normalize_text(kw) for kw in skill_keywords})
+        self.threshold = threshold
+
+    def match(self, lemmas: Set[str], text_norm: str) -> List[str]:
+        # 1) single-word lemmas, 2) fuzzy partial match for the rest
+        skills_exact = {kw for kw in self.keywords if kw in lemmas}
+        skills_fuzzy = {
+            kw for kw in self.keywords
+            if kw not in skills_exact and fuzz.partial_ratio(kw, text_norm) >= self.threshold
+        }
+        return sorted(skills_exact | skills_fuzzy)
+
+@functools.lru_cache(maxsize=256)
+def _skill_matcher(skill_keywords: Tuple[str, ...], threshold: int) -> SkillMatcher:
+    return SkillMatcher(skill_keywords, threshold)
+
+def _skill_matcher_metrics() -> List[Tuple[str, str, str, Dict[str, str], float]]:
+    info = _skill_matcher.cache_info()
+    return metrics_utils.cache_samples("skill_matcher", info.hits, info.misses)
+
+metrics_utils.register_collector(_skill_matcher_metrics)
 
-    # 1) Collect single‐word lemmas as before
+def _chunk_cache_metrics() -> List[Tuple[str, str, str, Dict[str, str], float]]:
+    stats = chunk_cache_stats()
+    return metrics_utils.cache_samples("chunk_embedding", stats["hits"], stats["misses"])
+
+metrics_utils.register_collector(_chunk_cache_metrics)
+
+def get_skill_matcher(skill_keywords: Iterable[str], threshold: int = 80) -> SkillMatcher:
+    """Cached SkillMatcher for a title's skill list."""
+    return _skill_matcher(tuple(skill_keywords), threshold)
+
+def cv_lemmas(nlp, text: str) -> Tuple[Set[str], str]:
+    """(alpha non-stop lemmas, normalized text) of a CV; shared by every skill matcher."""
+    text_norm = normalize_text(text.lower())
     doc = nlp(text_norm)
-    lemmas = {tok.lemma_ for tok in doc if tok.is_alpha and not tok.is_stop}
-    skills_exact = []
-    for kw in skill_keywords:
-        norm_kw = normalize_text(kw)
-        if norm_kw in lemmas:
-            skills_exact.append(norm_kw)
-
-    # 2) Fuzzy‐match each remaining keyword
-    skills_fuzzy = []
-    for kw in skill_keywords:
-        norm_kw = normalize_text(kw)
-        if norm_kw in skills_exact:
-            continue
-        score = fuzz.partial_ratio(norm_kw, text_norm)
-        if score >= threshold:
-            skills_fuzzy.append(norm_kw)
+    return {tok.lemma_ for tok in doc if tok.is_alpha and not tok.is_stop}, text_norm
 
-    return sorted(set(skills_exact + skills_fuzzy))
+def extract_skills_fuzzy(nlp, text, skill_keywords, threshold=80):
+    lemmas, text_norm = cv_lemmas(nlp, text)
+    return get_skill_matcher(skill_keywords, threshold).match(lemmas, text_norm)
 
 def parse_date(date_str: str, is_end_date: bool = False):
     _current_time = datetime.now()
@@ -273,6 +323,34 @@ def extract_total_months_experience(text: str) -> int:
     return total_merged_months
 
 
+_BULLET_RE = re.compile(r'^\s*(?:[-*•·▪●◦‣]|\(?\d+[.)])\s*')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?;])\s+|\s*[•▪●◦‣]\s*|[\r\n]+')
+
+def split_sentences(text: str, min_words: int = 3, max_words: int = 40) -> List[str]:
+    """Sentences / bullet items of a text; run-on parts are cut into `max_words` pieces."""
+    sentences = []
+    for part in _SENTENCE_SPLIT_RE.split(text or ""):
+        words = part.split()
+        if len(words) < min_words:
+            continue
+        sentences.extend(" ".join(words[i:i + max_words]) for i in range(0, len(words), max_words))
+    return sentences
+
+def split_requirements(jd_text: str) -> List[str]:
+    """
+    Requirement lines of a JD: one per line or bullet, without the bullet
+    marker (headings and short lines dropped). A JD written as one paragraph
+    is split into sentences instead. "Job title: ..." lines are not requirements.
+    """
+    lines = [_BULLET_RE.sub('', line).strip() for line in re.split(r'[\r\n]+', jd_text or "")]
+    lines = [
+        line for line in lines
+        if len(line.split()) >= 3 and not any(normalize_text(line).startswith(p) for p in TITLE_PREFIXES)
+    ]
+    if len(lines) <= 1:
+        lines = split_sentences(jd_text)
+    return list(dict.fromkeys(lines))
+
 def extract_word_count(text: str) -> int:
     return len(text.split()) if text else 0
 
@@ -298,56 +376,63 @@ def extract_gpa(text: str) -> Optional[float]:
 
     return None
 
-def calculate_jd_score(jd_similarity: float) -> float:
-    if jd_similarity >= TARGET_JD_SIMILARITY:
-        return WEIGHT_JD
-    elif TARGET_JD_SIMILARITY > 0:
-        return max(0.0, (jd_similarity / TARGET_JD_SIMILARITY) * WEIGHT_JD)
+def calculate_jd_score(jd_similarity: float, params: Dict) -> float:
+    target, weight = params['target_jd_similarity'], params['weight_jd']
+    if jd_similarity >= target:
+        return weight
+    elif target > 0:
+        return max(0.0, (jd_similarity / target) * weight)
     return 0.0
 
-def calculate_skill_score(skill_count: int) -> float:
-    if skill_count >= TARGET_SKILLS:
-        return WEIGHT_SKILL * USER_SKILL_WEIGHT
-    elif TARGET_SKILLS > 0:
-        return max(0.0, (skill_count / TARGET_SKILLS) * WEIGHT_SKILL * USER_SKILL_WEIGHT)
+def calculate_skill_score(skill_count: int, params: Dict) -> float:
+    target, weight = params['target_skills'], params['weight_skill'] * params['user_skill_weight']
+    if skill_count >= target:
+        return weight
+    elif target > 0:
+        return max(0.0, (skill_count / target) * weight)
     return 0.0
 
-def calculate_months_score(total_months: int, score_jd: float) -> float:
-    factor = (score_jd / WEIGHT_JD)
-    target = TARGET_MONTHS_EXPERIENCE
+def calculate_months_score(total_months: int, score_jd: float, params: Dict) -> float:
+    factor = (score_jd / params['weight_jd'])
+    target = params['target_months_experience']
+    weight = params['weight_months'] * params['user_experience_weight']
     if total_months >= target:
-        return WEIGHT_MONTHS * USER_EXPERIENCE_WEIGHT * factor 
+        return weight * factor
     elif target > 0:
-        return max(0.0, (total_months / target) * WEIGHT_MONTHS * USER_EXPERIENCE_WEIGHT * factor)
+        return max(0.0, (total_months / target) * weight * factor)
     return 0.0
 
-def calculate_word_score(word_count: int) -> float:
-    if word_count >= TARGET_WORD_COUNT:
-        return WEIGHT_WORD
-    elif TARGET_WORD_COUNT > 0:
-        return max(0.0, (word_count / TARGET_WORD_COUNT) * WEIGHT_WORD)
+def calculate_word_score(word_count: int, params: Dict) -> float:
+    target, weight = params['target_word_count'], params['weight_word']
+    if word_count >= target:
+        return weight
+    elif target > 0:
+        return max(0.0, (word_count / target) * weight)
     return 0.0
 
-def calculate_gpa_score(gpa: Optional[float]) -> float:
+def calculate_gpa_score(gpa: Optional[float], params: Dict) -> float:
     if gpa is None:
         return 0.0
-    if gpa >= TARGET_GPA:
-        return WEIGHT_GPA
-    elif TARGET_GPA > 0:
-        return max(0.0, (gpa / TARGET_GPA) * WEIGHT_GPA)
+    target, weight = params['target_gpa'], params['weight_gpa']
+    if gpa >= target:
+        return weight
+    elif target > 0:
+        return max(0.0, (gpa / target) * weight)
     return 0.0
 
 def calculate_final_score(jd_similarity: float, skill_count: int, total_months: int,
-                         word_count: int, gpa: Optional[float], details: Dict) -> float:
-    score_jd = calculate_jd_score(jd_similarity)
-    score_skill = calculate_skill_score(skill_count)
-    score_months = calculate_months_score(total_months, score_jd)
-    score_word = calculate_word_score(word_count)
-    score_gpa = calculate_gpa_score(gpa)
+                         word_count: int, gpa: Optional[float], details: Dict,
+                         params: Optional[Dict] = None) -> float:
+    params = params or scoring_params()
+    score_jd = calculate_jd_score(jd_similarity, params)
+    score_skill = calculate_skill_score(skill_count, params)
+    score_months = calculate_months_score(total_months, score_jd, params)
+    score_word = calculate_word_score(word_count, params)
+    score_gpa = calculate_gpa_score(gpa, params)
 
     raw_score = score_jd + score_skill + score_months + score_word + score_gpa
 
-    max_score = MAX_SCORE_WITH_GPA if gpa is not None else MAX_SCORE_WITHOUT_GPA
+    max_score = params['max_score_with_gpa'] if gpa is not None else params['max_score_without_gpa']
 
     final_score = (raw_score / max_score) * 100.0 if max_score > 0 else 0.0
 
@@ -361,16 +446,94 @@ def calculate_final_score(jd_similarity: float, skill_count: int, total_months:
 
     return max(0.0, min(100.0, final_score))
 
+class TopN:
+    """Bounded min-heap keeping the `n` highest-scoring items seen so far."""
+    def __init__(self, n: int):
+        self.n = n
+        self._heap: List[Tuple[float, int, str, Dict]] = []
+        self._counter = itertools.count()
+
+    def push(self, score: float, key: str, details: Dict):
+        item = (score, next(self._counter), key, details)
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, item)
+        elif score > self._heap[0][0]:
+            heapq.heapreplace(self._heap, item)
+
+    def ranked(self) -> List[Tuple[str, Dict]]:
+        return [(key, details) for _, _, key, details in sorted(self._heap, key=lambda x: (-x[0], x[1]))]
+
+def unscored_details(file_path: Union[str, Path], matched_skills_map_title: Optional[str], relevant_skills: List[str], params: Dict) -> Dict:
+    """Placeholder details for a CV the time budget left no room for."""
+    return {
+        'file_path': str(file_path),
+        'matched_skills_map_title': matched_skills_map_title,
+        'target_skills_list': relevant_skills,
+        'error': "Not scored: time budget exhausted",
+        'score': 0.0,
+        'scan_status': 'unscored',
+        'config_version': params['config_version'],
+    }
+
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx", "openvino")
+# optional backends: modules they import and the pip extra that provides them
+BACKEND_EXTRAS = {
+    "onnx": (("optimum", "onnxruntime"), "optimum[onnxruntime]"),
+    "openvino": (("optimum", "openvino"), "optimum[openvino]"),
+}
+
+def missing_backend_extra(backend: str) -> Optional[str]:
+    """The pip requirement `backend` still needs, or None if it can be loaded."""
+    modules, extra = BACKEND_EXTRAS.get(backend.partition(":")[0], ((), None))
+    return extra if any(importlib.util.find_spec(m) is None for m in modules) else None
+
+def configured_backend() -> str:
+    """`embedding_backend` from config, or torch when its extra is not installed."""
+    backend = config_snapshot().get("embedding_backend", "torch")
+    extra = missing_backend_extra(backend)
+    if extra:
+        # a config switch must not take every page down; explicitly requested backends still fail
+        print(f"Warning: embedding_backend '{backend}' needs `pip install {extra}`; using torch.", file=sys.stderr)
+        return "torch"
+    return backend
+
+def load_embedding_model(model_id: str, device: str, backend: str = "torch", cache_folder: Union[str, Path] = "./models") -> SentenceTransformer:
+    """
+    Load a SentenceTransformer with one of EMBEDDING_BACKENDS. "torch-int8"
+    applies dynamic int8 quantization to the Linear layers (CPU only);
+    "onnx:<file>" loads a specific (e.g. quantized) ONNX file of the model.
+    """
+    Path(cache_folder).mkdir(parents=True, exist_ok=True)
+    name, _, file_name = backend.partition(":")
+    if name not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {EMBEDDING_BACKENDS}")
+    extra = missing_backend_extra(name)
+    if extra:
+        raise ValueError(f"Embedding backend '{backend}' needs `pip install {extra}`")
+    if name in ("onnx", "openvino"):
+        model_kwargs = {"file_name": file_name} if file_name else None
+        return SentenceTransformer(model_id, device=device, cache_folder=str(cache_folder), backend=name, model_kwargs=model_kwargs)
+    model = SentenceTransformer(model_id, device=device, cache_folder=str(cache_folder))
+    if name == "torch-int8":
+        if device != "cpu":
+            print(f"Warning: int8 dynamic quantization runs on CPU only; using '{model_id}' unquantized on {device}.", file=sys.stderr)
+        else:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
 class CVScanner:
-    def __init__(self, model_id: str = "BAAI/bge-large-en-v1.5", batch_size: int = 128, spacy_package: str = "en_core_web_sm"):
+    def __init__(self, model_id: str = "BAAI/bge-large-en-v1.5", batch_size: int = 128, spacy_package: str = "en_core_web_sm", backend: Optional[str] = None):
+        apply_thread_limits()
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
         print(f"Info: Using device: {self.device}")
+        backend = backend or configured_backend()
         try:
-            models_cache_dir = Path("./models")
-            models_cache_dir.mkdir(parents=True, exist_ok=True)
-            print(f"Info: Loading Sentence Transformer model '{model_id}'...")
-            self.model = SentenceTransformer(model_id, device=self.device, cache_folder=str(models_cache_dir))
-            print(f"Info: Sentence Transformer model loaded.")
+            print(f"Info: Loading Sentence Transformer model '{model_id}' ({backend})...")
+            load_start = time.perf_counter()
+            self.model = load_embedding_model(model_id, self.device, backend)
+            load_s = time.perf_counter() - load_start
+            metrics_utils.set_gauge("ads_model_load_seconds", load_s, model=model_id, kind="embedding")
+            print(f"Info: Sentence Transformer model loaded in {load_s:.1f}s.")
         except Exception as e:
             print(f"Error: Failed to load Sentence Transformer model '{model_id}': {e}", file=sys.stderr)
             print("Ensure the model name is correct and dependencies are installed.", file=sys.stderr)
@@ -381,40 +544,53 @@ class CVScanner:
                  print(f"Info: SpaCy model '{spacy_package}' not found. Downloading...")
                  spacy.cli.download(spacy_package)
             print(f"Info: Loading SpaCy model '{spacy_package}'...")
+            load_start = time.perf_counter()
             self.nlp = spacy.load(spacy_package, disable=['parser', 'ner', 'textcat'])
-            print(f"Info: SpaCy model loaded.")
+            load_s = time.perf_counter() - load_start
+            metrics_utils.set_gauge("ads_model_load_seconds", load_s, model=spacy_package, kind="spacy")
+            print(f"Info: SpaCy model loaded in {load_s:.1f}s.")
         except Exception as e:
             print(f"Error: Failed to load SpaCy model '{spacy_package}': {e}", file=sys.stderr)
             print("Ensure the package name is correct and installed.", file=sys.stderr)
             raise
 
         self.batch_size = batch_size
+        self.model_key = f"{model_id}@{backend}"
+        self.last_scan_summary: Optional[Dict] = None
+        self._role_embedding_cache: Dict[str, "np.ndarray"] = {}
+        self._chunkers: Dict[Tuple[int, int], ChunkEmbedder] = {}
 
     def extract_text_from_pdf(self, pdf_path: Union[str, Path]) -> str:
-        try:
-            doc = pymupdf.open(pdf_path)
-            text_content = []
-            for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    blocks = page.get_text("blocks", sort=True)
-                    page_text = " ".join([b[4].replace('\n', ' ').strip() for b in blocks if len(b[4].strip()) > 10])
-                    text_content.append(page_text)
-            doc.close()
-            full_text = "\n".join(text_content)
-            full_text = re.sub(r'\s*\n\s*', '\n', full_text)
-            full_text = re.sub(r'-\n(\w)', r'\1', full_text)
-            full_text = re.sub(r'\s+', ' ', full_text)
-            return full_text.strip()
-        except Exception as e:
-            print(f"Error reading PDF '{pdf_path}': {e}")
-            return ""
+        return extract_pdf_text(pdf_path)
 
     def normalize_cv_text(self, text: str) -> str:
         return re.sub(r'\s+', ' ', text).strip().lower()
 
-    def calculate_similarity(self, text1: str, text2: str) -> float:
+    def chunker(self, params: Optional[Dict] = None) -> Optional[ChunkEmbedder]:
+        """The ChunkEmbedder for `params`' chunk settings, or None when chunking is off."""
+        if not params or not params.get('embedding_chunking'):
+            return None
+        key = (params['embedding_chunk_tokens'], params['embedding_chunk_overlap'])
+        if key not in self._chunkers:
+            self._chunkers[key] = ChunkEmbedder(self.model, self.model_key, self.device, self.batch_size, *key)
+        return self._chunkers[key]
+
+    def _pooled_similarities(self, chunker: ChunkEmbedder, queries: List[str], texts: List[str], params: Dict) -> "np.ndarray":
+        """(texts x queries) chunk-pooled similarities; empty texts score 0."""
+        sims = np.zeros((len(texts), len(queries)))
+        present = [i for i, text in enumerate(texts) if text]
+        if present and queries:
+            query_embeddings = self.model.encode(queries, normalize_embeddings=True, device=self.device, batch_size=self.batch_size)
+            sims[present] = chunker.similarities(
+                query_embeddings, [texts[i] for i in present], params['embedding_pooling'], params['embedding_pooling_top_k']
+            )
+        return np.clip(sims, 0.0, 1.0)
+
+    def calculate_similarity(self, text1: str, text2: str, params: Optional[Dict] = None) -> float:
         if not text1 or not text2:
             return 0.0
+        if self.chunker(params) is not None:
+            return self.calculate_similarities(text1, [text2], params)[0]
         try:
             embeddings = self.model.encode(
                 [text1, text2],
@@ -428,23 +604,65 @@ class CVScanner:
             print(f"Error calculating sentence similarity: {e}", file=sys.stderr)
             return 0.0
 
-    def scan(self, req_text: str, pdf_dir: Path, job_skills_map: Dict[str, List[str]], target_job_title: Optional[str] = None, pdf_list: Optional[List[str]] = None) -> Dict[str, Dict]:
-        pdf_dir = Path(pdf_dir)
-        if not pdf_dir.is_dir():
-            print(f"Error: PDF directory not found: '{pdf_dir}'", file=sys.stderr)
-            return {}
-
-        if pdf_list:
-            file_paths = [pdf_dir / fname for fname in pdf_list]
-        else:
-            file_paths = sorted(pdf_dir.glob("*.pdf"))
-
-        if not file_paths:
-            print(f"Warning: No PDF files found in '{pdf_dir}' (pdf_list={pdf_list})", file=sys.stderr)
-            return {}
+    def calculate_similarities(self, query: str, texts: List[str], params: Optional[Dict] = None) -> List[float]:
+        """
+        Cosine similarity of `query` against each text, encoded in one batched
+        call. With chunking on in `params`, long texts are split into token
+        windows and their chunk similarities pooled.
+        """
+        if not query or not texts:
+            return [0.0] * len(texts)
+        try:
+            chunker = self.chunker(params)
+            if chunker is not None:
+                return [float(sim) for sim in self._pooled_similarities(chunker, [query], texts, params)[:, 0]]
+            embeddings = self.model.encode(
+                [query] + texts,
+                normalize_embeddings=True,
+                device=self.device,
+                batch_size=self.batch_size
+            )
+            sims = embeddings[1:] @ embeddings[0].T
+            return [max(0.0, min(1.0, float(sim))) if text else 0.0 for sim, text in zip(sims, texts)]
+        except Exception as e:
+            print(f"Error calculating sentence similarity: {e}", file=sys.stderr)
+            return [0.0] * len(texts)
 
-        print(f"Info: Found {len(file_paths)} PDF files to scan.")
+    def calculate_pair_similarities(self, queries: List[str], texts: List[str], params: Optional[Dict] = None) -> List[float]:
+        """
+        Cosine similarity of queries[i] against texts[i]. Distinct queries and
+        all texts are encoded together in one batched call.
+        """
+        if not texts:
+            return []
+        unique_queries = list(dict.fromkeys(q for q in queries if q))
+        try:
+            chunker = self.chunker(params)
+            if chunker is not None:
+                sims = self._pooled_similarities(chunker, unique_queries, texts, params)
+                query_cols = {q: i for i, q in enumerate(unique_queries)}
+                return [float(sims[i, query_cols[q]]) if q else 0.0 for i, q in enumerate(queries)]
+            embeddings = self.model.encode(
+                unique_queries + texts,
+                normalize_embeddings=True,
+                device=self.device,
+                batch_size=self.batch_size
+            )
+            query_rows = {q: i for i, q in enumerate(unique_queries)}
+            sims = []
+            for i, (query, text) in enumerate(zip(queries, texts)):
+                if not query or not text:
+                    sims.append(0.0)
+                    continue
+                sim = float(embeddings[len(unique_queries) + i] @ embeddings[query_rows[query]].T)
+                sims.append(max(0.0, min(1.0, sim)))
+            return sims
+        except Exception as e:
+            print(f"Error calculating sentence similarity: {e}", file=sys.stderr)
+            return [0.0] * len(texts)
 
+    def resolve_target_skills(self, req_text: str, job_skills_map: Dict[str, List[str]], target_job_title: Optional[str] = None, params: Optional[Dict] = None) -> Tuple[Optional[str], List[str]]:
+        """Pick the skills-map entry for the job title. Returns (matched_title, skills)."""
         final_title_to_match = None
         if target_job_title:
              final_title_to_match = normalize_text(target_job_title)
@@ -468,7 +686,7 @@ class CVScanner:
                 job_skills_map.keys(),
                 scorer=fuzz.token_sort_ratio
             )
-            if match_result and match_result[1] >= FUZZY_TITLE_MATCH_THRESHOLD:
+            if match_result and match_result[1] >= (params or scoring_params())['fuzzy_title_match_threshold']:
                 matched_skills_map_title = match_result[0]
                 relevant_skills = job_skills_map[matched_skills_map_title]
                 print(f"Info: Matched title '{final_title_to_match}' to skills map title '{matched_skills_map_title}' (Score: {match_result[1]}). Using {len(relevant_skills)} skills.")
@@ -480,70 +698,397 @@ class CVScanner:
         elif not job_skills_map:
              print("Info: Job skills map is empty, skipping skill extraction.")
 
-        judgements: Dict[str, Dict] = {}
-        normalized_req_text = self.normalize_cv_text(req_text)
+        return matched_skills_map_title, relevant_skills
 
-        for i, file_path in enumerate(file_paths):
-            # st.info(f"\n--- Processing CV {i+1}/{len(file_paths)}: {file_path.name} ---")
-            cv_text_raw = self.extract_text_from_pdf(file_path)
+    def score_cv_text(self, cv_text_raw: str, normalized_req_text: str, relevant_skills: List[str], details: Dict, jd_similarity: Optional[float] = None, empty_error: str = "PDF text extraction failed", timer: Optional[StageTimer] = None, params: Optional[Dict] = None, deadline: Optional[float] = None) -> Dict:
+        """
+        Extract features from one CV's text and score it, filling `details`.
+        `jd_similarity` may be passed in when it was computed in a batch.
+        Per-stage wall/CPU times end up in details['timings']. Past `deadline`
+        (a time.perf_counter() value) the expensive stages still to run are
+        skipped, scored as zero and listed in details['skipped_stages'].
+        """
+        timer = timer or StageTimer()
+        params = params or scoring_params()
+        details['config_version'] = params['config_version']
+        details['scan_status'] = 'scored'
+        details['skipped_stages'] = []
+        details['timings'] = timer.timings
+
+        def out_of_time(stage: str) -> bool:
+            if deadline is None or time.perf_counter() < deadline:
+                return False
+            details['skipped_stages'].append(stage)
+            details['scan_status'] = 'partial'
+            return True
+
+        details['cv_text_raw_len'] = len(cv_text_raw)
+        if not cv_text_raw:
+            details['error'] = empty_error
+            return {'score': 0.0, **details}
+
+        with timer.stage('normalize'):
+            normalized_cv_text = self.normalize_cv_text(cv_text_raw)
+        if not normalized_cv_text:
+            details['error'] = "CV text empty after normalization"
+            return {'score': 0.0, **details}
 
+        if jd_similarity is None:
+            if out_of_time('embedding'):
+                jd_similarity = 0.0
+            else:
+                with timer.stage('embedding'):
+                    jd_similarity = self.calculate_similarity(normalized_req_text, normalized_cv_text, params)
+        details['jd_similarity'] = jd_similarity
+
+        matched_skills: List[str] = []
+        if not out_of_time('skills'):
+            with timer.stage('skills'):
+                matched_skills = extract_skills_fuzzy(self.nlp, cv_text_raw, relevant_skills)
+        details['matched_skills_list'] = matched_skills
+        details['matched_skills_count'] = len(matched_skills)
+
+        total_months = 0
+        if not out_of_time('experience'):
+            with timer.stage('experience'):
+                total_months = extract_total_months_experience(cv_text_raw)
+        details['total_months_experience'] = total_months
+
+        word_count = extract_word_count(normalized_cv_text)
+        details['word_count'] = word_count
+
+        with timer.stage('gpa'):
+            gpa = extract_gpa(cv_text_raw)
+        details['gpa'] = gpa
+
+        with timer.stage('score'):
+            final_score = calculate_final_score(jd_similarity, len(matched_skills), total_months, word_count, gpa, details, params)
+        details['score'] = final_score
+        return details
+
+    def score_roles(self, cv_text_raw: str, job_skills_map: Dict[str, List[str]], job_descriptions: Optional[Dict[str, str]] = None, params: Optional[Dict] = None) -> List[Dict]:
+        """
+        Role fit: score one CV against every title in `job_skills_map`.
+        The CV is normalized, lemmatized and embedded once; JD similarity for
+        all titles comes from a single matrix product. Titles without a stored
+        JD in `job_descriptions` are compared against "<title>: <skills>".
+        Returns one dict per title, best fit first.
+        """
+        if not cv_text_raw or not job_skills_map:
+            return []
+        params = params or scoring_params()
+        job_descriptions = {normalize_text(t): jd for t, jd in (job_descriptions or {}).items() if jd}
+
+        normalized_cv_text = self.normalize_cv_text(cv_text_raw)
+        lemmas, text_norm = cv_lemmas(self.nlp, cv_text_raw)
+        total_months = extract_total_months_experience(cv_text_raw)
+        word_count = extract_word_count(normalized_cv_text)
+        gpa = extract_gpa(cv_text_raw)
+
+        titles = list(job_skills_map)
+        role_texts = [
+            self.normalize_cv_text(job_descriptions.get(normalize_text(t)) or f"{t}: {', '.join(job_skills_map[t])}")
+            for t in titles
+        ]
+        role_embeddings = self._role_embeddings(role_texts)
+        chunker = self.chunker(params)
+        if chunker is not None:
+            similarities = chunker.similarities(
+                role_embeddings, [normalized_cv_text], params['embedding_pooling'], params['embedding_pooling_top_k']
+            )[0]
+        else:
+            similarities = role_embeddings @ self.model.encode(
+                [normalized_cv_text], normalize_embeddings=True, device=self.device, batch_size=self.batch_size
+            )[0]
+        similarities = np.clip(similarities, 0.0, 1.0)
+
+        roles = []
+        for title, similarity in zip(titles, similarities):
+            matched_skills = get_skill_matcher(job_skills_map[title]).match(lemmas, text_norm)
             details = {
-                'file_path': str(file_path),
-                'matched_skills_map_title': matched_skills_map_title,
-                'target_skills_list': relevant_skills,
-                'cv_text_raw_len': len(cv_text_raw),
-                'error': None
+                'job_title': title,
+                'has_jd': normalize_text(title) in job_descriptions,
+                'jd_similarity': float(similarity),
+                'matched_skills_list': matched_skills,
+                'matched_skills_count': len(matched_skills),
+                'total_months_experience': total_months,
+                'word_count': word_count,
+                'gpa': gpa,
+                'config_version': params['config_version'],
             }
+            details['score'] = calculate_final_score(float(similarity), len(matched_skills), total_months, word_count, gpa, details, params)
+            roles.append(details)
+        return sorted(roles, key=lambda d: d['score'], reverse=True)
 
-            if not cv_text_raw:
-                # st.info("Warning: Could not extract text from PDF. Assigning score 0.", file=sys.stderr)
-                details['error'] = "PDF text extraction failed"
-                judgements[str(file_path)] = {'score': 0.0, **details}
+    def requirement_coverage(self, req_text: str, cv_texts: List[str], params: Optional[Dict] = None) -> List[Dict]:
+        """
+        Which JD requirement lines each CV covers, and with which sentence.
+        Requirement embeddings come from the role-embedding cache; the
+        sentences of all CVs are encoded in one call and compared with one
+        (sentences x requirements) matrix product. A requirement is covered
+        when its best sentence reaches `requirement_coverage_threshold`.
+        Returns per CV {'coverage_ratio', 'requirement_coverage': [...]};
+        CVs without text get no coverage.
+        """
+        params = params or scoring_params()
+        requirements = split_requirements(req_text)
+        sentences = [split_sentences(text) for text in cv_texts]
+        if not requirements:
+            return [{'coverage_ratio': None, 'requirement_coverage': []} for _ in cv_texts]
+
+        threshold = params['requirement_coverage_threshold']
+        requirement_embeddings = self._role_embeddings([self.normalize_cv_text(r) for r in requirements])
+        flat = [self.normalize_cv_text(sentence) for cv_sentences in sentences for sentence in cv_sentences]
+        if flat:
+            sentence_embeddings = self.model.encode(flat, normalize_embeddings=True, device=self.device, batch_size=self.batch_size)
+            block = np.asarray(sentence_embeddings) @ requirement_embeddings.T
+        else:
+            block = np.zeros((0, len(requirements)))
+
+        coverage = []
+        start = 0
+        for text, cv_sentences in zip(cv_texts, sentences):
+            rows = block[start:start + len(cv_sentences)]
+            start += len(cv_sentences)
+            if not text.strip():
+                coverage.append({'coverage_ratio': None, 'requirement_coverage': []})
                 continue
+            if not cv_sentences:
+                items = [{'requirement': r, 'similarity': 0.0, 'covered': False, 'evidence': None} for r in requirements]
+            else:
+                best = rows.argmax(axis=0)
+                items = [
+                    {
+                        'requirement': requirement,
+                        'similarity': float(max(0.0, min(1.0, rows[best[j], j]))),
+                        'covered': bool(rows[best[j], j] >= threshold),
+                        'evidence': cv_sentences[best[j]],
+                    }
+                    for j, requirement in enumerate(requirements)
+                ]
+            coverage.append({
+                'coverage_ratio': sum(item['covered'] for item in items) / len(items),
+                'requirement_coverage': items,
+            })
+        return coverage
+
+    def _role_embeddings(self, role_texts: List[str]) -> "np.ndarray":
+        """Embeddings for role texts, cached on the scanner since JDs rarely change."""
+        cache = self._role_embedding_cache
+        missing = [t for t in dict.fromkeys(role_texts) if t not in cache]
+        if missing:
+            if len(cache) + len(missing) > ROLE_EMBEDDING_CACHE_SIZE:
+                cache.clear()
+            encoded = self.model.encode(missing, normalize_embeddings=True, device=self.device, batch_size=self.batch_size)
+            cache.update(zip(missing, encoded))
+        return np.vstack([cache[t] for t in role_texts])
+
+    def scan_file(self, file_path: Union[str, Path], normalized_req_text: str, matched_skills_map_title: Optional[str], relevant_skills: List[str], parsed: Optional[Tuple[str, float, float]] = None, params: Optional[Dict] = None, deadline: Optional[float] = None, jd_similarity: Optional[float] = None, timer: Optional[StageTimer] = None) -> Dict:
+        """
+        Parse and score a single PDF. Returns its details dict. `parsed` is
+        a (text, wall, cpu) result from parse_pdf when it ran in the parse pool;
+        `jd_similarity` (and `timer` holding its share of the encode) when it
+        was computed for a group of CVs.
+        """
+        timer = timer or StageTimer()
+        cv_text_raw, parse_wall, parse_cpu = parsed if parsed is not None else parse_pdf(file_path)
+        timer.add('parse', parse_wall, parse_cpu)
+
+        details = {
+            'file_path': str(file_path),
+            'matched_skills_map_title': matched_skills_map_title,
+            'target_skills_list': relevant_skills,
+            'error': None
+        }
+        return self.score_cv_text(cv_text_raw, normalized_req_text, relevant_skills, details, jd_similarity=jd_similarity, timer=timer, params=params, deadline=deadline)
+
+    def _group_similarities(self, normalized_req_text: str, parsed_group: List[Optional[Tuple[str, float, float]]], params: Dict) -> List[Tuple[Optional[float], StageTimer]]:
+        """
+        JD similarity of a group of parsed CVs from one encode call (shared
+        chunk batches when chunking is on), with the encode time split evenly
+        over the CVs. Empty or unparsed CVs get None.
+        """
+        texts = [self.normalize_cv_text(parsed[0]) if parsed is not None and parsed[0] else "" for parsed in parsed_group]
+        timers = [StageTimer() for _ in texts]
+        embedded = [i for i, text in enumerate(texts) if text]
+        if not embedded:
+            return [(None, timer) for timer in timers]
+        batch_timer = StageTimer()
+        with batch_timer.stage('embedding'):
+            sims = self.calculate_similarities(normalized_req_text, [texts[i] for i in embedded], params)
+        embed = batch_timer.timings['embedding']
+        out: List[Tuple[Optional[float], StageTimer]] = [(None, timer) for timer in timers]
+        for i, sim in zip(embedded, sims):
+            timers[i].add('embedding', embed['wall'] / len(embedded), embed['cpu'] / len(embedded))
+            out[i] = (sim, timers[i])
+        return out
+
+    def iter_scan(self, req_text: str, pdf_dir: Path, job_skills_map: Dict[str, List[str]], target_job_title: Optional[str] = None, pdf_list: Optional[List[str]] = None, progress_callback: Optional[Callable[[int, int, str, Dict], None]] = None, params: Optional[Dict] = None, time_budget_s: Optional[float] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Streaming scan: yields (pdf_path_str, details) as each CV finishes,
+        in input order. `progress_callback(done, total, pdf_path_str, details)`
+        is called after every CV. With `time_budget_s`, a CV in progress when
+        the budget runs out skips its remaining expensive stages
+        (scan_status "partial") and later CVs are not parsed at all
+        (scan_status "unscored", score 0).
+        """
+        pdf_dir = Path(pdf_dir)
+        if not pdf_dir.is_dir():
+            print(f"Error: PDF directory not found: '{pdf_dir}'", file=sys.stderr)
+            return
 
-            normalized_cv_text = self.normalize_cv_text(cv_text_raw)
-            if not normalized_cv_text:
-                # st.info("Warning: Normalized CV text is empty. Assigning score 0.", file=sys.stderr)
-                details['error'] = "CV text empty after normalization"
-                judgements[str(file_path)] = {'score': 0.0, **details}
-                continue
+        if pdf_list:
+            file_paths = [pdf_dir / fname for fname in pdf_list]
+        else:
+            try:
+                file_paths = list_pdfs(pdf_dir)
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return
 
-            # st.info("Calculating JD similarity...")
-            jd_similarity = self.calculate_similarity(normalized_req_text, normalized_cv_text)
-            details['jd_similarity'] = jd_similarity
-            # st.info(f"JD Similarity: {jd_similarity:.3f}")
-
-            # st.info(f"Extracting skills (using {len(relevant_skills)} target skills)...")
-            # st.info(f"[cv_text_raw]: {cv_text_raw}")
-            # st.info(f"[relevant_skills]:  {relevant_skills}")
-            matched_skills = extract_skills_fuzzy(self.nlp, cv_text_raw, relevant_skills)
-            details['matched_skills_list'] = matched_skills
-            details['matched_skills_count'] = len(matched_skills)
-            # st.info(f"Matched Skills ({len(matched_skills)}): {', '.join(matched_skills) if matched_skills else 'None'}")
-
-            # st.info("Calculating total months experience...")
-            total_months = extract_total_months_experience(cv_text_raw)
-            details['total_months_experience'] = total_months
-            # st.info(f"Total Experience: {total_months} months")
-
-            word_count = extract_word_count(normalized_cv_text)
-            details['word_count'] = word_count
-            # st.info(f"Word Count: {word_count}")
-
-            # st.info("Extracting GPA...")
-            gpa = extract_gpa(cv_text_raw)
-            details['gpa'] = gpa
-            # st.info(f"GPA: {gpa if gpa is not None else 'Not Found'}")
+        if not file_paths:
+            print(f"Warning: No PDF files found in '{pdf_dir}' (pdf_list={pdf_list})", file=sys.stderr)
+            return
+
+        print(f"Info: Found {len(file_paths)} PDF files to scan.")
 
-            # st.info("Calculating final score...")
-            final_score = calculate_final_score(jd_similarity, len(matched_skills), total_months, word_count, gpa, details)
-            details['score'] = final_score
-            # st.info(f"--- Final Score for {file_path.name}: {final_score:.2f} ---")
+        # one config snapshot for the whole scan, even if config.yaml is saved meanwhile
+        params = params or scoring_params()
+        matched_skills_map_title, relevant_skills = self.resolve_target_skills(req_text, job_skills_map, target_job_title, params)
 
-            judgements[str(file_path)] = details
+        normalized_req_text = self.normalize_cv_text(req_text)
+        scan_start = time.perf_counter()
+        deadline = scan_start + time_budget_s if time_budget_s else None
+        timings: List[Dict] = []
+        unscored = 0
+
+        # PDFs are parsed ahead in the parse pool (if configured) while this thread scores.
+        # CVs are embedded in groups so the model sees full batches; budgeted scans
+        # go one CV at a time so a group's parsing cannot overrun the budget.
+        parsed_texts = iter_parsed(file_paths, parse_workers())
+        group_size = 1 if deadline is not None else SCAN_EMBED_GROUP
+        i = 0
+        for group_start in range(0, len(file_paths), group_size):
+            group = []
+            for file_path in file_paths[group_start:group_start + group_size]:
+                out_of_budget = deadline is not None and time.perf_counter() >= deadline
+                group.append((file_path, None if out_of_budget else next(parsed_texts)))
+            if group_size > 1:
+                similarities = self._group_similarities(normalized_req_text, [parsed for _, parsed in group], params)
+            else:
+                similarities = [(None, None)]
+            coverage = [None] * len(group)
+            if params['requirement_coverage'] and not (deadline is not None and time.perf_counter() >= deadline):
+                coverage = self.requirement_coverage(req_text, [parsed[0] if parsed else "" for _, parsed in group], params)
+            for (file_path, parsed), (jd_similarity, timer), cv_coverage in zip(group, similarities, coverage):
+                i += 1
+                if parsed is None:
+                    details = unscored_details(file_path, matched_skills_map_title, relevant_skills, params)
+                    unscored += 1
+                else:
+                    details = self.scan_file(file_path, normalized_req_text, matched_skills_map_title, relevant_skills, parsed=parsed, params=params, deadline=deadline, jd_similarity=jd_similarity, timer=timer)
+                    if cv_coverage is not None:
+                        details.update(cv_coverage)
+                    timings.append(details.get('timings'))
+                if progress_callback is not None:
+                    progress_callback(i, len(file_paths), str(file_path), details)
+                yield str(file_path), details
+
+        if unscored:
+            print(f"Warning: Time budget of {time_budget_s}s ran out; {unscored} of {len(file_paths)} CVs left unscored.", file=sys.stderr)
+        self._record_scan_summary(timings, time.perf_counter() - scan_start)
+
+    def scan(self, req_text: str, pdf_dir: Path, job_skills_map: Dict[str, List[str]], target_job_title: Optional[str] = None, pdf_list: Optional[List[str]] = None, progress_callback: Optional[Callable[[int, int, str, Dict], None]] = None, params: Optional[Dict] = None, time_budget_s: Optional[float] = None) -> Dict[str, Dict]:
+        """All CVs ranked by score; CVs left unscored by `time_budget_s` come last."""
+        judgements: Dict[str, Dict] = dict(
+            self.iter_scan(req_text, pdf_dir, job_skills_map, target_job_title, pdf_list, progress_callback, params, time_budget_s)
+        )
+        return dict(sorted(judgements.items(), key=lambda item: (item[1].get('scan_status') == 'unscored', -item[1]['score'])))
+
+    def scan_top_n(self, req_text: str, pdf_dir: Path, job_skills_map: Dict[str, List[str]], top_n: int, target_job_title: Optional[str] = None, pdf_list: Optional[List[str]] = None, progress_callback: Optional[Callable[[int, int, str, Dict], None]] = None, params: Optional[Dict] = None, time_budget_s: Optional[float] = None) -> List[Tuple[str, Dict]]:
+        """Best `top_n` CVs, highest score first; memory stays bounded by `top_n`."""
+        ranking = TopN(top_n)
+        for path_str, details in self.iter_scan(req_text, pdf_dir, job_skills_map, target_job_title, pdf_list, progress_callback, params, time_budget_s):
+            ranking.push(details['score'], path_str, details)
+        return ranking.ranked()
+
+    def _record_scan_summary(self, timings: List[Optional[Dict]], wall_s: float):
+        """Keep a scan-level timing summary on the scanner (see `last_scan_summary`) and update the metrics."""
+        for cv_timings in timings:
+            if not cv_timings:
+                continue
+            for stage, t in cv_timings.items():
+                metrics_utils.observe("ads_scan_stage_seconds", t.get("wall") or 0.0, stage=stage)
+            metrics_utils.observe("ads_cv_scan_seconds", sum(t.get("wall") or 0.0 for t in cv_timings.values()))
+        metrics_utils.observe("ads_scan_seconds", wall_s)
+        metrics_utils.inc("ads_scans_total")
+        metrics_utils.inc("ads_pdfs_scanned_total", len(timings))
+        if wall_s > 0:
+            metrics_utils.set_gauge("ads_scan_pdfs_per_second", len(timings) / wall_s)
+        self.last_scan_summary = {
+            'cvs': len(timings),
+            'wall_s': wall_s,
+            'cvs_per_sec': len(timings) / wall_s if wall_s > 0 else 0.0,
+            'stages': summarize_timings(timings),
+        }
+        print(f"Info: Scanned {len(timings)} CVs in {wall_s:.2f}s.")
+
+    def scan_texts(self, req_text: str, texts: Iterable[Tuple[str, str]], job_skills_map: Dict[str, List[str]], target_job_title: Optional[str] = None, params: Optional[Dict] = None) -> Dict[str, Dict]:
+        """
+        Score already-extracted resume texts given as (id, text) pairs with
+        the same features and scores as `scan`. JD similarities for the whole
+        batch are computed in one encode call. For corpora too large to hold
+        in memory, feed this in chunks (see services/importer.py).
+        Returns: { id: details_dict } sorted by details['score'] desc.
+        """
+        items = [(str(doc_id), text if isinstance(text, str) else "") for doc_id, text in texts]
+        if not items:
+            return {}
 
+        params = params or scoring_params()
+        matched_skills_map_title, relevant_skills = self.resolve_target_skills(req_text, job_skills_map, target_job_title, params)
+        normalized_req_text = self.normalize_cv_text(req_text)
+        scan_start = time.perf_counter()
+        batch_timer = StageTimer()
+        with batch_timer.stage('embedding'):
+            similarities = self.calculate_similarities(
+                normalized_req_text, [self.normalize_cv_text(text) for _, text in items], params
+            )
+        coverage = [None] * len(items)
+        if params['requirement_coverage']:
+            with batch_timer.stage('embedding'):
+                coverage = self.requirement_coverage(req_text, [text for _, text in items], params)
+        # the batched encode is attributed evenly to every CV in the batch
+        embed = batch_timer.timings['embedding']
+
+        judgements: Dict[str, Dict] = {}
+        for (doc_id, text), jd_similarity, cv_coverage in zip(items, similarities, coverage):
+            timer = StageTimer()
+            timer.add('embedding', embed['wall'] / len(items), embed['cpu'] / len(items))
+            details = {
+                'doc_id': doc_id,
+                'file_path': None,
+                'matched_skills_map_title': matched_skills_map_title,
+                'target_skills_list': relevant_skills,
+                'error': None
+            }
+            judgements[doc_id] = self.score_cv_text(text, normalized_req_text, relevant_skills, details, jd_similarity=jd_similarity, empty_error="CV text empty", timer=timer, params=params)
+            if cv_coverage is not None:
+                judgements[doc_id].update(cv_coverage)
+
+        self._record_scan_summary([d.get('timings') for d in judgements.values()], time.perf_counter() - scan_start)
         return dict(sorted(judgements.items(), key=lambda item: item[1]['score'], reverse=True))
 
+_SCANNERS: Dict[Tuple[str, str, str], CVScanner] = {}
+
+def get_scanner(model_id: str = "BAAI/bge-large-en-v1.5", spacy_model: str = "en_core_web_sm", backend: Optional[str] = None) -> CVScanner:
+    """Process-wide CVScanner per (model, spaCy package, backend); models load only on first use."""
+    backend = backend or configured_backend()
+    key = (model_id, spacy_model, backend)
+    if key not in _SCANNERS:
+        _SCANNERS[key] = CVScanner(model_id=model_id, spacy_package=spacy_model, backend=backend)
+    return _SCANNERS[key]
+
 def run_cv_scanner(
     skills_file_path: Union[str, Path],
     job_description: str,
@@ -554,71 +1099,251 @@ def run_cv_scanner(
     job_title: Optional[str] = None,
     model_id: str = "BAAI/bge-large-en-v1.5",
     spacy_model: str = "en_core_web_sm",
+    profiler: Optional[str] = None,
+    profile_path: Optional[Union[str, Path]] = None,
+    progress_callback: Optional[Callable[[int, int, str, Dict], None]] = None,
+    time_budget_s: Optional[float] = None,
 ) -> Dict[str, Dict]:
     """
     1) Loads skills map from a pipe-delimited CSV.
     2) Uses the provided job_description text.
-    3) Instantiates CVScanner with the given model & spaCy package.
+    3) Reuses the loaded CVScanner for the given model & spaCy package.
     4) Scans only the PDFs you care about (either all in pdf_folder or just those in pdf_list).
+    With `profiler` ("cprofile" or "pyinstrument") the scan runs under that
+    profiler and a report is written to `profile_path`.
+    `progress_callback(done, total, pdf_path_str, details)` is called as each CV finishes.
+    `time_budget_s` bounds the scan itself (not the wait for a scan slot);
+    see CVScanner.iter_scan for how CVs past the budget are marked.
     Returns: { pdf_path_str: details_dict } sorted by details['score'] desc.
     """
-    # override the globals with what was passed in global USER_SKILL_WEIGHT, USER_EXPERIENCE_WEIGHT
-    global USER_SKILL_WEIGHT, USER_EXPERIENCE_WEIGHT
-    global TARGET_MONTHS_EXPERIENCE
-    global MAX_SCORE_WITH_GPA, MAX_SCORE_WITHOUT_GPA
-
-    global USER_SKILL_WEIGHT, USER_EXPERIENCE_WEIGHT
-    global TARGET_MONTHS_EXPERIENCE, MAX_SCORE_WITH_GPA, MAX_SCORE_WITHOUT_GPA
-
-    # 1) override
-    if user_skill_weight is not None:
-        USER_SKILL_WEIGHT = user_skill_weight
-    if user_experience_weight is not None:
-        USER_EXPERIENCE_WEIGHT = user_experience_weight
-
-    # 2) recompute everything that depends on those two
-    TARGET_MONTHS_EXPERIENCE = _cfg["target_months_base"] * USER_EXPERIENCE_WEIGHT
-
-    MAX_SCORE_WITH_GPA = (
-        WEIGHT_JD
-        + WEIGHT_SKILL * USER_SKILL_WEIGHT
-        + WEIGHT_MONTHS * USER_EXPERIENCE_WEIGHT
-        + WEIGHT_WORD
-        + WEIGHT_GPA
-    )
-    MAX_SCORE_WITHOUT_GPA = (
-        WEIGHT_JD
-        + WEIGHT_SKILL * USER_SKILL_WEIGHT
-        + WEIGHT_MONTHS * USER_EXPERIENCE_WEIGHT
-        + WEIGHT_WORD
-    )
-    # 1) load skills
+    # 1) scoring parameters: latest config snapshot plus this run's weight overrides
+    params = scoring_params(config_snapshot(), user_skill_weight, user_experience_weight)
+    print(f"Info: Using config version {params['config_version']}.")
     skills_map = load_skills()
-    # st.info("🛠️ Configuration after overrides:")
-    # st.info(f"   • user_skill_weight  (param): {user_skill_weight!r}")
-    # st.info(f"   • USER_SKILL_WEIGHT (global): {USER_SKILL_WEIGHT!r}")
-    # st.info(f"   • user_experience_weight  (param): {user_experience_weight!r}")
-    # st.info(f"   • USER_EXPERIENCE_WEIGHT (global): {USER_EXPERIENCE_WEIGHT!r}")
-    # st.info(f"   • TARGET_MONTHS_EXPERIENCE    : {TARGET_MONTHS_EXPERIENCE!r}")
-    # st.info(f"   • MAX_SCORE_WITH_GPA          : {MAX_SCORE_WITH_GPA!r}")
-    # st.info(f"   • MAX_SCORE_WITHOUT_GPA       : {MAX_SCORE_WITHOUT_GPA!r}")
-    # st.info("──────────────────────────────────\n")
 
     # 2) validate job_description
     if not job_description or not job_description.strip():
         raise ValueError("`job_description` must be a non-empty string")
 
-    # 3) build scanner
-    scanner = CVScanner(
-        model_id=model_id,
-        spacy_package=spacy_model
-    )
+    # 3) reuse a loaded scanner (models stay warm in long-lived processes)
+    scanner = get_scanner(model_id, spacy_model)
 
     # 4) run scan
-    return scanner.scan(
+    scan_kwargs = dict(
         req_text=job_description,
         pdf_dir=Path(pdf_folder),
         job_skills_map=skills_map,
         target_job_title=job_title,
-        pdf_list=pdf_list
-    )
\ No newline at end of file
+        pdf_list=pdf_list,
+        progress_callback=progress_callback,
+        params=params,
+        time_budget_s=time_budget_s,
+    )
+    # at most `max_concurrent_scans` scans run at once in this process; the rest wait here
+    with scan_slot():
+        if profiler:
+            report = profile_path or Path("scan_results/profiles") / f"scan_{datetime.now().strftime('%Y%m%d%H%M%S')}.txt"
+            return profile_call(scanner.scan, report, profiler=profiler, **scan_kwargs)
+        return scanner.scan(**scan_kwargs)
+
+def list_pdfs(pdf_dir: Path) -> List[Path]:
+    """
+    The flat *.pdf files of `pdf_dir`. A folder migrated into the blob store
+    (`python -m services.blob_store migrate`) has none left; that is an error
+    naming the manifest export to scan instead.
+    """
+    file_paths = sorted(pdf_dir.glob("*.pdf"))
+    if not file_paths and (pdf_dir / "blobs").is_dir():
+        raise ValueError(
+            f"'{pdf_dir}' keeps its PDFs in a blob store; list them with "
+            f"`python -m services.blob_store export --folder {pdf_dir} --output pdfs.csv` "
+            "and scan with `--manifest pdfs.csv`"
+        )
+    return file_paths
+
+
+def read_manifest(manifest_path: Union[str, Path], base_dir: Optional[Union[str, Path]] = None) -> List[Path]:
+    """
+    PDF paths from a manifest: a text file with one path per line, or a CSV
+    with a `path` or `name pdf` column. Relative paths resolve against `base_dir`.
+    """
+    manifest_path = Path(manifest_path)
+    if manifest_path.suffix.lower() == ".csv":
+        with manifest_path.open("r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            column = next((c for c in ("path", "name pdf") if c in (reader.fieldnames or [])), None)
+            if column is None:
+                raise ValueError(f"Manifest '{manifest_path}' needs a 'path' or 'name pdf' column")
+            names = [row[column].strip() for row in reader if row.get(column, "").strip()]
+    else:
+        with manifest_path.open("r", encoding="utf-8") as f:
+            names = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    base = Path(base_dir) if base_dir else Path(".")
+    return [Path(n) if Path(n).is_absolute() else base / n for n in names]
+
+
+_RESULT_ID_PREFIX = b'{"file_path": '
+_json_decoder = json.JSONDecoder()
+
+
+def _completed_path(line: bytes) -> Optional[str]:
+    """The `file_path` of one output line, or None for an unreadable line."""
+    if not line.startswith(_RESULT_ID_PREFIX):
+        return None
+    try:
+        # lines are written with file_path first: decode just that string, not the whole record
+        path, _ = _json_decoder.raw_decode(line[len(_RESULT_ID_PREFIX):].decode("utf-8"))
+    except ValueError:
+        return None
+    return path if isinstance(path, str) else None
+
+
+def _load_completed(output_path: Path) -> Set[str]:
+    """
+    File paths already written to the JSONL output, read line by line. A
+    trailing partial line (from an interrupted write) is truncated away.
+    """
+    if not output_path.exists():
+        return set()
+    done = set()
+    end = 0
+    with output_path.open("rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            end += len(line)
+            path = _completed_path(line)
+            if path is not None:
+                done.add(path)
+    if end < output_path.stat().st_size:
+        with output_path.open("rb+") as f:
+            f.truncate(end)
+    return done
+
+
+def _write_checkpoint(checkpoint_path: Path, state: Dict):
+    tmp_path = checkpoint_path.with_suffix(checkpoint_path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp_path, checkpoint_path)
+
+
+def run_batch_scan(
+    jd_path: Union[str, Path],
+    output_path: Union[str, Path],
+    pdf_dir: Optional[Union[str, Path]] = None,
+    manifest_path: Optional[Union[str, Path]] = None,
+    job_title: Optional[str] = None,
+    checkpoint_every: int = 50,
+    restart: bool = False,
+    model_id: str = "BAAI/bge-large-en-v1.5",
+    spacy_model: str = "en_core_web_sm",
+) -> Dict:
+    """
+    Headless scan of a PDF directory or manifest. Each CV's details are
+    appended to `output_path` (JSONL) as soon as it is scored; progress is
+    checkpointed to `<output>.ckpt.json` so a rerun with the same arguments
+    resumes where the previous run stopped.
+    """
+    req_text = load_requirement(Path(jd_path))
+    if not req_text:
+        raise ValueError(f"Job description '{jd_path}' is empty")
+
+    if manifest_path:
+        file_paths = read_manifest(manifest_path, base_dir=pdf_dir)
+    elif pdf_dir:
+        file_paths = list_pdfs(Path(pdf_dir))
+    else:
+        raise ValueError("Either a PDF directory or a manifest is required")
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = output_path.with_suffix(output_path.suffix + ".ckpt.json")
+    run_key = {
+        'jd_sha1': hashlib.sha1(req_text.encode("utf-8")).hexdigest(),
+        'job_title': job_title,
+        'source': str(manifest_path or pdf_dir),
+    }
+
+    # scores of one job use one config snapshot; a resumed job warns if config.yaml changed
+    params = scoring_params()
+    if restart:
+        output_path.unlink(missing_ok=True)
+        checkpoint_path.unlink(missing_ok=True)
+    elif checkpoint_path.exists():
+        previous = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+        if any(previous.get(k) != v for k, v in run_key.items()):
+            raise ValueError(
+                f"Checkpoint '{checkpoint_path}' belongs to a different JD/title/source; "
+                "use --restart or a different --out."
+            )
+        if previous.get('config_version') not in (None, params['config_version']):
+            print(f"Warning: config.yaml changed since this job started "
+                  f"({previous['config_version']} -> {params['config_version']}); "
+                  "remaining CVs use the new version.", file=sys.stderr)
+
+    done = _load_completed(output_path)
+    pending = [p for p in file_paths if str(p) not in done]
+    print(f"Info: {len(file_paths)} PDFs in job, {len(done)} already done, {len(pending)} to scan.")
+
+    state = {**run_key, 'total': len(file_paths), 'done': len(done), 'completed': False,
+             'config_version': params['config_version'], 'started_at': datetime.now().isoformat()}
+    _write_checkpoint(checkpoint_path, state)
+
+    scanner = get_scanner(model_id, spacy_model)
+    start = time.perf_counter()
+    if pending:
+        # iter_scan parses ahead in the parse pool and embeds CVs in groups; paths are
+        # passed whole (relative to the cwd, like `pending`) so yielded ids match `done`
+        results = scanner.iter_scan(req_text, Path("."), load_skills(), job_title,
+                                    pdf_list=[str(p) for p in pending], params=params)
+        with output_path.open("a", encoding="utf-8") as out:
+            for i, (path_str, details) in enumerate(results, start=1):
+                out.write(json.dumps({'file_path': path_str, **details}, default=str) + "\n")
+                out.flush()
+                state['done'] += 1
+                if i % checkpoint_every == 0 or i == len(pending):
+                    os.fsync(out.fileno())
+                    state['updated_at'] = datetime.now().isoformat()
+                    _write_checkpoint(checkpoint_path, state)
+                    rate = i / (time.perf_counter() - start)
+                    print(f"Info: {state['done']}/{state['total']} CVs scored ({rate:.1f} CVs/s).")
+
+    state['completed'] = True
+    state['updated_at'] = datetime.now().isoformat()
+    _write_checkpoint(checkpoint_path, state)
+    return state
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Headless batch CV scan with resumable JSONL output.")
+    parser.add_argument("--jd", required=True, help="Job description text file")
+    parser.add_argument("--pdf-dir", help="Directory of PDFs (also the base for relative manifest paths)")
+    parser.add_argument("--manifest", help="Text file (one path per line) or CSV with a 'path'/'name pdf' column")
+    parser.add_argument("--job-title", default=None, help="Job title to pick target skills (default: taken from the JD)")
+    parser.add_argument("--out", required=True, help="Output JSONL path; <out>.ckpt.json holds the checkpoint")
+    parser.add_argument("--checkpoint-every", type=int, default=50)
+    parser.add_argument("--restart", action="store_true", help="Discard previous output and start over")
+    cfg = config_snapshot()
+    parser.add_argument("--model-id", default=cfg.get("model_id", "BAAI/bge-large-en-v1.5"))
+    parser.add_argument("--spacy-model", default=cfg.get("spacy_model", "en_core_web_sm"))
+    args = parser.parse_args(argv)
+
+    if not args.pdf_dir and not args.manifest:
+        parser.error("one of --pdf-dir or --manifest is required")
+
+    state = run_batch_scan(
+        jd_path=args.jd,
+        output_path=args.out,
+        pdf_dir=args.pdf_dir,
+        manifest_path=args.manifest,
+        job_title=args.job_title,
+        checkpoint_every=args.checkpoint_every,
+        restart=args.restart,
+        model_id=args.model_id,
+        spacy_model=args.spacy_model,
+    )
+    print(json.dumps(state, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import multiprocessing
+import re
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import pymupdf
+from utils.cache_utils import cached_text
+
+# PDF text extraction, kept free of model imports so parsing can run in a
+# small pool of spawned worker processes (sized by `parse_workers`).
+
+def extract_pdf_text(pdf_path: Union[str, Path, bytes]) -> str:
+    """Text of a PDF file, or of PDF bytes (e.g. an HTTP upload)."""
+    try:
+        if isinstance(pdf_path, (bytes, bytearray)):
+            doc = pymupdf.open(stream=pdf_path, filetype="pdf")
+        else:
+            doc = pymupdf.open(pdf_path)
+        text_content = []
+        for page_num in range(len(doc)):
+                page = doc.load_page(page_num)
+                blocks = page.get_text("blocks", sort=True)
+                page_text = " ".join([b[4].replace('\n', ' ').strip() for b in blocks if len(b[4].strip()) > 10])
+                text_content.append(page_text)
+        doc.close()
+        full_text = "\n".join(text_content)
+        full_text = re.sub(r'\s*\n\s*', '\n', full_text)
+        full_text = re.sub(r'-\n(\w)', r'\1', full_text)
+        full_text = re.sub(r'\s+', ' ', full_text)
+        return full_text.strip()
+    except Exception as e:
+        source = "<bytes>" if isinstance(pdf_path, (bytes, bytearray)) else pdf_path
+        print(f"Error reading PDF '{source}': {e}")
+        return ""
+
+
+def parse_pdf(pdf_path: Union[str, Path]) -> Tuple[str, float, float]:
+    """(text, wall seconds, CPU seconds) for one PDF, through the content-hash text cache."""
+    wall0 = time.perf_counter()
+    cpu0 = time.process_time()
+    text = cached_text(pdf_path, extract_pdf_text)
+    return text, time.perf_counter() - wall0, time.process_time() - cpu0
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+_pool_users: Dict[ProcessPoolExecutor, int] = {}
+_pool_lock = threading.Lock()
+
+
+def _acquire_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Process-wide parse pool, kept alive between scans and resized on config
+    change. The caller counts as a user until it calls _release_pool().
+    """
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != workers:
+            old = _pool
+            # spawn: forking a process that already holds torch threads is unsafe
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_size = workers
+            # a replaced pool still in use is shut down by its last user
+            if old is not None and not _pool_users.get(old):
+                _pool_users.pop(old, None)
+                old.shutdown(wait=False)
+        _pool_users[_pool] = _pool_users.get(_pool, 0) + 1
+        return _pool
+
+
+def _release_pool(pool: ProcessPoolExecutor, broken: bool = False):
+    """Drop one user of `pool`; a replaced or broken pool shuts down once unused."""
+    global _pool
+    with _pool_lock:
+        if broken and pool is _pool:
+            _pool = None    # the next scan starts a fresh pool
+        _pool_users[pool] -= 1
+        if not _pool_users[pool] and pool is not _pool:
+            del _pool_users[pool]
+            pool.shutdown(wait=False)
+
+
+def iter_parsed(file_paths: List[Path], workers: int) -> Iterator[Tuple[str, float, float]]:
+    """
+    parse_pdf() results for `file_paths` in order. With workers > 1 up to
+    4 x workers files are parsed ahead in the pool while the caller scores.
+    If the pool breaks (a worker crashed), the rest are parsed inline.
+    """
+    if workers <= 1 or len(file_paths) <= 1:
+        for path in file_paths:
+            yield parse_pdf(path)
+        return
+
+    pool = _acquire_pool(workers)
+    broken = False
+    todo = deque(file_paths)
+    window: "deque[Tuple[Path, Future]]" = deque()
+    try:
+        try:
+            while window or todo:
+                while todo and len(window) < workers * 4:
+                    window.append((todo[0], pool.submit(parse_pdf, todo[0])))
+                    todo.popleft()
+                result = window[0][1].result()
+                window.popleft()
+                yield result
+        except RuntimeError as e:   # BrokenProcessPool is a RuntimeError
+            broken = True
+            print(f"Warning: PDF parse pool failed ({e!r}); parsing the remaining {len(window) + len(todo)} PDFs inline.",
+                  file=sys.stderr)
+            for _, future in window:
+                future.cancel()
+            for path in [path for path, _ in window] + list(todo):
+                yield parse_pdf(path)
+    finally:
+        _release_pool(pool, broken)
@@ -7,6 +7,10 @@ from pages.scan_results_page import render_scan_results_page
 from pages.evaluate_results_page import render_evaluate_results_page
 from pages.skills_page import render_skills_page
 from pages.config_page import render_config
+from utils.metrics_utils import start_exporter
+
+# Prometheus metrics endpoint / file (once per process, see config.yaml)
+start_exporter()
 
 
 # initialize or read current page
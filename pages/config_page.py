@@ -1,23 +1,14 @@
 # pages/render_config.py
 
-import yaml
 import streamlit as st
 from pathlib import Path
+# cached by file mtime/size; save_config invalidates
+from utils.config_utils import CONFIG_PATH, load_config, save_config
+from utils.resource_utils import utilization
 
 # Paths to the YAML files
-CONFIG_PATH = Path(__file__).parent.parent / "config.yaml"
 BACKUP_PATH = Path(__file__).parent.parent / "config_backup.yaml"
 
-# Load YAML configuration from a file
-def load_config(path: Path) -> dict:
-    with path.open('r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
-
-# Persist configuration to a file
-def save_config(path: Path, config: dict):
-    with path.open('w', encoding='utf-8') as f:
-        yaml.dump(config, f, default_flow_style=False)
-
 # Streamlit page function
 def render_config():
     st.header("Edit Configuration")
@@ -93,6 +84,34 @@ def render_config():
         "Fuzzy Skill Match Threshold", 0, 100,
         value=config.get('fuzzy_skill_match_threshold', 85)
     )
+    config['near_duplicate_threshold'] = st.slider(
+        "Near-Duplicate Upload Threshold", 0.5, 1.0,
+        value=float(config.get('near_duplicate_threshold', 0.8)), step=0.01
+    )
+
+    # CPU resources (0 = library default)
+    st.subheader("CPU Resources")
+    config['torch_intra_op_threads'] = st.number_input(
+        "Torch intra-op threads", min_value=0, value=int(config.get('torch_intra_op_threads', 0)), step=1,
+        help="Threads per embedding batch. 0 uses all cores.",
+    )
+    config['torch_inter_op_threads'] = st.number_input(
+        "Torch inter-op threads", min_value=0, value=int(config.get('torch_inter_op_threads', 0)), step=1,
+        help="Applied once per process, before the first model loads.",
+    )
+    config['tokenizers_parallelism'] = st.checkbox(
+        "Tokenizer parallelism", value=bool(config.get('tokenizers_parallelism', False))
+    )
+    config['parse_workers'] = st.number_input(
+        "PDF parse processes", min_value=0, value=int(config.get('parse_workers', 0)), step=1,
+        help="0 or 1 parses in the scanning thread.",
+    )
+    config['max_concurrent_scans'] = st.number_input(
+        "Max concurrent scans", min_value=0, value=int(config.get('max_concurrent_scans', 1)), step=1,
+        help="Further scans queue until a slot frees up. 0 disables the cap.",
+    )
+    with st.expander("Current utilization"):
+        st.json(utilization())
 
     # Action buttons
     col1, col2 = st.columns(2)
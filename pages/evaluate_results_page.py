@@ -1,35 +1,26 @@
 import os
 import pandas as pd
 import streamlit as st
-from utils.pdf_utils import show_pdf  # assumes you have this utility
-
-# Directory containing your evaluation result CSVs
-RESULTS_DIR = "evaluate_results"
+from utils.pdf_utils import show_pdf_preview
+from services.blob_store import locate_pdf
+from services.catalog import load_run
+from utils.catalog_utils import select_run
 
 
 def render_evaluate_results_page():
     st.title("📂 Evaluation Results")
 
-    # ensure the folder exists
-    if not os.path.isdir(RESULTS_DIR):
-        st.error(f"Directory '{RESULTS_DIR}' not found.")
-        return
-
-    # list CSV files
-    files = sorted(f for f in os.listdir(RESULTS_DIR) if f.lower().endswith(".csv"))
-    if not files:
-        st.info(f"No CSV files found in '{RESULTS_DIR}'.")
+    run = select_run("evaluate")
+    if run is None:
+        st.info("No evaluation results found yet.")
         return
-
-    # select one
-    selected = st.selectbox("Select a result file:", files)
-    file_path = os.path.join(RESULTS_DIR, selected)
+    selected = run["run_id"]
 
     # read it
     try:
-        df = pd.read_csv(file_path)
+        df = load_run(run)
     except Exception as e:
-        st.error(f"Failed to read '{selected}': {e}")
+        st.error(f"Failed to read '{run['file_path']}': {e}")
         return
 
     # summary table
@@ -44,9 +35,11 @@ def render_evaluate_results_page():
         with st.expander(f"#{idx} – {display_name}"):
             # show PDF if available
             pdf_path = row.get("pdf_path", "")
-            if pdf_path and os.path.exists(pdf_path):
+            # rows from before `blob_store migrate` still name the flat file
+            located = locate_pdf(pdf_path) if isinstance(pdf_path, str) else None
+            if located is not None:
                 st.markdown(f"**PDF Path:** `{pdf_path}`")
-                show_pdf(pdf_path)
+                show_pdf_preview(str(located), key=f"{selected}_{idx}")
             else:
                 st.warning("PDF not found or path invalid.")
 
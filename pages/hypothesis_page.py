@@ -1,32 +1,30 @@
 import streamlit as st
 import pandas as pd
 import os
-import base64
 from streamlit.components.v1 import html as st_html
 import math
+from utils.dataset_utils import ensure_columnar, load_index, read_rows
 
-#— helper to embed a PDF in the page
-def show_pdf(file_path: str):
-    with open(file_path, "rb") as f:
-        b64 = base64.b64encode(f.read()).decode()
-    pdf_display = (
-        f'<iframe src="data:application/pdf;base64,{b64}" '
-        'width="700" height="900" type="application/pdf"></iframe>'
-    )
-    st.markdown(pdf_display, unsafe_allow_html=True)
+DATASET_PATH = "hypothesis/Resume.csv"
 
 def render_hypothesis():
     st.title("CSV Records Viewer")
 
-    df = pd.read_csv("hypothesis/Resume.csv")  # your fallback
+    # one-time columnar copy; afterwards each page reads only its own rows
+    data_path = ensure_columnar(DATASET_PATH)
+    index = load_index(data_path)
 
-    # # 2) Show the raw table
-    # st.markdown("## All Records")
-    # st.dataframe(df)
+    # --- filter & pagination controls in the sidebar ---
+    categories = sorted(index["Category"].dropna().unique()) if "Category" in index else []
+    category = st.sidebar.selectbox("Category", ["All"] + list(categories))
+    if category != "All":
+        index = index[index["Category"] == category]
 
-    total = len(df)
+    total = len(index)
+    if total == 0:
+        st.info("No records match this filter.")
+        return
 
-    # --- pagination controls in the sidebar ---
     page_size = st.sidebar.number_input(
         "Rows per page", min_value=1, max_value=100, value=10
     )
@@ -35,10 +33,14 @@ def render_hypothesis():
     page = st.sidebar.number_input(
         "Page number", min_value=1, max_value=total_pages, value=1
     )
+    show_html = st.sidebar.checkbox("Render HTML extracts", value=False)
 
     start_idx = (page - 1) * page_size
     end_idx = start_idx + page_size
-    df_page = df.iloc[start_idx:end_idx]
+    rows = index["row"].iloc[start_idx:end_idx].tolist()
+
+    columns = ["ID", "Resume_str", "Category"] + (["Resume_html"] if show_html else [])
+    df_page = read_rows(data_path, rows, columns=columns)
 
     st.markdown(f"## Showing rows {start_idx + 1}–{min(end_idx, total)} of {total}")
     st.dataframe(df_page)
@@ -2,14 +2,22 @@ import os, datetime
 import pandas as pd
 import streamlit as st
 from utils.pdf_utils import show_pdf
+from services.role_fit import role_fit
+from services.dedup import duplicate_flags
+from services.blob_store import release, resolve_pdf
+from typing import Dict, Optional
 
 def delete_record(rec_id: str, df: pd.DataFrame, csv_path: str):
-    # 1) remove PDF file
-    pdf_path = os.path.join("folder_pdf", df.loc[df["id"] == rec_id, "name pdf"].iloc[0])
-    try:
-        os.remove(pdf_path)
-    except OSError:
-        pass
+    # 1) remove PDF file, unless an exact-duplicate record still shares it
+    #    (blobs are reference-counted by the store; legacy flat files by name)
+    name_pdf = df.loc[df["id"] == rec_id, "name pdf"].iloc[0]
+    pdf_path = os.path.join("folder_pdf", name_pdf)
+    shared = ((df["name pdf"] == name_pdf) & (df["id"] != rec_id) & (df["status"] != "deleted")).any()
+    if not release(rec_id) and not shared:
+        try:
+            os.remove(pdf_path)
+        except OSError:
+            pass
 
     # 2) mark deleted in CSV
     df.loc[df["id"] == rec_id, ["status", "updated_at"]] = [
@@ -22,6 +30,16 @@ def delete_record(rec_id: str, df: pd.DataFrame, csv_path: str):
     # reset to list view
     st.session_state.selected_record = None
 
+def duplicate_label(flag: Optional[Dict], df: pd.DataFrame) -> str:
+    """Short marker for records flagged at upload as (near-)duplicates."""
+    if not flag:
+        return ""
+    original = df.loc[df["id"] == flag["duplicate_of"], "name pdf"]
+    original = original.iloc[0] if not original.empty else flag["duplicate_of"]
+    if flag["match"] == "exact":
+        return f"🟰 same file as {original}"
+    return f"≈ {flag['similarity']:.0%} like {original}"
+
 def render_manage_section():
     st.title("📋 Manage Records")
     csv_path = "data/records.csv"
@@ -39,14 +57,16 @@ def render_manage_section():
 
     # --- 3) LIST VIEW ---
     if st.session_state.selected_record is None:
-        cols = st.columns([2, 3, 2, 2, 2])
-        for c, label in zip(cols, ["ID", "PDF Name", "Created At", "Updated At", "Status"]):
+        flags = duplicate_flags()
+        cols = st.columns([2, 3, 2, 2, 2, 2])
+        for c, label in zip(cols, ["ID", "PDF Name", "Duplicate", "Created At", "Updated At", "Status"]):
             c.markdown(f"**{label}**")
 
         for _, row in df.iterrows():
-            id_col, pdf_col, ca_col, ua_col, act_col = st.columns([2, 3, 2, 2, 2])
+            id_col, pdf_col, dup_col, ca_col, ua_col, act_col = st.columns([2, 3, 2, 2, 2, 2])
             id_col.write(row["id"])
             pdf_col.write(row["name pdf"])
+            dup_col.write(duplicate_label(flags.get(row["id"]), df))
             ca_col.write(row["created_at"])
             ua_col.write(row["updated_at"])
 
@@ -72,7 +92,7 @@ def render_manage_section():
         )
 
         left, right = st.columns([3, 2])
-        pdf_path = os.path.join("folder_pdf", row["name pdf"])
+        pdf_path = str(resolve_pdf(row["name pdf"]))
 
         with left:
             show_pdf(pdf_path)
@@ -88,6 +108,9 @@ def render_manage_section():
             st.markdown(f"**Created:** {row['created_at']}")
             st.markdown(f"**Updated:** {row['updated_at']}")
             st.markdown(f"**Status:** {row['status']}")
+            dup_label = duplicate_label(duplicate_flags().get(rec_id), df)
+            if dup_label:
+                st.markdown(f"**Duplicate:** {dup_label}")
 
             if row["status"] != "deleted":
                 st.button(
@@ -96,5 +119,26 @@ def render_manage_section():
                     on_click=lambda rec=rec_id: delete_record(rec, df, csv_path)
                 )
 
+                # rank every active job title for this resume in one pass
+                if st.button("🎯 Best-fit roles", key=f"fit_{rec_id}"):
+                    with st.spinner("Scoring against all job titles…"):
+                        roles = role_fit(pdf_path=pdf_path, records_csv_path=csv_path, top_k=10)
+                    if not roles:
+                        st.warning("Could not extract text from this PDF.")
+                    else:
+                        st.dataframe(
+                            [
+                                {
+                                    "job title": r["job_title"],
+                                    "score": round(r["score"], 1),
+                                    "JD similarity": round(r["jd_similarity"], 3),
+                                    "skills": r["matched_skills_count"],
+                                    "stored JD": "✓" if r["has_jd"] else "",
+                                }
+                                for r in roles
+                            ],
+                            hide_index=True,
+                        )
+
 if __name__ == "__main__":
     render_manage_section()
@@ -1,68 +1,77 @@
 import os
-import ast
 import streamlit as st
 import pandas as pd
-from utils.pdf_utils import show_pdf
-
-# Directory containing scan result CSVs
-RESULTS_DIR = "scan_results"
-
-
-def _safe_eval(val, default):
-    """Safely evaluate a literal or return default on failure."""
-    if pd.isna(val) or not isinstance(val, str):
-        return default
-    try:
-        return ast.literal_eval(val)
-    except Exception:
-        return default
+from utils.pdf_utils import show_pdf_preview
+from services.scan_results import export_csv_bytes
+from services.blob_store import locate_pdf
+from services.catalog import load_run
+from services.scanner import profile_report_path
+from utils.timing_utils import render_performance_panel
+from utils.catalog_utils import select_run
+
+SUMMARY_COLUMNS = ["file_path", "score", "jd_similarity", "matched_skills_count", "coverage_ratio", "scan_status"]
+DETAIL_COLUMNS = [
+    "pdf_path", "matched_skills_list", "target_skills_list",
+    "total_months_experience", "word_count", "gpa", "scores", "timings", "config_version", "skipped_stages",
+    "requirement_coverage",
+]
 
 
 def render_scan_results_page():
     st.title("📂 CV Scanner Results")
 
-    # List available result files
-    if not os.path.isdir(RESULTS_DIR):
-        st.error(f"Directory '{RESULTS_DIR}' not found.")
+    run = select_run("scan")
+    if run is None:
+        st.info("No scan results found. Run a scan from the Upload page first.")
         return
+    file_path = run["file_path"]
+    selected = run["run_id"]
 
-    files = [f for f in os.listdir(RESULTS_DIR) if f.lower().endswith('.csv')]
-    if not files:
-        st.info("No result CSV files found in the scan_results directory.")
-        return
-
-    selected = st.selectbox("Select a result file:", files)
-    file_path = os.path.join(RESULTS_DIR, selected)
-
-    # Read CSV
+    # Read only the columns this page displays
     try:
-        df = pd.read_csv(file_path)
+        df = load_run(run, columns=SUMMARY_COLUMNS + DETAIL_COLUMNS)
     except Exception as e:
-        st.error(f"Failed to read '{selected}': {e}")
+        st.error(f"Failed to read '{file_path}': {e}")
         return
 
-    # Parse list and dict columns
-    for col in ["matched_skills_list", "target_skills_list"]:
-        if col in df.columns:
-            df[col] = df[col].apply(lambda x: _safe_eval(x, []))
-    if "scores" in df.columns:
-        df["scores"] = df["scores"].apply(lambda x: _safe_eval(x, {}))
+    # CSV is only rendered when asked for
+    if st.button("Prepare CSV export"):
+        st.download_button(
+            label="Download CSV",
+            data=export_csv_bytes(file_path, run_id=run["run_id"] if run["compacted"] else None),
+            file_name=f"{os.path.splitext(os.path.basename(file_path))[0]}.csv",
+            mime="text/csv"
+        )
 
     # Summary table
     st.markdown("### Summary Table")
-    summary_cols = [c for c in ["file_path", "score", "jd_similarity", "matched_skills_count"] if c in df.columns]
+    summary_cols = [c for c in SUMMARY_COLUMNS if c in df.columns]
     st.dataframe(df[summary_cols])
 
+    render_performance_panel(
+        df["timings"] if "timings" in df.columns else [],
+        report_path=profile_report_path(os.path.basename(file_path)),
+    )
+
     # Details per record
     st.markdown("### Detailed Records")
     for idx, row in df.iterrows():
-        title = f"#{idx}: {os.path.basename(str(row.get('file_path', '')))}"
-        if 'score' in row and pd.notna(row['score']):
+        # pdf_path keeps the uploaded name; file_path may point into the blob store
+        title = f"#{idx}: {os.path.basename(str(row.get('pdf_path') or row.get('file_path', '')))}"
+        status = row.get('scan_status')
+        if status == 'unscored':
+            title += " (not scored: time budget ran out)"
+        elif 'score' in row and pd.notna(row['score']):
             title += f" (Score: {row['score']:.2f})"
+            if status == 'partial':
+                title += f" ⚠ partial, skipped {', '.join(row.get('skipped_stages') or [])}"
         with st.expander(title):
             st.markdown(f"**PDF Path:** `{row.get('pdf_path', '')}`")
-            if 'file_path' in row and os.path.exists(row['file_path']):
-                show_pdf(row['file_path'])
+            # rows from before `blob_store migrate` still name the flat file
+            stored = row.get('file_path') or row.get('pdf_path')
+            located = locate_pdf(stored) if isinstance(stored, str) else None
+            if located is not None:
+                show_pdf_preview(str(located), key=f"{selected}_{idx}")
             else:
                 st.warning("PDF file not found or path missing.")
 
@@ -75,7 +84,7 @@ def render_scan_results_page():
                 st.write(row["target_skills_list"])
 
             # Other numeric fields
-            for field in ["jd_similarity", "total_months_experience", "word_count", "gpa"]:
+            for field in ["jd_similarity", "total_months_experience", "word_count", "gpa", "config_version"]:
                 if field in row:
                     st.markdown(f"**{field.replace('_', ' ').title()}:** {row[field]}")
 
@@ -84,5 +93,10 @@ def render_scan_results_page():
                 st.markdown("**Scores Breakdown:**")
                 st.json(row["scores"])
 
+            # Which JD requirements this CV covers, and the sentence that covers each
+            if row.get("requirement_coverage"):
+                st.markdown(f"**Requirement Coverage:** {row['coverage_ratio']:.0%}")
+                st.dataframe(pd.DataFrame(row["requirement_coverage"]), hide_index=True)
+
 if __name__ == "__main__":
     render_scan_results_page()
@@ -1,15 +1,18 @@
 import os
 import pandas as pd
 import streamlit as st
+from utils.cache_utils import load_cached, invalidate
 
 CSV_PATH = "data/list_skills.csv"
 COLUMNS = ["job_title", "skills_necessary", "status"]
 
 def load_data():
-    return pd.read_csv(CSV_PATH) if os.path.exists(CSV_PATH) else pd.DataFrame(columns=COLUMNS)
+    # parsed once per file change; callers get their own copy
+    return load_cached(CSV_PATH, pd.read_csv) if os.path.exists(CSV_PATH) else pd.DataFrame(columns=COLUMNS)
 
 def save_data(df):
     df.to_csv(CSV_PATH, index=False)
+    invalidate(CSV_PATH)
 
 def add_skill():
     st.session_state.skill_inputs.append("")
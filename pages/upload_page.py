@@ -1,22 +1,116 @@
-import os, uuid, datetime, csv
+import time
 import pandas as pd, streamlit as st
-from utils.file_utils import make_filename
 from utils.skill_utils import load_job_titles
-from services.scanner import scan_record_score
+from services.scanner import scan_batch, scan_record_score, profile_report_path
+from services.uploads import ingest_batch
+from internal.cv_scanner import TopN
+from services.jobs import cancel_job, enqueue, get_job, queue_position, worker_alive
+from services.scan_results import export_csv_bytes, load_scan_results
+from utils.timing_utils import PROFILERS, render_performance_panel
 from utils.gauge_utils import render_ats_gauge
 from pathlib import Path
-import yaml
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from services.evaluate import evaluate_resume
+from services.dedup import content_hash_of
+from services.blob_store import resolve_pdf
+from utils.config_utils import config_snapshot
 
 
-_config_path = Path(__file__).parent.parent / "config.yaml"
-_cfg = yaml.safe_load(_config_path.read_text())
+LEADERBOARD_SIZE             = 5
+JOB_POLL_INTERVAL_S          = 1.0
+JOB_TIMEOUT_S                = 60 * 60   # give up on a scan job after an hour
 
-USER_SKILL_WEIGHT            = _cfg["user_skill_weight"]
-USER_EXPERIENCE_WEIGHT       = _cfg["user_experience_weight"]
+def render_leaderboard(slot, ranked: List[Tuple[str, float]]):
+    """Live top-N table of (pdf_path, score) rows."""
+    slot.dataframe(
+        [{"CV": Path(p).name, "score": round(score, 2)} for p, score in ranked],
+        hide_index=True,
+    )
+
+def render_job_progress(job: Dict, lane: str, progress_slot, leaderboard_slot):
+    """Progress bar and live leaderboard of a queued or running scan job."""
+    progress = job.get("progress") or {}
+    if job["status"] == "queued":
+        progress_slot.progress(0.0, text=f"⏳ Queued ({lane}), {queue_position(job['job_id'])} job(s) ahead…")
+    elif progress.get("total"):
+        progress_slot.progress(
+            progress["done"] / progress["total"],
+            text=f"🔄 Scanned {progress['done']}/{progress['total']}",
+        )
+    else:
+        progress_slot.progress(0.0, text="🔄 Scanning CVs…")
+    if progress.get("leaders"):
+        render_leaderboard(leaderboard_slot, [(r["pdf_path"], r["score"]) for r in progress["leaders"]])
+
+@st.fragment(run_every=JOB_POLL_INTERVAL_S)
+def poll_scan_job():
+    """
+    Re-runs on its own every JOB_POLL_INTERVAL_S while the scan job in
+    `st.session_state.scan_job` is pending, so the rest of the page stays
+    usable; the whole page reruns once the job is over (or given up on).
+    """
+    tracked = st.session_state.get("scan_job")
+    if not tracked or tracked.get("job") is not None:
+        return
+    job = get_job(tracked["job_id"])
+    if job is None or job["status"] not in ("queued", "running"):
+        tracked["job"] = job or {"status": "failed", "error": "the job record is gone"}
+        st.rerun()
+    waited = time.time() - tracked["submitted_at"]
+    alive = worker_alive()
+    if not alive or waited > JOB_TIMEOUT_S:
+        cancel_job(tracked["job_id"])   # a job that never started must not run later
+        reason = "no scan worker is running" if not alive else f"no result after {waited / 60:.0f} min"
+        tracked["job"] = {**job, "status": "abandoned", "error": f"{reason}; start one (`make worker`) and resubmit."}
+        st.rerun()
+    render_job_progress(job, tracked["lane"], st.empty(), st.empty())
+
+def run_scan_with_progress(kind: str, scan_params: Dict, lane: str) -> Optional[Dict]:
+    """
+    Run a "scan" or "scan_batch" with a progress bar and live leaderboard.
+    With a background worker alive the scan is queued once per submit and
+    polled without blocking the page; returns None until it is done (or if
+    it failed). Without a worker the scan runs inline.
+    """
+    tracked = st.session_state.get("scan_job")
+    if tracked is None and worker_alive():
+        tracked = st.session_state.scan_job = {
+            "job_id": enqueue(kind, scan_params, lane=lane), "lane": lane, "submitted_at": time.time(), "job": None,
+        }
+    if tracked is not None:
+        job = tracked["job"]
+        if job is None:
+            poll_scan_job()
+            return None
+        if job["status"] != "done":
+            st.error(f"Scan job {job['status']}: {job.get('error') or ''}")
+            return None
+        return job["result"]
+
+    progress_bar = st.progress(0.0, text="🔄 Scanning CVs…")
+    leaderboard_slot = st.empty()
+    leaderboard = TopN(LEADERBOARD_SIZE)
+
+    def on_progress(done: int, total: int, path_str: str, details: Dict):
+        progress_bar.progress(done / total, text=f"🔄 Scanned {done}/{total}: {Path(path_str).name}")
+        leaderboard.push(details.get("score", 0.0), path_str, details)
+        render_leaderboard(leaderboard_slot, [(p, d.get("score", 0.0)) for p, d in leaderboard.ranked()])
+
+    if kind == "scan_batch":
+        best_file, best_score, result_file = scan_batch(**scan_params, progress_callback=on_progress)
+        result = {"best_file": best_file, "best_score": best_score, "result_file": result_file}
+    else:
+        score, result_file = scan_record_score(**scan_params, progress_callback=on_progress)
+        result = {"score": score, "result_file": result_file}
+    progress_bar.empty()
+    return result
 
 def render_upload_section():
+    # latest config.yaml version (re-read only after it changes on disk)
+    cfg = config_snapshot()
+    default_skill_weight = cfg["user_skill_weight"]
+    default_experience_weight = cfg["user_experience_weight"]
+
     if "submitted" in st.session_state:
         st.session_state.submitted = False
     st.sidebar.title("🔑 Settings")
@@ -36,8 +130,8 @@ def render_upload_section():
         st.session_state.job_title = ""
         st.session_state.job_description = ""
         st.session_state.score_all = False
-        st.session_state.weight1 = USER_SKILL_WEIGHT
-        st.session_state.weight2 = USER_EXPERIENCE_WEIGHT
+        st.session_state.weight1 = default_skill_weight
+        st.session_state.weight2 = default_experience_weight
         st.session_state.custom_weights = False
     if "results" not in st.session_state:
         st.session_state.results = None
@@ -45,7 +139,16 @@ def render_upload_section():
     left, right = st.columns(2)
     with left:
         st.subheader("Upload PDF")
-        pdf_file = st.file_uploader("Choose a PDF file", type=["pdf"])
+        upload_mode = st.radio("Upload", ("Single PDF", "Bulk (many PDFs or ZIP)"), horizontal=True)
+        bulk_mode = upload_mode != "Single PDF"
+        if bulk_mode:
+            pdf_files = st.file_uploader(
+                "Choose PDF files or ZIP archives of PDFs", type=["pdf", "zip"], accept_multiple_files=True
+            )
+            pdf_file = None
+        else:
+            pdf_file = st.file_uploader("Choose a PDF file", type=["pdf"])
+            pdf_files = []
         st.subheader("Configuration")
 
         job_tuples: List[Tuple[int, str]] = load_job_titles()
@@ -78,16 +181,16 @@ def render_upload_section():
             weight1 = st.number_input(
                 "Skill weight",
                 min_value=0.0, max_value=1.0, step=0.1,
-                value=USER_SKILL_WEIGHT
+                value=default_skill_weight
             )
             weight2 = st.number_input(
                 "Experience weight",
                 min_value=0.0, max_value=1.0, step=0.1,
-                value=USER_EXPERIENCE_WEIGHT
+                value=default_experience_weight
             )
         else:
-            weight1 = USER_SKILL_WEIGHT
-            weight2 = USER_EXPERIENCE_WEIGHT
+            weight1 = default_skill_weight
+            weight2 = default_experience_weight
             st.write(f"Using default weights → Skill: **{weight1}**, Experience: **{weight2}**")
         # weight1 = st.number_input("Skill", min_value=0.0, max_value=1.0, step=0.1, value=0.5)
         # weight2 = st.number_input("Experience", min_value=0.0, max_value=1.0, step=0.1, value=0.5)
@@ -101,65 +204,82 @@ def render_upload_section():
         else:
             st.success("✅ Weights sum to 1")
 
-        scan_mode = st.radio(
-            "Scan mode",
-            ("Only this PDF", "All PDFs for this job title")
-        )
-        score_all = (scan_mode == "All PDFs for this job title")
+        if bulk_mode:
+            st.caption("The whole batch is scanned as one run; Gemini evaluation is skipped for bulk uploads.")
+            score_all = False
+        else:
+            scan_mode = st.radio(
+                "Scan mode",
+                ("Only this PDF", "All PDFs for this job title")
+            )
+            score_all = (scan_mode == "All PDFs for this job title")
+
+        with st.expander("Advanced"):
+            profiler = st.selectbox(
+                "Profile this scan",
+                ("Off",) + PROFILERS,
+                help="Runs the scan under a profiler and shows the report in the performance panel.",
+            )
+            time_budget = st.number_input(
+                "Time budget (s)", min_value=0, value=0, step=5,
+                help="Return a partial ranking once this many seconds are spent. 0 = no limit.",
+            )
+            finish_in_background = st.checkbox(
+                "Finish the rest in the background", value=True,
+                help="Queue a job that scores what the time budget left out and updates the same result file.",
+            )
 
         submit = st.button("Submit")
         if submit:
             st.session_state.submitted = False
+            if bulk_mode:
+                if not pdf_files:
+                    st.error("Please upload at least one PDF or ZIP file.")
+                elif abs(total - 1.0) > 1e-6:
+                    st.error("Cannot submit: please adjust weights so they sum to exactly 1.")
+                else:
+                    with st.spinner("Saving uploaded files…"):
+                        ingested = ingest_batch(pdf_files, job_title, job_description, weight1, weight2)
+                    if not ingested:
+                        st.error("No PDF files found in the upload.")
+                    else:
+                        st.session_state.submitted = True
+                        st.session_state.bulk_files = [item["filename"] for item in ingested]
+                        st.session_state.job_title = job_title
+                        st.session_state.job_description = job_description
+                        st.session_state.weight1 = weight1
+                        st.session_state.weight2 = weight2
+                        st.session_state.profiler = None if profiler == "Off" else profiler
+                        st.session_state.time_budget_s = time_budget or None
+                        st.session_state.finish_in_background = finish_in_background
+                        st.session_state.results = None
+                        st.session_state.scan_job = None
+                        flagged = sum(1 for item in ingested if item["match"])
+                        st.success(f"✅ {len(ingested)} PDFs uploaded and recorded ({flagged} flagged as duplicates).")
             # require key
-            if not st.session_state.api_key:
+            elif not st.session_state.api_key:
                 st.sidebar.error("Please enter your Gemini API Key in Settings → then rerun.")
             elif pdf_file is None:
                 st.error("Please upload a PDF before submitting.")
             elif abs(total - 1.0) > 1e-6:
                 st.error("Cannot submit: please adjust weights so they sum to exactly 1.")
             else:
-                # 1) Save PDF with sanitized name
-                os.makedirs("folder_pdf", exist_ok=True)
-                record_id = str(uuid.uuid4())
-                filename = make_filename(job_title, pdf_file.name)
-                save_path = os.path.join("folder_pdf", filename)
-                with open(save_path, "wb") as f:
-                    f.write(pdf_file.read())
-
-                # 2) Append record to CSV
-                csv_path = "data/records.csv"
-                header = [
-                    "id",
-                    "name pdf",
-                    "job_title",
-                    "job_description",
-                    "skill",
-                    "experience",
-                    "created_at",
-                    "updated_at",
-                    "status",
-                ]
-                now = datetime.datetime.now().isoformat()
-                row = [
-                    record_id,
-                    filename,
-                    job_title,
-                    job_description,
-                    weight1,
-                    weight2,
-                    now,
-                    now,
-                    "active",
-                ]
-
-                write_header = not os.path.exists(csv_path)
-                with open(csv_path, "a", newline="", encoding="utf-8") as f:
-                    writer = csv.writer(f)
-                    if write_header:
-                        writer.writerow(header)
-                    writer.writerow(row)
+                # 1) Store the PDF by content (identical files are kept once) and record it
+                item = ingest_batch([pdf_file], job_title, job_description, weight1, weight2)[0]
+                filename = item["filename"]
+                if item["match"] == "exact":
+                    st.info(f"Identical PDF already uploaded as `{filename}`; reusing it and its cached results.")
+                elif item["match"] == "near":
+                    st.warning(
+                        f"Looks like an edited copy of `{item['original_pdf']}` "
+                        f"({item['similarity']:.0%} similar)."
+                    )
+                content_hashes = [item["sha256"]]
+                if item["match"] == "near":
+                    content_hashes.append(content_hash_of(item["duplicate_of"]))
 
                 st.session_state.submitted = True
+                st.session_state.bulk_files = None
                 st.session_state.filename = filename
                 st.session_state.job_title = job_title
                 st.session_state.job_description = job_description
@@ -167,11 +287,17 @@ def render_upload_section():
                 st.session_state.custom_weights = custom_weights
                 st.session_state.weight1 = weight1
                 st.session_state.weight2 = weight2
+                st.session_state.profiler = None if profiler == "Off" else profiler
+                st.session_state.time_budget_s = time_budget or None
+                st.session_state.finish_in_background = finish_in_background
+                st.session_state.scan_job = None
 
                 cs, ks, ms, ai = evaluate_resume(
-                    pdf_path=Path("folder_pdf") / st.session_state.filename,
+                    pdf_path=resolve_pdf(st.session_state.filename),
                     job_description=st.session_state.job_description,
-                    api_key=st.session_state.api_key
+                    api_key=st.session_state.api_key,
+                    job_title=st.session_state.job_title,
+                    content_hashes=content_hashes,
                 )
                 st.session_state.results = {
                     "cs": cs,
@@ -183,33 +309,65 @@ def render_upload_section():
                 st.success("✅ PDF uploaded and record saved.")
 
     with right:
-        if st.session_state.submitted:
+        result = None
+        # a queued scan job outlives the submit run: its progress and result show on later reruns too
+        if st.session_state.submitted or st.session_state.get("scan_job") is not None:
             st.subheader("ATS Score")
-            with st.spinner("🔄 Scanning CV, please wait…"):
-                score, result_file = scan_record_score(
-                    filename=st.session_state.filename,
-                    job_title=st.session_state.job_title,
-                    job_description=st.session_state.job_description,
-                    score_all=st.session_state.score_all,
-                    user_skill_weight=st.session_state.weight1,
-                    user_experience_weight=st.session_state.weight2,
+            scan_params = dict(
+                job_title=st.session_state.job_title,
+                job_description=st.session_state.job_description,
+                user_skill_weight=st.session_state.weight1,
+                user_experience_weight=st.session_state.weight2,
+                profiler=st.session_state.get("profiler"),
+                time_budget_s=st.session_state.get("time_budget_s"),
+                finish_in_background=st.session_state.get("finish_in_background", False),
+            )
+            if st.session_state.get("bulk_files"):
+                # one run for the whole upload batch
+                result = run_scan_with_progress(
+                    "scan_batch", dict(scan_params, filenames=st.session_state.bulk_files), lane="bulk"
                 )
+            else:
+                # single-CV scans use the fast lane
+                result = run_scan_with_progress(
+                    "scan",
+                    dict(scan_params, filename=st.session_state.filename, score_all=st.session_state.score_all),
+                    lane="bulk" if st.session_state.score_all else "interactive",
+                )
+        if result is not None:
             st.success("✅ Scan complete!")
-            render_ats_gauge(score)
+            if "score" in result:
+                render_ats_gauge(result["score"])
+            elif result.get("best_file"):
+                st.metric("Best match", f"{result['best_score']:.1f}", help=result["best_file"])
+                st.caption(f"Top CV: `{result['best_file']}`")
 
             # download button for full results CSV
+            result_file = result["result_file"]
             result_path = Path("scan_results") / result_file
             if result_path.exists():
-                with open(result_path, "rb") as f:
-                    st.download_button(
-                        label="Download full scan results",
-                        data=f,
-                        file_name=result_file,
-                        mime="text/csv"
-                    )
+                st.download_button(
+                    label="Download full scan results",
+                    data=export_csv_bytes(result_path),
+                    file_name=f"{result_path.stem}.csv",
+                    mime="text/csv"
+                )
             else:
                 st.warning(f"Result file not found: {result_path}")
 
+            if result_path.exists():
+                timings = load_scan_results(result_path, columns=["timings", "scan_status"])
+                if "scan_status" in timings:
+                    pending = int(timings["scan_status"].isin(["unscored", "partial"]).sum())
+                    if pending:
+                        note = (" They are being finished in the background; reopen the run on the Scan Results page later."
+                                if st.session_state.get("finish_in_background") else "")
+                        st.warning(f"⏱ Time budget ran out: {pending} CV(s) are unscored or partially scored.{note}")
+                render_performance_panel(
+                    timings["timings"] if "timings" in timings else [],
+                    report_path=profile_report_path(result_file),
+                )
+
     if st.session_state.results is not None:
         st.markdown("---")
         st.subheader("Current Skills")
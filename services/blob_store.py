@@ -0,0 +1,269 @@
+# Content-addressed store for uploaded PDFs. Each distinct PDF is written
+# once to <folder>/blobs/<sha[0:2]>/<sha[2:4]>/<sha256>.pdf (write to a
+# temp file, then rename), so no directory grows past a few hundred entries.
+# A SQLite manifest maps record ids (and their `name pdf`) to blobs; the rest
+# of the app keeps using `name pdf` and resolves it with `resolve_pdf`.
+#
+#   python -m services.blob_store migrate   # move flat folder_pdf/*.pdf into the store
+#   python -m services.blob_store export    # CSV manifest for `cv_scanner --manifest`
+import argparse
+import csv
+import hashlib
+import io
+import os
+import sqlite3
+import sys
+import uuid
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+import pandas as pd
+from utils.cache_utils import file_sha256
+
+BLOBS_DB_PATH = Path("data/blobs.db")
+BLOB_SUBDIR = "blobs"
+CHUNK_SIZE = 1 << 20
+LEGACY_PREFIX = "legacy:"        # manifest id of migrated files no record refers to
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS manifest (
+    record_id   TEXT PRIMARY KEY,
+    name_pdf    TEXT NOT NULL,
+    sha256      TEXT NOT NULL,
+    size        INTEGER,
+    created_at  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_manifest_name ON manifest(name_pdf);
+CREATE INDEX IF NOT EXISTS idx_manifest_sha ON manifest(sha256);
+"""
+
+
+def _connect(db_path: Union[str, Path] = BLOBS_DB_PATH) -> sqlite3.Connection:
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def blob_root(folder: Union[str, Path] = "folder_pdf") -> Path:
+    return Path(folder) / BLOB_SUBDIR
+
+
+def blob_path(sha256: str, folder: Union[str, Path] = "folder_pdf") -> Path:
+    """Shard path of a blob: two levels of 256 directories each."""
+    return blob_root(folder) / sha256[:2] / sha256[2:4] / f"{sha256}.pdf"
+
+
+def put_stream(stream: BinaryIO, folder: Union[str, Path] = "folder_pdf", chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Copy `stream` into the store chunk by chunk and return its sha256. The
+    bytes go to a temp file first and are renamed into their shard only once
+    complete; content already in the store is not written twice.
+    """
+    tmp_dir = blob_root(folder) / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_dir / f"{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    try:
+        with tmp_path.open("wb") as out:
+            for chunk in iter(lambda: stream.read(chunk_size), b""):
+                digest.update(chunk)
+                out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        sha256 = digest.hexdigest()
+        target = blob_path(sha256, folder)
+        if target.exists():
+            tmp_path.unlink()
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, target)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return sha256
+
+
+def put_bytes(data: bytes, folder: Union[str, Path] = "folder_pdf") -> str:
+    return put_stream(io.BytesIO(data), folder)
+
+
+def register(record_id: str, name_pdf: str, sha256: str, folder: Union[str, Path] = "folder_pdf",
+             db_path: Union[str, Path] = BLOBS_DB_PATH, size: Optional[int] = None):
+    """Point `record_id` (uploaded as `name_pdf`) at blob `sha256`."""
+    register_many([(record_id, name_pdf, sha256, size)], folder, db_path)
+
+
+def register_many(entries: List[Tuple[str, str, str, Optional[int]]], folder: Union[str, Path] = "folder_pdf",
+                  db_path: Union[str, Path] = BLOBS_DB_PATH):
+    """register() for many (record_id, name_pdf, sha256, size) entries in one transaction."""
+    now = datetime.now().isoformat()
+    rows = []
+    for record_id, name_pdf, sha256, size in entries:
+        path = blob_path(sha256, folder)
+        if size is None and path.exists():
+            size = path.stat().st_size
+        rows.append((record_id, name_pdf, sha256, size, now))
+    with closing(_connect(db_path)) as conn, conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO manifest (record_id, name_pdf, sha256, size, created_at) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+
+
+def resolve_pdf(name_pdf: str, folder: Union[str, Path] = "folder_pdf",
+                db_path: Union[str, Path] = BLOBS_DB_PATH) -> Path:
+    """
+    On-disk path of the PDF uploaded as `name_pdf`: its blob if the manifest
+    knows it, else the legacy flat file (which may not exist).
+    """
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute(
+            "SELECT sha256 FROM manifest WHERE name_pdf = ? ORDER BY created_at LIMIT 1", (name_pdf,)
+        ).fetchone()
+    if row is not None:
+        path = blob_path(row["sha256"], folder)
+        if path.exists():
+            return path
+    return Path(folder) / name_pdf
+
+
+def locate_pdf(stored_path: Union[str, Path]) -> Optional[Path]:
+    """
+    Existing file for a PDF path stored in a result row, or None. Rows
+    written before `migrate` hold the flat `<folder>/<name pdf>` path, which
+    is looked up by name in the store under that folder.
+    """
+    if not stored_path:
+        return None
+    stored_path = Path(stored_path)
+    if stored_path.exists():
+        return stored_path
+    path = resolve_pdf(stored_path.name, stored_path.parent)
+    return path if path.exists() else None
+
+
+def resolve_many(names: List[str], folder: Union[str, Path] = "folder_pdf",
+                 db_path: Union[str, Path] = BLOBS_DB_PATH) -> Dict[str, Path]:
+    """resolve_pdf() for many names with one manifest query."""
+    by_name: Dict[str, str] = {}
+    unique = list(dict.fromkeys(names))
+    with closing(_connect(db_path)) as conn:
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            rows = conn.execute(
+                f"SELECT name_pdf, sha256 FROM manifest WHERE name_pdf IN ({','.join('?' * len(chunk))}) "
+                f"ORDER BY created_at DESC",
+                chunk,
+            )
+            for row in rows:
+                by_name[row["name_pdf"]] = row["sha256"]    # oldest entry wins
+    resolved = {}
+    for name in names:
+        sha256 = by_name.get(name)
+        path = blob_path(sha256, folder) if sha256 else None
+        resolved[name] = path if path is not None and path.exists() else Path(folder) / name
+    return resolved
+
+
+def release(record_id: str, folder: Union[str, Path] = "folder_pdf",
+            db_path: Union[str, Path] = BLOBS_DB_PATH) -> bool:
+    """
+    Drop `record_id` from the manifest and delete its blob once no other
+    record refers to it. Returns True if the record was in the manifest.
+    """
+    with closing(_connect(db_path)) as conn, conn:
+        row = conn.execute("SELECT sha256 FROM manifest WHERE record_id = ?", (record_id,)).fetchone()
+        if row is None:
+            return False
+        conn.execute("DELETE FROM manifest WHERE record_id = ?", (record_id,))
+        still_used = conn.execute(
+            "SELECT 1 FROM manifest WHERE sha256 = ? LIMIT 1", (row["sha256"],)
+        ).fetchone()
+    if not still_used:
+        blob_path(row["sha256"], folder).unlink(missing_ok=True)
+    return True
+
+
+def iter_manifest(db_path: Union[str, Path] = BLOBS_DB_PATH) -> Iterator[Dict]:
+    with closing(_connect(db_path)) as conn:
+        for row in conn.execute("SELECT record_id, name_pdf, sha256, size, created_at FROM manifest ORDER BY created_at"):
+            yield dict(row)
+
+
+def migrate(folder: Union[str, Path] = "folder_pdf", records_csv_path: Union[str, Path] = "data/records.csv",
+            db_path: Union[str, Path] = BLOBS_DB_PATH) -> Dict[str, int]:
+    """
+    Move flat `folder/*.pdf` files into the store and add manifest rows for
+    every record that names them. Safe to interrupt and re-run: manifest
+    rows are written before each file moves.
+    """
+    folder = Path(folder)
+    records: Dict[str, List[str]] = {}
+    if Path(records_csv_path).exists():
+        df = pd.read_csv(records_csv_path, usecols=["id", "name pdf"])
+        for rec_id, name in df.dropna().itertuples(index=False):
+            records.setdefault(name, []).append(rec_id)
+
+    stats = {"files": 0, "stored": 0, "deduplicated": 0, "records": 0}
+    if not folder.is_dir():
+        return stats
+    with os.scandir(folder) as entries:
+        names = [e.name for e in entries if e.is_file() and e.name.lower().endswith(".pdf")]
+    for name in sorted(names):
+        src = folder / name
+        sha256 = file_sha256(src)
+        size = src.stat().st_size
+        # manifest rows first: until the blob exists resolve_pdf() still finds the flat file
+        for rec_id in records.get(name, [f"{LEGACY_PREFIX}{name}"]):
+            register(rec_id, name, sha256, folder, db_path, size=size)
+            stats["records"] += 1
+        target = blob_path(sha256, folder)
+        if target.exists():
+            src.unlink()
+            stats["deduplicated"] += 1
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # same filesystem, so the rename is atomic and needs no extra disk space
+            os.replace(src, target)
+            stats["stored"] += 1
+        stats["files"] += 1
+    return stats
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Content-addressed PDF store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    mig = sub.add_parser("migrate", help="Move flat PDFs into the sharded store")
+    mig.add_argument("--folder", default="folder_pdf")
+    mig.add_argument("--records", default="data/records.csv")
+    exp = sub.add_parser("export", help="Write one CSV row per blob (path,name pdf,record_id,sha256)")
+    exp.add_argument("--folder", default="folder_pdf")
+    exp.add_argument("--output", default="-")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        stats = migrate(args.folder, args.records)
+        print(f"Migrated {stats['files']} files: {stats['stored']} stored, "
+              f"{stats['deduplicated']} already present, {stats['records']} manifest rows.")
+    else:
+        out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+        try:
+            writer = csv.writer(out)
+            writer.writerow(["path", "name pdf", "record_id", "sha256"])
+            seen = set()
+            for row in iter_manifest():
+                if row["sha256"] in seen:
+                    continue
+                seen.add(row["sha256"])
+                writer.writerow([blob_path(row["sha256"], args.folder), row["name_pdf"], row["record_id"], row["sha256"]])
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+# Catalog index over scan_results/ and evaluate_results/ (SQLite, one row per
+# run plus one row per candidate PDF), with compaction of old runs into
+# partitioned Parquet files and age-based retention.
+# Maintenance: python -m services.catalog maintain
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import uuid
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from utils.config_utils import CONFIG_PATH, load_config
+from services.scan_results import SCAN_RESULTS_SCHEMA, load_scan_results, frame_to_table
+
+CATALOG_PATH = Path("data/catalog.db")
+
+RESULT_DIRS = {
+    "scan": Path("scan_results"),
+    "evaluate": Path("evaluate_results"),
+}
+ARCHIVE_DIRNAME = "archive"
+RESULT_EXTENSIONS = (".parquet", ".csv")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id       TEXT PRIMARY KEY,
+    kind         TEXT NOT NULL,
+    job_title    TEXT,
+    created_at   TEXT NOT NULL,
+    pdf_count    INTEGER NOT NULL,
+    config_hash  TEXT,
+    file_path    TEXT NOT NULL,
+    compacted    INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_runs_kind_title ON runs(kind, job_title, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_file ON runs(file_path);
+CREATE TABLE IF NOT EXISTS candidates (
+    run_id     TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    candidate  TEXT NOT NULL,
+    pdf_path   TEXT,
+    score      REAL
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_name ON candidates(candidate);
+CREATE INDEX IF NOT EXISTS idx_candidates_run ON candidates(run_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key    TEXT PRIMARY KEY,
+    value  TEXT
+);
+"""
+
+
+def _connect(db_path: Union[str, Path] = CATALOG_PATH) -> sqlite3.Connection:
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def config_hash(overrides: Optional[Dict] = None) -> str:
+    """Stable short hash of config.yaml plus any per-run overrides."""
+    cfg = load_config(CONFIG_PATH)
+    cfg.update(overrides or {})
+    raw = json.dumps(cfg, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def title_from_filename(name: str) -> Optional[str]:
+    """Recover the job title from a `[Job_Title]_...` file name."""
+    match = re.match(r"^\[([^\]]+)\]_", Path(name).name)
+    return match.group(1).replace("_", " ") if match else None
+
+
+def _timestamp_from_filename(name: str) -> Optional[str]:
+    match = re.search(r"_(\d{14})_\d+\.\w+$", Path(name).name)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), "%Y%m%d%H%M%S").isoformat()
+
+
+def register_run(
+    kind: str,
+    file_path: Union[str, Path],
+    candidates: List[Dict],
+    job_title: Optional[str] = None,
+    cfg_hash: Optional[str] = None,
+    created_at: Optional[str] = None,
+    db_path: Union[str, Path] = CATALOG_PATH,
+) -> str:
+    """
+    Record a finished run. `candidates` holds one dict per PDF with keys
+    `pdf_path` and optionally `score`. Returns the new run id.
+    """
+    run_id = uuid.uuid4().hex
+    created_at = created_at or datetime.now().isoformat()
+    with closing(_connect(db_path)) as conn, conn:
+        conn.execute(
+            "INSERT INTO runs (run_id, kind, job_title, created_at, pdf_count, config_hash, file_path) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (run_id, kind, job_title, created_at, len(candidates), cfg_hash, str(file_path)),
+        )
+        conn.executemany(
+            "INSERT INTO candidates (run_id, candidate, pdf_path, score) VALUES (?, ?, ?, ?)",
+            [
+                (run_id, Path(str(c["pdf_path"])).name, str(c["pdf_path"]), c.get("score"))
+                for c in candidates
+            ],
+        )
+    return run_id
+
+
+def update_run_scores(file_path: Union[str, Path], scores: Dict[str, Optional[float]], db_path: Union[str, Path] = CATALOG_PATH):
+    """Update candidate scores of the run stored in `file_path` (e.g. after a background finish)."""
+    with closing(_connect(db_path)) as conn, conn:
+        conn.executemany(
+            "UPDATE candidates SET score = ? WHERE pdf_path = ? "
+            "AND run_id IN (SELECT run_id FROM runs WHERE file_path = ?)",
+            [(score, pdf_path, str(file_path)) for pdf_path, score in scores.items()],
+        )
+
+
+def list_runs(
+    kind: str,
+    job_title: Optional[str] = None,
+    limit: Optional[int] = None,
+    db_path: Union[str, Path] = CATALOG_PATH,
+) -> List[Dict]:
+    """Runs of one kind, newest first, optionally for a single job title."""
+    sql = "SELECT * FROM runs WHERE kind = ?"
+    params: List = [kind]
+    if job_title is not None:
+        sql += " AND job_title = ?"
+        params.append(job_title)
+    sql += " ORDER BY created_at DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    with closing(_connect(db_path)) as conn:
+        return [dict(r) for r in conn.execute(sql, params)]
+
+
+def list_job_titles(kind: str, db_path: Union[str, Path] = CATALOG_PATH) -> List[str]:
+    with closing(_connect(db_path)) as conn:
+        return [r["job_title"] for r in conn.execute(
+            "SELECT DISTINCT job_title FROM runs WHERE kind = ? AND job_title IS NOT NULL ORDER BY job_title",
+            (kind,),
+        )]
+
+
+def run_label(run: Dict) -> str:
+    """Human readable selectbox label for a run."""
+    return f"{run.get('job_title') or 'Unknown title'} — {run['created_at'][:19].replace('T', ' ')} ({run['pdf_count']} PDFs)"
+
+
+def latest_run(kind: str, job_title: str, db_path: Union[str, Path] = CATALOG_PATH) -> Optional[Dict]:
+    runs = list_runs(kind, job_title=job_title, limit=1, db_path=db_path)
+    return runs[0] if runs else None
+
+
+def runs_for_candidate(
+    candidate: str,
+    kind: Optional[str] = None,
+    db_path: Union[str, Path] = CATALOG_PATH,
+) -> List[Dict]:
+    """All runs containing a PDF whose file name contains `candidate`, newest first."""
+    sql = (
+        "SELECT r.*, c.candidate, c.score FROM candidates c "
+        "JOIN runs r ON r.run_id = c.run_id WHERE c.candidate LIKE ?"
+    )
+    params: List = [f"%{candidate}%"]
+    if kind is not None:
+        sql += " AND r.kind = ?"
+        params.append(kind)
+    sql += " ORDER BY r.created_at DESC"
+    with closing(_connect(db_path)) as conn:
+        return [dict(r) for r in conn.execute(sql, params)]
+
+
+def load_run(run: Dict, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load the rows of one catalogued run, wherever it is stored."""
+    run_id = run["run_id"] if run.get("compacted") else None
+    if run["kind"] == "scan":
+        return load_scan_results(run["file_path"], columns=columns, run_id=run_id)
+    path = Path(run["file_path"])
+    if path.suffix.lower() == ".csv":
+        return pd.read_csv(path, usecols=lambda c: columns is None or c in columns)
+    filters = [("run_id", "=", run_id)] if run_id is not None else None
+    if columns is not None:
+        available = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in available]
+    return pq.read_table(path, columns=columns, filters=filters, partitioning=None).to_pandas()
+
+
+def _read_for_index(kind: str, path: Path) -> List[Dict]:
+    if kind == "scan":
+        df = load_scan_results(path, columns=["pdf_path", "file_path", "score"])
+    else:
+        df = pd.read_csv(path, usecols=lambda c: c == "pdf_path")
+    candidates = []
+    for record in df.to_dict("records"):
+        pdf_path = record.get("file_path") or record.get("pdf_path")
+        if isinstance(pdf_path, str):
+            candidates.append({"pdf_path": pdf_path, "score": record.get("score")})
+    return candidates
+
+
+def sync_directory(kind: str, db_path: Union[str, Path] = CATALOG_PATH) -> int:
+    """Index result files that are on disk but not yet in the catalog."""
+    results_dir = RESULT_DIRS[kind]
+    results_dir.mkdir(parents=True, exist_ok=True)
+    with closing(_connect(db_path)) as conn:
+        known = {r["file_path"] for r in conn.execute("SELECT file_path FROM runs WHERE kind = ?", (kind,))}
+
+    added = 0
+    for name in sorted(os.listdir(results_dir)):
+        path = results_dir / name
+        if not name.lower().endswith(RESULT_EXTENSIONS) or str(path) in known:
+            continue
+        try:
+            candidates = _read_for_index(kind, path)
+        except Exception as e:
+            print(f"Warning: could not index '{path}': {e}", file=sys.stderr)
+            continue
+        job_title = title_from_filename(name)
+        if job_title is None and candidates:
+            job_title = title_from_filename(candidates[0]["pdf_path"])
+        created_at = _timestamp_from_filename(name) or datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+        register_run(kind, path, candidates, job_title=job_title, created_at=created_at, db_path=db_path)
+        added += 1
+
+    with closing(_connect(db_path)) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (f"synced:{kind}", datetime.now().isoformat()),
+        )
+    return added
+
+
+def is_synced(kind: str, db_path: Union[str, Path] = CATALOG_PATH) -> bool:
+    """Whether pre-existing result files of this kind have been indexed once."""
+    with closing(_connect(db_path)) as conn:
+        return conn.execute("SELECT 1 FROM meta WHERE key = ?", (f"synced:{kind}",)).fetchone() is not None
+
+
+def _partition_path(kind: str, job_title: Optional[str], created_at: str) -> Path:
+    safe_title = (job_title or "unknown").replace(" ", "_").replace("/", "-")
+    month = created_at[:7].replace("-", "")
+    return RESULT_DIRS[kind] / ARCHIVE_DIRNAME / f"job_title={safe_title}" / f"{month}.parquet"
+
+
+def _run_table(kind: str, run: Dict) -> pa.Table:
+    df = load_run(run)
+    if kind == "scan":
+        table = frame_to_table(df, SCAN_RESULTS_SCHEMA)
+    else:
+        table = pa.Table.from_pandas(df.astype("string"), preserve_index=False)
+    return table.append_column("run_id", pa.array([run["run_id"]] * table.num_rows, pa.string()))
+
+
+def _write_partition(path: Path, tables: List[pa.Table]):
+    """Atomically replace a partition file with the concatenation of `tables`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # unique per writer, so concurrent compactions never share a tmp file
+    tmp_path = path.with_suffix(f".{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        pq.write_table(pa.concat_tables(tables, promote_options="default"), tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def compact(kind: str, older_than_days: int, db_path: Union[str, Path] = CATALOG_PATH) -> int:
+    """
+    Merge standalone runs older than `older_than_days` into
+    `<results_dir>/archive/job_title=<title>/<YYYYMM>.parquet` partitions.
+    Returns the number of runs compacted.
+    """
+    cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+    with closing(_connect(db_path)) as conn:
+        runs = [dict(r) for r in conn.execute(
+            "SELECT * FROM runs WHERE kind = ? AND compacted = 0 AND created_at < ?",
+            (kind, cutoff),
+        )]
+
+    groups: Dict[Path, List[Dict]] = {}
+    for run in runs:
+        groups.setdefault(_partition_path(kind, run["job_title"], run["created_at"]), []).append(run)
+
+    compacted = 0
+    for part_path, part_runs in groups.items():
+        tables = [pq.read_table(part_path, partitioning=None)] if part_path.exists() else []
+        merged = []
+        for run in part_runs:
+            try:
+                tables.append(_run_table(kind, run))
+                merged.append(run)
+            except Exception as e:
+                print(f"Warning: skipping run {run['run_id']} ({run['file_path']}): {e}", file=sys.stderr)
+        if not merged:
+            continue
+        _write_partition(part_path, tables)
+
+        with closing(_connect(db_path)) as conn, conn:
+            conn.executemany(
+                "UPDATE runs SET file_path = ?, compacted = 1 WHERE run_id = ?",
+                [(str(part_path), run["run_id"]) for run in merged],
+            )
+        for run in merged:
+            try:
+                os.remove(run["file_path"])
+            except OSError:
+                pass
+        compacted += len(merged)
+    return compacted
+
+
+def apply_retention(kind: str, max_age_days: int, db_path: Union[str, Path] = CATALOG_PATH) -> int:
+    """Delete runs older than `max_age_days` from disk and from the catalog."""
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+    with closing(_connect(db_path)) as conn:
+        expired = [dict(r) for r in conn.execute(
+            "SELECT * FROM runs WHERE kind = ? AND created_at < ?", (kind, cutoff),
+        )]
+
+    by_partition: Dict[str, List[str]] = {}
+    for run in expired:
+        if run["compacted"]:
+            by_partition.setdefault(run["file_path"], []).append(run["run_id"])
+        else:
+            try:
+                os.remove(run["file_path"])
+            except OSError:
+                pass
+
+    for part_path, run_ids in by_partition.items():
+        path = Path(part_path)
+        if not path.exists():
+            continue
+        table = pq.read_table(path, partitioning=None)
+        keep = pc.invert(pc.is_in(table["run_id"], value_set=pa.array(run_ids)))
+        remaining = table.filter(keep)
+        if remaining.num_rows:
+            _write_partition(path, [remaining])
+        else:
+            path.unlink()
+
+    with closing(_connect(db_path)) as conn, conn:
+        conn.executemany("DELETE FROM runs WHERE run_id = ?", [(r["run_id"],) for r in expired])
+    return len(expired)
+
+
+def main(argv: Optional[List[str]] = None):
+    cfg = load_config(CONFIG_PATH)
+
+    parser = argparse.ArgumentParser(description="Maintain the scan/evaluate results catalog.")
+    parser.add_argument("command", choices=["sync", "compact", "retain", "maintain"])
+    parser.add_argument("--kind", choices=list(RESULT_DIRS), action="append",
+                        help="Result kind to process (default: all)")
+    parser.add_argument("--compact-after-days", type=int,
+                        default=cfg.get("catalog_compact_after_days", 30))
+    parser.add_argument("--retention-days", type=int,
+                        default=cfg.get("catalog_retention_days", 365))
+    args = parser.parse_args(argv)
+
+    for kind in args.kind or list(RESULT_DIRS):
+        if args.command in ("sync", "maintain"):
+            print(f"Info: [{kind}] indexed {sync_directory(kind)} new result files.")
+        if args.command in ("compact", "maintain"):
+            print(f"Info: [{kind}] compacted {compact(kind, args.compact_after_days)} runs.")
+        if args.command in ("retain", "maintain"):
+            print(f"Info: [{kind}] removed {apply_retention(kind, args.retention_days)} expired runs.")
+
+
+if __name__ == "__main__":
+    main()
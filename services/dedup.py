@@ -0,0 +1,260 @@
+# Duplicate detection for uploaded resumes: exact matches by content hash
+# (sha256 of the PDF bytes) and near-duplicates by MinHash over word
+# shingles of the extracted text, looked up through LSH bands in SQLite.
+# Cached Gemini evaluations are keyed by (content hash, JD hash) so a
+# re-upload of the same resume for the same JD is not sent again.
+import hashlib
+import sqlite3
+import zlib
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from services.blob_store import resolve_pdf
+from utils.config_utils import load_config
+
+DEDUP_DB_PATH = Path("data/dedup.db")
+
+NUM_PERM = 128
+LSH_BANDS = 16              # 16 bands x 8 rows: candidates from ~0.7 Jaccard
+SHINGLE_SIZE = 5
+_MERSENNE = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    record_id     TEXT PRIMARY KEY,
+    name_pdf      TEXT NOT NULL,
+    sha256        TEXT NOT NULL,
+    signature     BLOB,
+    duplicate_of  TEXT,
+    match         TEXT,
+    similarity    REAL,
+    created_at    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_sha ON documents(sha256);
+CREATE TABLE IF NOT EXISTS lsh (
+    band       INTEGER NOT NULL,
+    bucket     TEXT NOT NULL,
+    record_id  TEXT NOT NULL REFERENCES documents(record_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_lsh_bucket ON lsh(band, bucket);
+CREATE TABLE IF NOT EXISTS evaluations (
+    sha256                 TEXT NOT NULL,
+    jd_hash                TEXT NOT NULL,
+    current_skills         TEXT,
+    key_strengths          TEXT,
+    missing_skills         TEXT,
+    areas_for_improvement  TEXT,
+    created_at             TEXT NOT NULL,
+    PRIMARY KEY (sha256, jd_hash)
+);
+"""
+
+
+def _connect(db_path: Union[str, Path] = DEDUP_DB_PATH) -> sqlite3.Connection:
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _shingles(text: str) -> List[str]:
+    words = text.lower().split()
+    if len(words) <= SHINGLE_SIZE:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """NUM_PERM-value MinHash of the text's word shingles (None for empty text)."""
+    shingles = _shingles(text)
+    if not shingles:
+        return None
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in set(shingles)), dtype=np.uint64)
+    # (a*x + b) mod p for every permutation at once: (NUM_PERM, n_shingles)
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _MERSENNE
+    return permuted.min(axis=1)
+
+
+def estimate_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.mean(sig_a == sig_b))
+
+
+def _band_buckets(signature: np.ndarray) -> List[Tuple[int, str]]:
+    rows = NUM_PERM // LSH_BANDS
+    return [
+        (band, hashlib.sha1(signature[band * rows:(band + 1) * rows].tobytes()).hexdigest()[:16])
+        for band in range(LSH_BANDS)
+    ]
+
+
+def check_upload(
+    sha256: str,
+    text: Optional[str] = None,
+    folder: Union[str, Path] = "folder_pdf",
+    db_path: Union[str, Path] = DEDUP_DB_PATH,
+) -> Dict:
+    """
+    Look up an upload among earlier ones. Returns a dict with `sha256`,
+    `signature`, `match` ("exact", "near" or None), `duplicate_of`
+    (record id), `original_pdf` and `similarity`. Only originals whose
+    PDF still exists (in the blob store or flat in `folder`) count.
+    """
+    result = {"sha256": sha256, "signature": None, "match": None,
+              "duplicate_of": None, "original_pdf": None, "similarity": None}
+    with closing(_connect(db_path)) as conn:
+        for row in conn.execute(
+            "SELECT record_id, name_pdf FROM documents WHERE sha256 = ? ORDER BY created_at", (sha256,)
+        ):
+            if resolve_pdf(row["name_pdf"], folder).exists():
+                result.update(match="exact", duplicate_of=row["record_id"],
+                              original_pdf=row["name_pdf"], similarity=1.0)
+                return result
+
+        if not text:
+            return result
+        signature = minhash_signature(text)
+        result["signature"] = signature
+        if signature is None:
+            return result
+
+        buckets = _band_buckets(signature)
+        clause = " OR ".join(["(l.band = ? AND l.bucket = ?)"] * len(buckets))
+        params = [v for pair in buckets for v in pair]
+        candidates = conn.execute(
+            f"SELECT DISTINCT d.record_id, d.name_pdf, d.signature FROM lsh l "
+            f"JOIN documents d ON d.record_id = l.record_id WHERE {clause}",
+            params,
+        ).fetchall()
+
+    threshold = float(load_config().get("near_duplicate_threshold", 0.8))
+    best = None
+    for row in candidates:
+        if row["signature"] is None or not resolve_pdf(row["name_pdf"], folder).exists():
+            continue
+        similarity = estimate_similarity(signature, np.frombuffer(row["signature"], dtype=np.uint64))
+        if similarity >= threshold and (best is None or similarity > best[0]):
+            best = (similarity, row["record_id"], row["name_pdf"])
+    if best is not None:
+        result.update(match="near", similarity=best[0], duplicate_of=best[1], original_pdf=best[2])
+    return result
+
+
+def register_upload(record_id: str, name_pdf: str, check: Dict, db_path: Union[str, Path] = DEDUP_DB_PATH):
+    """Store an upload's fingerprints (the result of `check_upload`) under its record id."""
+    register_uploads([(record_id, name_pdf, check)], db_path)
+
+
+def register_uploads(uploads: List[Tuple[str, str, Dict]], db_path: Union[str, Path] = DEDUP_DB_PATH):
+    """register_upload() for many (record_id, name_pdf, check) in one transaction."""
+    now = datetime.now().isoformat()
+    documents, buckets = [], []
+    for record_id, name_pdf, check in uploads:
+        signature = check.get("signature")
+        documents.append((record_id, name_pdf, check["sha256"],
+                          signature.tobytes() if signature is not None else None,
+                          check.get("duplicate_of"), check.get("match"), check.get("similarity"), now))
+        # exact copies share the original's signature, so only new content goes into the LSH index
+        if signature is not None and check.get("match") != "exact":
+            buckets += [(band, bucket, record_id) for band, bucket in _band_buckets(signature)]
+    with closing(_connect(db_path)) as conn, conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO documents "
+            "(record_id, name_pdf, sha256, signature, duplicate_of, match, similarity, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            documents,
+        )
+        conn.executemany("INSERT INTO lsh (band, bucket, record_id) VALUES (?, ?, ?)", buckets)
+
+
+class PendingUploads:
+    """
+    Uploads of one batch that are checked but not registered yet. Later
+    files of the batch are also compared against them (exact by hash, near
+    through an in-memory copy of the LSH bands); register() then writes the
+    whole batch in one transaction.
+    """
+
+    def __init__(self, folder: Union[str, Path] = "folder_pdf", db_path: Union[str, Path] = DEDUP_DB_PATH):
+        self.folder = folder
+        self.db_path = db_path
+        self.uploads: List[Tuple[str, str, Dict]] = []
+        self._by_sha: Dict[str, Tuple[str, str]] = {}
+        self._buckets: Dict[Tuple[int, str], List[int]] = {}
+
+    def check(self, sha256: str, text: Optional[str] = None) -> Dict:
+        """check_upload() against registered uploads and the pending ones."""
+        if sha256 in self._by_sha:
+            record_id, name_pdf = self._by_sha[sha256]
+            return {"sha256": sha256, "signature": None, "match": "exact",
+                    "duplicate_of": record_id, "original_pdf": name_pdf, "similarity": 1.0}
+        result = check_upload(sha256, text, self.folder, self.db_path)
+        signature = result["signature"]
+        if signature is None or not self._buckets:
+            return result
+
+        threshold = float(load_config().get("near_duplicate_threshold", 0.8))
+        candidates = {i for key in _band_buckets(signature) for i in self._buckets.get(key, ())}
+        for i in candidates:
+            record_id, name_pdf, check = self.uploads[i]
+            similarity = estimate_similarity(signature, check["signature"])
+            if similarity >= threshold and similarity > (result["similarity"] or 0.0):
+                result.update(match="near", similarity=similarity, duplicate_of=record_id, original_pdf=name_pdf)
+        return result
+
+    def add(self, record_id: str, name_pdf: str, check: Dict):
+        original = check["duplicate_of"] if check.get("match") == "exact" else record_id
+        self._by_sha.setdefault(check["sha256"], (original, name_pdf))
+        if check.get("signature") is not None and check.get("match") != "exact":
+            for key in _band_buckets(check["signature"]):
+                self._buckets.setdefault(key, []).append(len(self.uploads))
+        self.uploads.append((record_id, name_pdf, check))
+
+    def register(self):
+        register_uploads(self.uploads, self.db_path)
+
+
+def duplicate_flags(db_path: Union[str, Path] = DEDUP_DB_PATH) -> Dict[str, Dict]:
+    """{record_id: {match, duplicate_of, similarity}} for uploads flagged as duplicates."""
+    with closing(_connect(db_path)) as conn:
+        rows = conn.execute(
+            "SELECT record_id, match, duplicate_of, similarity FROM documents WHERE match IS NOT NULL"
+        ).fetchall()
+    return {row["record_id"]: dict(row) for row in rows}
+
+
+def content_hash_of(record_id: str, db_path: Union[str, Path] = DEDUP_DB_PATH) -> Optional[str]:
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute("SELECT sha256 FROM documents WHERE record_id = ?", (record_id,)).fetchone()
+    return row["sha256"] if row else None
+
+
+def _jd_hash(job_description: str) -> str:
+    return hashlib.sha1(" ".join(job_description.split()).lower().encode("utf-8")).hexdigest()
+
+
+def cached_evaluation(sha256: str, job_description: str, db_path: Union[str, Path] = DEDUP_DB_PATH) -> Optional[Tuple[str, str, str, str]]:
+    """Earlier evaluation of the same resume content against the same JD, if any."""
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute(
+            "SELECT current_skills, key_strengths, missing_skills, areas_for_improvement "
+            "FROM evaluations WHERE sha256 = ? AND jd_hash = ?",
+            (sha256, _jd_hash(job_description)),
+        ).fetchone()
+    return tuple(row) if row else None
+
+
+def store_evaluation(sha256: str, job_description: str, evaluation: Tuple[str, str, str, str], db_path: Union[str, Path] = DEDUP_DB_PATH):
+    with closing(_connect(db_path)) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (sha256, _jd_hash(job_description), *evaluation, datetime.now().isoformat()),
+        )
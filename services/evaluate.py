@@ -2,12 +2,16 @@ import requests
 import os
 import sys
 import re
+import time
 from pathlib import Path
-from typing import Union, Tuple
+from typing import List, Union, Tuple, Optional
 import pymupdf
 from internal.cv_evaluate import analyze_resume
 import pandas as pd
 from datetime import datetime
+from services.catalog import register_run, config_hash, title_from_filename
+from services.dedup import cached_evaluation, store_evaluation
+from utils import metrics_utils
 
 def extract_text_from_pdf(pdf_path: Union[str, Path]) -> str:
     try:
@@ -31,11 +35,32 @@ def extract_text_from_pdf(pdf_path: Union[str, Path]) -> str:
 
 
 def evaluate_resume(
-     pdf_path: Union[str, Path], job_description: str, api_key: str
+     pdf_path: Union[str, Path], job_description: str, api_key: str, job_title: Optional[str] = None,
+     content_hashes: Optional[List[str]] = None,
 ) -> Tuple[str, str, str, str]:
-    cv_text = extract_text_from_pdf(pdf_path)
+    """
+    Gemini evaluation of one resume. With `content_hashes` (the upload's own
+    hash first, then that of a duplicate's original) a stored evaluation of
+    the same content and JD is reused instead of calling the API again.
+    """
+    start = time.perf_counter()
+    source = "cache"
+    evaluation = None
+    for sha256 in content_hashes or []:
+        evaluation = cached_evaluation(sha256, job_description)
+        if evaluation is not None:
+            print(f"Info: Reusing stored evaluation for '{pdf_path}' (content {sha256[:12]}).")
+            break
+    if evaluation is None:
+        source = "gemini"
+        cv_text = extract_text_from_pdf(pdf_path)
+        evaluation = analyze_resume(cv_text, job_description, api_key)
+        if content_hashes and evaluation and any(evaluation):
+            store_evaluation(content_hashes[0], job_description, evaluation)
+    metrics_utils.observe("ads_evaluation_seconds", time.perf_counter() - start, source=source)
+    metrics_utils.inc("ads_evaluations_total", source=source)
 
-    current_skills, key_strengths, missing_skills, areas_for_improvement = analyze_resume(cv_text, job_description, api_key)
+    current_skills, key_strengths, missing_skills, areas_for_improvement = evaluation
 
     out_dir = Path("evaluate_results")
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -55,4 +80,12 @@ def evaluate_resume(
     }])
     df.to_csv(result_path, index=False)
 
+    register_run(
+        "evaluate",
+        result_path,
+        [{"pdf_path": str(pdf_path)}],
+        job_title=job_title or title_from_filename(str(pdf_path)),
+        cfg_hash=config_hash(),
+    )
+
     return current_skills, key_strengths, missing_skills, areas_for_improvement
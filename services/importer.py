@@ -0,0 +1,159 @@
+# Streaming bulk import of resume text exports (ATS dumps shaped like
+# hypothesis/Resume.csv, or JSONL). Records are read in fixed-size chunks and
+# scored with CVScanner.scan_texts, and per-resume results are appended to a
+# JSONL file, so a multi-gigabyte corpus never has to fit in memory.
+#
+#   python -m services.importer export.csv --jd jd.txt --job-title "Data Analyst" --out results.jsonl
+import argparse
+import gzip
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import pandas as pd
+from internal.cv_scanner import CVScanner, get_scanner, load_requirement, scoring_params
+from utils.config_utils import load_config
+from utils.skill_utils import load_skills
+
+DEFAULT_CHUNKSIZE = 500
+
+
+def iter_csv_chunks(
+    path: Union[str, Path],
+    id_column: str = "ID",
+    text_column: str = "Resume_str",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> Iterator[List[Tuple[str, str]]]:
+    """Yield lists of (id, text) pairs from a CSV, reading only the two needed columns."""
+    reader = pd.read_csv(
+        path,
+        usecols=[id_column, text_column],
+        dtype={id_column: str, text_column: str},
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        chunk = chunk.dropna(subset=[text_column])
+        yield list(zip(chunk[id_column].astype(str), chunk[text_column]))
+
+
+def iter_jsonl_chunks(
+    path: Union[str, Path],
+    id_field: str = "id",
+    text_field: str = "text",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> Iterator[List[Tuple[str, str]]]:
+    """Yield lists of (id, text) pairs from a JSON-lines file (optionally .gz)."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    chunk: List[Tuple[str, str]] = []
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Warning: skipping malformed line {line_no} in '{path}': {e}", file=sys.stderr)
+                continue
+            text = record.get(text_field)
+            if not isinstance(text, str):
+                continue
+            chunk.append((str(record.get(id_field, line_no)), text))
+            if len(chunk) >= chunksize:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_corpus_chunks(
+    path: Union[str, Path],
+    id_column: Optional[str] = None,
+    text_column: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> Iterator[List[Tuple[str, str]]]:
+    """Dispatch on file type: .csv[.gz] or .jsonl/.ndjson[.gz]."""
+    suffixes = [s.lower() for s in Path(path).suffixes]
+    if ".jsonl" in suffixes or ".ndjson" in suffixes:
+        return iter_jsonl_chunks(path, id_column or "id", text_column or "text", chunksize)
+    if ".csv" in suffixes:
+        return iter_csv_chunks(path, id_column or "ID", text_column or "Resume_str", chunksize)
+    raise ValueError(f"Unsupported corpus format: '{path}' (expected .csv or .jsonl)")
+
+
+def score_corpus(
+    corpus_path: Union[str, Path],
+    job_description: str,
+    output_path: Union[str, Path],
+    job_title: Optional[str] = None,
+    scanner: Optional[CVScanner] = None,
+    id_column: Optional[str] = None,
+    text_column: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> Dict:
+    """
+    Score every resume in a CSV/JSONL export chunk by chunk and append one
+    JSON object per resume to `output_path`. Returns a small run summary.
+    """
+    if not job_description or not job_description.strip():
+        raise ValueError("`job_description` must be a non-empty string")
+
+    if scanner is None:
+        cfg = load_config()
+        scanner = get_scanner(cfg["model_id"], cfg["spacy_model"])
+    skills_map = load_skills()
+    params = scoring_params()  # whole corpus is scored with one config version
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    docs = errors = 0
+    best: Optional[Tuple[float, str]] = None
+    with output_path.open("w", encoding="utf-8") as out:
+        for chunk in iter_corpus_chunks(corpus_path, id_column, text_column, chunksize):
+            results = scanner.scan_texts(job_description, chunk, skills_map, target_job_title=job_title, params=params)
+            for doc_id, details in results.items():
+                out.write(json.dumps({"id": doc_id, **details}, default=str) + "\n")
+                docs += 1
+                if details.get("error"):
+                    errors += 1
+                if best is None or details["score"] > best[0]:
+                    best = (details["score"], doc_id)
+            out.flush()
+            print(f"Info: Scored {docs} resumes so far...")
+
+    return {
+        "docs": docs,
+        "errors": errors,
+        "best_id": best[1] if best else None,
+        "best_score": best[0] if best else None,
+        "output": str(output_path),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Score a CSV/JSONL resume export in streaming chunks.")
+    parser.add_argument("corpus", help="CSV (ID, Resume_str columns) or JSONL (id, text fields) export")
+    parser.add_argument("--jd", required=True, help="Job description text file")
+    parser.add_argument("--job-title", default=None)
+    parser.add_argument("--out", required=True, help="Output JSONL path")
+    parser.add_argument("--id-column", default=None)
+    parser.add_argument("--text-column", default=None)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    summary = score_corpus(
+        corpus_path=args.corpus,
+        job_description=load_requirement(Path(args.jd)),
+        output_path=args.out,
+        job_title=args.job_title,
+        id_column=args.id_column,
+        text_column=args.text_column,
+        chunksize=args.chunksize,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+# Local background job queue (SQLite) for scans, with two priority lanes:
+# "interactive" (single-CV scans from the upload page) always runs before
+# "bulk" (score_all rescans), so bulk work is deferred while users wait.
+# Start a worker next to the Streamlit app:
+#   python -m services.jobs worker
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+import uuid
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+from utils import metrics_utils
+
+JOBS_DB_PATH = Path("data/jobs.db")
+
+LANES = {"interactive": 0, "bulk": 1}   # lower runs first
+POLL_INTERVAL_S = 1.0
+HEARTBEAT_TIMEOUT_S = 30
+MAX_ATTEMPTS = 3                        # claims before a job that keeps losing its worker is failed
+PROGRESS_EVERY_S = 0.5
+LEADERBOARD_SIZE = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id       TEXT PRIMARY KEY,
+    kind         TEXT NOT NULL,
+    lane         TEXT NOT NULL,
+    priority     INTEGER NOT NULL,
+    status       TEXT NOT NULL,
+    params       TEXT NOT NULL,
+    progress     TEXT,
+    result       TEXT,
+    error        TEXT,
+    worker_id    TEXT,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    created_at   TEXT NOT NULL,
+    started_at   TEXT,
+    finished_at  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(status, priority, created_at);
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id    TEXT PRIMARY KEY,
+    heartbeat    TEXT NOT NULL,
+    pid          INTEGER,
+    host         TEXT
+);
+"""
+
+
+def _connect(db_path: Union[str, Path] = JOBS_DB_PATH) -> sqlite3.Connection:
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="milliseconds")
+
+
+def _row_to_job(row: sqlite3.Row) -> Dict:
+    job = dict(row)
+    for key in ("params", "progress", "result"):
+        job[key] = json.loads(job[key]) if job[key] else None
+    return job
+
+
+# ---------- producer side ----------
+
+def enqueue(kind: str, params: Dict, lane: str = "interactive", db_path: Union[str, Path] = JOBS_DB_PATH) -> str:
+    """Queue a job and return its id."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown lane '{lane}' (expected one of {list(LANES)})")
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    job_id = uuid.uuid4().hex
+    with closing(_connect(db_path)) as conn:
+        conn.execute(
+            "INSERT INTO jobs (job_id, kind, lane, priority, status, params, created_at) "
+            "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+            (job_id, kind, lane, LANES[lane], json.dumps(params, default=str), _now()),
+        )
+    return job_id
+
+
+def get_job(job_id: str, db_path: Union[str, Path] = JOBS_DB_PATH) -> Optional[Dict]:
+    """Current status, progress and result of a job (None if unknown)."""
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+    return _row_to_job(row) if row else None
+
+
+def queue_position(job_id: str, db_path: Union[str, Path] = JOBS_DB_PATH) -> int:
+    """How many queued jobs will run before this one (0 once it is running)."""
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute("SELECT priority, created_at, status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None or row["status"] != "queued":
+            return 0
+        return conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND "
+            "(priority < ? OR (priority = ? AND created_at < ?))",
+            (row["priority"], row["priority"], row["created_at"]),
+        ).fetchone()[0]
+
+
+def queue_depths(db_path: Union[str, Path] = JOBS_DB_PATH) -> Dict[str, Dict[str, int]]:
+    """{lane: {status: count}} over all jobs."""
+    depths: Dict[str, Dict[str, int]] = {lane: {} for lane in LANES}
+    with closing(_connect(db_path)) as conn:
+        for row in conn.execute("SELECT lane, status, COUNT(*) AS n FROM jobs GROUP BY lane, status"):
+            depths.setdefault(row["lane"], {})[row["status"]] = row["n"]
+    return depths
+
+
+def _queue_metrics():
+    if not JOBS_DB_PATH.exists():
+        return []
+    return [
+        ("ads_jobs", "gauge", "Background jobs by lane and status.", {"lane": lane, "status": status}, statuses.get(status, 0))
+        for lane, statuses in queue_depths().items()
+        for status in ("queued", "running")
+    ]
+
+
+metrics_utils.register_collector(_queue_metrics)
+
+
+def list_jobs(limit: int = 50, db_path: Union[str, Path] = JOBS_DB_PATH) -> List[Dict]:
+    with closing(_connect(db_path)) as conn:
+        rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+    return [_row_to_job(r) for r in rows]
+
+
+def cancel_job(job_id: str, db_path: Union[str, Path] = JOBS_DB_PATH) -> bool:
+    """Cancel a job that has not started yet."""
+    with closing(_connect(db_path)) as conn:
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE job_id = ? AND status = 'queued'",
+            (_now(), job_id),
+        )
+    return cur.rowcount > 0
+
+
+def worker_alive(db_path: Union[str, Path] = JOBS_DB_PATH) -> bool:
+    """True if any worker sent a heartbeat recently."""
+    cutoff = (datetime.now() - timedelta(seconds=HEARTBEAT_TIMEOUT_S)).isoformat(timespec="milliseconds")
+    with closing(_connect(db_path)) as conn:
+        return conn.execute("SELECT 1 FROM workers WHERE heartbeat >= ? LIMIT 1", (cutoff,)).fetchone() is not None
+
+
+def wait_for_job(
+    job_id: str,
+    on_update: Optional[Callable[[Dict], None]] = None,
+    poll_interval: float = 0.5,
+    timeout: Optional[float] = None,
+    db_path: Union[str, Path] = JOBS_DB_PATH,
+) -> Dict:
+    """Poll until the job leaves queued/running; `on_update(job)` is called on every poll."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        job = get_job(job_id, db_path)
+        if job is None:
+            raise KeyError(f"Unknown job '{job_id}'")
+        if on_update is not None:
+            on_update(job)
+        if job["status"] not in ("queued", "running"):
+            return job
+        if deadline is not None and time.monotonic() > deadline:
+            return job
+        time.sleep(poll_interval)
+
+
+# ---------- worker side ----------
+
+def _requeue_orphaned(conn: sqlite3.Connection) -> int:
+    """
+    Running jobs whose worker stopped sending heartbeats go back to the
+    queue, or fail once they have been claimed MAX_ATTEMPTS times (a job
+    that crashes its worker every time). Call inside a transaction.
+    """
+    cutoff = (datetime.now() - timedelta(seconds=HEARTBEAT_TIMEOUT_S)).isoformat(timespec="milliseconds")
+    orphaned = (
+        "status = 'running' AND (worker_id IS NULL OR worker_id NOT IN "
+        "(SELECT worker_id FROM workers WHERE heartbeat >= ?))"
+    )
+    conn.execute(
+        f"UPDATE jobs SET status = 'failed', finished_at = ?, "
+        f"error = 'Worker stopped during each of ' || attempts || ' attempts' "
+        f"WHERE {orphaned} AND attempts >= ?",
+        (_now(), cutoff, MAX_ATTEMPTS),
+    )
+    return conn.execute(
+        f"UPDATE jobs SET status = 'queued', worker_id = NULL, started_at = NULL WHERE {orphaned}",
+        (cutoff,),
+    ).rowcount
+
+
+def claim_next(worker_id: str, db_path: Union[str, Path] = JOBS_DB_PATH) -> Optional[Dict]:
+    """
+    Atomically take the oldest queued job of the highest-priority lane,
+    after re-queueing jobs of workers that died while others kept running.
+    """
+    with closing(_connect(db_path)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            requeued = _requeue_orphaned(conn)
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY priority, created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker_id = ?, started_at = ?, attempts = attempts + 1 WHERE job_id = ?",
+                    (worker_id, _now(), row["job_id"]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    if requeued:
+        print(f"Info: Re-queued {requeued} jobs from stopped workers.")
+    if row is None:
+        return None
+    job = _row_to_job(row)
+    job["status"] = "running"
+    job["attempts"] += 1
+    return job
+
+
+def _update(job_id: str, db_path: Union[str, Path], **fields):
+    assignments = ", ".join(f"{k} = ?" for k in fields)
+    with closing(_connect(db_path)) as conn:
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+
+def _heartbeat(worker_id: str, db_path: Union[str, Path]):
+    with closing(_connect(db_path)) as conn:
+        conn.execute(
+            "INSERT INTO workers (worker_id, heartbeat, pid, host) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(worker_id) DO UPDATE SET heartbeat = excluded.heartbeat",
+            (worker_id, _now(), os.getpid(), socket.gethostname()),
+        )
+
+
+def requeue_orphaned(db_path: Union[str, Path] = JOBS_DB_PATH) -> int:
+    """Put running jobs back in the queue if their worker stopped sending heartbeats."""
+    with closing(_connect(db_path)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            requeued = _requeue_orphaned(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return requeued
+
+
+def _progress_reporter(report: Callable[[Dict], None]) -> Callable[[int, int, str, Dict], None]:
+    """Scanner progress callback that publishes done/total and a live top-N, throttled."""
+    from internal.cv_scanner import TopN
+
+    leaders = TopN(LEADERBOARD_SIZE)
+    last_report = [0.0]
+
+    def on_progress(done: int, total: int, path_str: str, details: Dict):
+        leaders.push(details.get("score", 0.0), path_str, details)
+        now = time.monotonic()
+        if done == total or now - last_report[0] >= PROGRESS_EVERY_S:
+            last_report[0] = now
+            report({
+                "done": done,
+                "total": total,
+                "leaders": [{"pdf_path": p, "score": d.get("score", 0.0)} for p, d in leaders.ranked()],
+            })
+
+    return on_progress
+
+
+def _run_scan_job(job: Dict, report: Callable[[Dict], None]) -> Dict:
+    from services.scanner import scan_record_score
+
+    score, result_file = scan_record_score(**job["params"], progress_callback=_progress_reporter(report))
+    return {"score": score, "result_file": result_file}
+
+
+def _run_scan_batch_job(job: Dict, report: Callable[[Dict], None]) -> Dict:
+    from services.scanner import scan_batch
+
+    best_file, best_score, result_file = scan_batch(**job["params"], progress_callback=_progress_reporter(report))
+    return {"best_file": best_file, "best_score": best_score, "result_file": result_file}
+
+
+def _run_scan_finish_job(job: Dict, report: Callable[[Dict], None]) -> Dict:
+    from services.scanner import finish_scan
+
+    scored = finish_scan(**job["params"], progress_callback=_progress_reporter(report))
+    return {"result_file": job["params"]["result_filename"], "scored": scored}
+
+
+JOB_HANDLERS: Dict[str, Callable[[Dict, Callable[[Dict], None]], Dict]] = {
+    "scan": _run_scan_job,
+    "scan_batch": _run_scan_batch_job,
+    "scan_finish": _run_scan_finish_job,
+}
+
+
+def run_job(job: Dict, worker_id: str, db_path: Union[str, Path] = JOBS_DB_PATH):
+    """Execute one claimed job and store its result or error."""
+    def report(progress: Dict):
+        _update(job["job_id"], db_path, progress=json.dumps(progress))
+
+    try:
+        result = JOB_HANDLERS[job["kind"]](job, report)
+    except Exception as e:
+        print(f"Error: job {job['job_id']} failed: {e}", file=sys.stderr)
+        _update(job["job_id"], db_path, status="failed", finished_at=_now(),
+                error=f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}")
+        return
+    _update(job["job_id"], db_path, status="done", finished_at=_now(), result=json.dumps(result, default=str))
+
+
+def run_worker(
+    poll_interval: float = POLL_INTERVAL_S,
+    once: bool = False,
+    db_path: Union[str, Path] = JOBS_DB_PATH,
+) -> int:
+    """
+    Claim and run jobs until interrupted (or until the queue is empty with
+    `once`). Scanner models stay loaded between jobs. Returns jobs processed.
+    """
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    _heartbeat(worker_id, db_path)
+    requeued = requeue_orphaned(db_path)
+    if requeued:
+        print(f"Info: Re-queued {requeued} jobs from stopped workers.")
+    print(f"Info: Worker {worker_id} waiting for jobs in '{db_path}'.")
+
+    # heartbeats come from a side thread so long jobs (and model loading) keep the worker alive
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(HEARTBEAT_TIMEOUT_S / 3):
+            _heartbeat(worker_id, db_path)
+
+    threading.Thread(target=beat, name="jobs-heartbeat", daemon=True).start()
+
+    processed = 0
+    try:
+        while True:
+            job = claim_next(worker_id, db_path)
+            if job is None:
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+            print(f"Info: Running {job['lane']} job {job['job_id']} ({job['kind']}).")
+            run_job(job, worker_id, db_path)
+            processed += 1
+    except KeyboardInterrupt:
+        print("Info: Worker stopped.")
+    finally:
+        stop.set()
+        with closing(_connect(db_path)) as conn:
+            conn.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+    return processed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Background scan job queue.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker = sub.add_parser("worker", help="Run a worker process")
+    worker.add_argument("--poll-interval", type=float, default=POLL_INTERVAL_S)
+    worker.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    worker.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port (default: config metrics_port)")
+    worker.add_argument("--metrics-file", default=None, help="Write Prometheus metrics to this file (default: config metrics_file)")
+    sub.add_parser("status", help="Show queue depths and recent jobs")
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        metrics_utils.start_exporter(port=args.metrics_port, file=args.metrics_file)
+        run_worker(poll_interval=args.poll_interval, once=args.once)
+    else:
+        print(json.dumps(queue_depths(), indent=2))
+        for job in list_jobs(limit=20):
+            print(f"{job['created_at']}  {job['lane']:<11} {job['status']:<9} {job['job_id']}")
+
+
+if __name__ == "__main__":
+    main()
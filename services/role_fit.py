@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import pandas as pd
+from internal.cv_scanner import get_scanner
+from utils.config_utils import load_config
+from utils.skill_utils import load_skills
+
+def load_job_descriptions(records_csv_path: Union[str, Path] = "data/records.csv") -> Dict[str, str]:
+    """Most recent job description stored per job title (deleted records ignored)."""
+    records_csv_path = Path(records_csv_path)
+    if not records_csv_path.exists():
+        return {}
+    df = pd.read_csv(records_csv_path, usecols=lambda c: c in {"job_title", "job_description", "updated_at", "status"})
+    if "status" in df:
+        df = df[df["status"] != "deleted"]
+    df = df.dropna(subset=["job_title", "job_description"])
+    if "updated_at" in df:
+        df = df.sort_values("updated_at")
+    return df.groupby("job_title")["job_description"].last().to_dict()
+
+
+def role_fit(
+    pdf_path: Optional[Union[str, Path]] = None,
+    cv_text: Optional[str] = None,
+    records_csv_path: Union[str, Path] = "data/records.csv",
+    top_k: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Rank every active job title in the skills library for one resume
+    (a PDF, or already extracted `cv_text`). Returns best fit first.
+    """
+    cfg = load_config()
+    scanner = get_scanner(cfg["model_id"], cfg["spacy_model"])
+    if cv_text is None:
+        if pdf_path is None:
+            raise ValueError("Either `pdf_path` or `cv_text` is required")
+        cv_text = scanner.extract_text_from_pdf(pdf_path)
+    if not cv_text:
+        print(f"Warning: no text extracted for role fit of '{pdf_path}'", file=sys.stderr)
+        return []
+
+    roles = scanner.score_roles(cv_text, load_skills(), load_job_descriptions(records_csv_path))
+    return roles[:top_k] if top_k else roles
@@ -0,0 +1,208 @@
+import ast
+import io
+import json
+import math
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Typed columnar layout of a scan result file (one row per scanned PDF)
+SCORES_TYPE = pa.struct([
+    ("jd", pa.float64()),
+    ("skill", pa.float64()),
+    ("months", pa.float64()),
+    ("word", pa.float64()),
+    ("gpa", pa.float64()),
+    ("raw", pa.float64()),
+    ("max", pa.float64()),
+])
+
+# per-stage wall/CPU seconds, e.g. {"parse": {"wall": 0.1, "cpu": 0.09}, ...}
+TIMINGS_TYPE = pa.map_(pa.string(), pa.struct([("wall", pa.float64()), ("cpu", pa.float64())]))
+
+# best CV sentence per JD requirement line (requirement_coverage setting)
+COVERAGE_TYPE = pa.list_(pa.struct([
+    ("requirement", pa.string()),
+    ("similarity", pa.float64()),
+    ("covered", pa.bool_()),
+    ("evidence", pa.string()),
+]))
+
+SCAN_RESULTS_SCHEMA = pa.schema([
+    ("pdf_path", pa.string()),
+    ("file_path", pa.string()),
+    ("matched_skills_map_title", pa.string()),
+    ("target_skills_list", pa.list_(pa.string())),
+    ("cv_text_raw_len", pa.int64()),
+    ("error", pa.string()),
+    ("jd_similarity", pa.float64()),
+    ("matched_skills_list", pa.list_(pa.string())),
+    ("matched_skills_count", pa.int64()),
+    ("total_months_experience", pa.int64()),
+    ("word_count", pa.int64()),
+    ("gpa", pa.float64()),
+    ("scores", SCORES_TYPE),
+    ("score", pa.float64()),
+    ("timings", TIMINGS_TYPE),
+    ("config_version", pa.string()),
+    ("scan_status", pa.string()),                  # scored / partial / unscored (time budget)
+    ("skipped_stages", pa.list_(pa.string())),
+    ("coverage_ratio", pa.float64()),
+    ("requirement_coverage", COVERAGE_TYPE),
+])
+
+LIST_COLUMNS = ["matched_skills_list", "target_skills_list", "skipped_stages"]
+STRUCT_COLUMNS = ["scores"]
+MAP_COLUMNS = ["timings"]
+RECORD_LIST_COLUMNS = ["requirement_coverage"]
+
+
+def results_to_table(results: Dict[str, Dict]) -> pa.Table:
+    """Convert { pdf_path: details } into a typed Arrow table."""
+    rows = [{"pdf_path": path_str, **details} for path_str, details in results.items()]
+    return pa.Table.from_pylist(rows, schema=SCAN_RESULTS_SCHEMA)
+
+
+def _coerce(value, pa_type: pa.DataType):
+    """Coerce a loosely typed (e.g. legacy CSV) cell to the given Arrow type."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if pa.types.is_integer(pa_type):
+        return int(value)
+    if pa.types.is_floating(pa_type):
+        return float(value)
+    if pa.types.is_string(pa_type):
+        return str(value)
+    if pa.types.is_list(pa_type):
+        return [_coerce(v, pa_type.value_type) for v in value]
+    if pa.types.is_struct(pa_type):
+        return {f.name: _coerce(value.get(f.name), f.type) for f in pa_type}
+    if pa.types.is_map(pa_type):
+        items = value.items() if isinstance(value, dict) else value
+        return {k: _coerce(v, pa_type.item_type) for k, v in items}
+    return value
+
+
+def frame_to_table(df: pd.DataFrame, schema: pa.Schema = SCAN_RESULTS_SCHEMA) -> pa.Table:
+    """Convert a loaded results DataFrame back into a typed Arrow table."""
+    rows = [
+        {f.name: _coerce(record.get(f.name), f.type) for f in schema}
+        for record in df.to_dict("records")
+    ]
+    return pa.Table.from_pylist(rows, schema=schema)
+
+
+def _write_table(table: pa.Table, result_path: Path):
+    # unique per call: a worker's finish_scan and an interactive merge may write the same file
+    tmp_path = result_path.with_suffix(f".{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, result_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def save_scan_results(results: Dict[str, Dict], result_path: Union[str, Path]) -> Path:
+    """Write scan results as a Parquet file with typed list/struct columns."""
+    result_path = Path(result_path)
+    result_path.parent.mkdir(parents=True, exist_ok=True)
+    _write_table(results_to_table(results), result_path)
+    return result_path
+
+
+def merge_scan_results(results: Dict[str, Dict], result_path: Union[str, Path]) -> Path:
+    """
+    Replace the rows of `results` in an existing result file (e.g. CVs a
+    time budget left unscored) and keep the file ranked by score.
+    """
+    result_path = Path(result_path)
+    existing = frame_to_table(load_scan_results(result_path)).to_pylist()
+    rows = [row for row in existing if row["pdf_path"] not in results]
+    rows += results_to_table(results).to_pylist()
+    rows.sort(key=lambda row: (row.get("scan_status") == "unscored", -(row.get("score") or 0.0)))
+    _write_table(pa.Table.from_pylist(rows, schema=SCAN_RESULTS_SCHEMA), result_path)
+    return result_path
+
+
+def _safe_eval(val, default):
+    """Safely evaluate a literal or return default on failure."""
+    if pd.isna(val) or not isinstance(val, str):
+        return default
+    try:
+        return ast.literal_eval(val)
+    except Exception:
+        return default
+
+
+def _load_legacy_csv(result_path: Path, columns: Optional[List[str]]) -> pd.DataFrame:
+    """Read an old repr-encoded CSV result file."""
+    df = pd.read_csv(result_path, usecols=lambda c: columns is None or c in columns)
+    for col in LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].apply(lambda x: _safe_eval(x, []))
+    for col in STRUCT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].apply(lambda x: _safe_eval(x, {}))
+    return df
+
+
+def load_scan_results(
+    result_path: Union[str, Path],
+    columns: Optional[List[str]] = None,
+    run_id: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Load a scan result file, reading only `columns` when given.
+    Parquet files are read column-wise; legacy CSV files are parsed for
+    backwards compatibility. `run_id` selects one run out of a compacted
+    partition file.
+    """
+    result_path = Path(result_path)
+    if result_path.suffix.lower() == ".csv":
+        return _load_legacy_csv(result_path, columns)
+
+    if columns is not None:
+        available = set(pq.read_schema(result_path).names)
+        columns = [c for c in columns if c in available]
+    filters = [("run_id", "=", run_id)] if run_id is not None else None
+    df = pq.read_table(result_path, columns=columns, filters=filters, partitioning=None).to_pandas(maps_as_pydicts="strict")
+    for col in LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].apply(lambda v: list(v) if v is not None else [])
+    for col in STRUCT_COLUMNS + MAP_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].apply(lambda v: v if v is not None else {})
+    for col in RECORD_LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].apply(lambda v: list(v) if v is not None else [])
+    return df
+
+
+def export_csv_bytes(result_path: Union[str, Path], run_id: Optional[str] = None) -> bytes:
+    """
+    Render a result file as CSV on demand: lists become comma-separated
+    strings, the scores struct is flattened into `scores.<part>` columns and
+    requirement coverage is written as JSON.
+    """
+    df = load_scan_results(result_path, run_id=run_id)
+    for col in LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].apply(lambda v: ", ".join(v))
+    for col in RECORD_LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].apply(lambda v: json.dumps(v) if v else "")
+    for col in MAP_COLUMNS:
+        if col in df.columns:
+            df = df.drop(columns=[col])
+    for col in STRUCT_COLUMNS:
+        if col in df.columns:
+            flat = pd.json_normalize(df[col].tolist()).add_prefix(f"{col}.")
+            flat.index = df.index
+            df = pd.concat([df.drop(columns=[col]), flat], axis=1)
+    buf = io.StringIO()
+    df.to_csv(buf, index=False)
+    return buf.getvalue().encode("utf-8")
@@ -1,8 +1,192 @@
 import pandas as pd
 from pathlib import Path
-from typing import Union, List, Dict, Tuple, Optional
+from typing import Callable, Union, List, Dict, Tuple, Optional
 from datetime import datetime
 from internal.cv_scanner import run_cv_scanner
+from services.scan_results import merge_scan_results, save_scan_results
+from services.catalog import register_run, config_hash, update_run_scores
+from services.blob_store import resolve_many
+
+def profile_report_path(result_filename: str) -> Path:
+    """Where the profiler report for a given scan result file is written."""
+    return Path("scan_results") / "profiles" / f"{Path(result_filename).stem}.txt"
+
+
+PENDING_STATUSES = ("unscored", "partial")
+
+
+def scan_names(
+    pdf_list: List[str],
+    job_title: str,
+    job_description: str,
+    pdf_folder: Union[str, Path],
+    skills_file_path: Union[str, Path],
+    user_skill_weight: Optional[float],
+    user_experience_weight: Optional[float],
+    profiler: Optional[str] = None,
+    profile_path: Optional[Path] = None,
+    progress_callback: Optional[Callable[[int, int, str, Dict], None]] = None,
+    time_budget_s: Optional[float] = None,
+) -> Dict[str, Dict]:
+    """
+    Run the CV scanner over record names. Names are resolved through the
+    blob store, but results stay keyed by `<pdf_folder>/<name pdf>` as uploaded.
+    """
+    # -- map record names to stored blobs; names sharing a blob are scanned once --
+    resolved = resolve_many(pdf_list, pdf_folder)
+    display_paths: Dict[str, List[str]] = {}
+    for name in pdf_list:
+        stored = str(resolved[name])
+        display_paths.setdefault(stored, []).append(str(Path(pdf_folder) / name))
+    stored_paths = [str(Path(stored).relative_to(pdf_folder)) for stored in display_paths]
+
+    def report_progress(done: int, total: int, path_str: str, details: Dict):
+        progress_callback(done, total, display_paths.get(path_str, [path_str])[0], details)
+
+    scan_kwargs = dict(
+        skills_file_path=skills_file_path,
+        job_description=job_description,
+        pdf_folder=pdf_folder,
+        pdf_list=stored_paths,
+        job_title=job_title,
+        profiler=profiler,
+        profile_path=profile_path,
+        progress_callback=report_progress if progress_callback is not None else None,
+        time_budget_s=time_budget_s,
+    )
+    if user_skill_weight is not None and user_experience_weight is not None:
+        scan_kwargs.update(
+            user_skill_weight=user_skill_weight,
+            user_experience_weight=user_experience_weight,
+        )
+    return {
+        display: detail
+        for path_str, detail in run_cv_scanner(**scan_kwargs).items()
+        for display in display_paths.get(path_str, [path_str])
+    }
+
+
+def result_filename_for(job_title: str, pdf_count: int) -> str:
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    safe_title = job_title.replace(" ", "_")
+    return f"[{safe_title}]_{timestamp}_{pdf_count}.parquet"
+
+
+def save_and_index(
+    results: Dict[str, Dict],
+    result_path: Path,
+    job_title: str,
+    user_skill_weight: Optional[float],
+    user_experience_weight: Optional[float],
+):
+    """Save ranked results as Parquet and register the run in the catalog."""
+    # -- save full results dict as typed Parquet (CSV is exported on demand) --
+    save_scan_results(results, result_path)
+
+    # -- index the run so result pages can query it without opening files --
+    register_run(
+        "scan",
+        result_path,
+        [{"pdf_path": path_str, "score": detail.get("score")} for path_str, detail in results.items()],
+        job_title=job_title,
+        cfg_hash=config_hash({
+            "user_skill_weight": user_skill_weight,
+            "user_experience_weight": user_experience_weight,
+        }),
+    )
+
+
+def _scan_and_save(
+    pdf_list: List[str],
+    job_title: str,
+    job_description: str,
+    pdf_folder: Union[str, Path],
+    skills_file_path: Union[str, Path],
+    user_skill_weight: Optional[float],
+    user_experience_weight: Optional[float],
+    profiler: Optional[str],
+    progress_callback: Optional[Callable[[int, int, str, Dict], None]],
+    time_budget_s: Optional[float] = None,
+    finish_in_background: bool = False,
+) -> Tuple[Dict[str, Dict], str]:
+    """
+    Scan `pdf_list`, save the results as Parquet and index the run. Returns
+    (results, result_filename). When `time_budget_s` leaves CVs unscored or
+    partially scored and `finish_in_background` is set, a bulk-lane job is
+    queued that scores them fully and updates the same result file.
+    """
+    # -- prepare scan_results folder and filename --
+    scan_dir = Path("scan_results")
+    scan_dir.mkdir(parents=True, exist_ok=True)
+
+    result_filename = result_filename_for(job_title, len(pdf_list))
+    result_path = scan_dir / result_filename
+
+    # -- run the CV scanner on only those PDFs --
+    results = scan_names(
+        pdf_list, job_title, job_description, pdf_folder, skills_file_path,
+        user_skill_weight, user_experience_weight,
+        profiler=profiler,
+        profile_path=profile_report_path(result_filename),
+        progress_callback=progress_callback,
+        time_budget_s=time_budget_s,
+    )
+
+    save_and_index(results, result_path, job_title, user_skill_weight, user_experience_weight)
+
+    # -- hand what the time budget left over to the background worker --
+    pending = pending_names(results, pdf_folder)
+    if pending and finish_in_background:
+        from services.jobs import enqueue
+
+        job_id = enqueue("scan_finish", {
+            "result_filename": result_filename,
+            "filenames": pending,
+            "job_title": job_title,
+            "job_description": job_description,
+            "pdf_folder": str(pdf_folder),
+            "skills_file_path": str(skills_file_path),
+            "user_skill_weight": user_skill_weight,
+            "user_experience_weight": user_experience_weight,
+        }, lane="bulk")
+        print(f"Info: Queued job {job_id} to finish {len(pending)} CVs of '{result_filename}'.")
+
+    return results, result_filename
+
+
+def pending_names(results: Dict[str, Dict], pdf_folder: Union[str, Path] = "folder_pdf") -> List[str]:
+    """Record names the time budget left unscored or partially scored."""
+    return [
+        str(Path(path_str).relative_to(pdf_folder))
+        for path_str, detail in results.items()
+        if detail.get("scan_status") in PENDING_STATUSES
+    ]
+
+
+def finish_scan(
+    result_filename: str,
+    filenames: List[str],
+    job_title: str,
+    job_description: str,
+    pdf_folder: Union[str, Path] = "folder_pdf",
+    skills_file_path: Union[str, Path] = "data/list_skills.csv",
+    user_skill_weight: Optional[float] = None,
+    user_experience_weight: Optional[float] = None,
+    progress_callback: Optional[Callable[[int, int, str, Dict], None]] = None,
+) -> int:
+    """
+    Fully score `filenames` left over by a time-budgeted scan and merge them
+    into its result file and catalog entry. Returns the number of CVs scored.
+    """
+    results = scan_names(
+        filenames, job_title, job_description, pdf_folder, skills_file_path,
+        user_skill_weight, user_experience_weight, progress_callback=progress_callback,
+    )
+    result_path = Path("scan_results") / result_filename
+    merge_scan_results(results, result_path)
+    update_run_scores(result_path, {path_str: detail.get("score") for path_str, detail in results.items()})
+    return len(results)
+
 
 def scan_record_score(
     filename: str,
@@ -14,6 +198,10 @@ def scan_record_score(
     skills_file_path: Union[str, Path] = "data/list_skills.csv",
     user_skill_weight: Optional[float] = None,
     user_experience_weight: Optional[float] = None,
+    profiler: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int, str, Dict], None]] = None,
+    time_budget_s: Optional[float] = None,
+    finish_in_background: bool = False,
 ) -> Tuple[float, str]:
     """
     1) Reads `records_csv_path` (CSV with columns:
@@ -21,8 +209,14 @@ def scan_record_score(
     2) Filters rows where `job_title` matches the passed-in job_title
     3) Builds a list of `name pdf` values
     4) Calls run_cv_scanner(...) over that list
-    5) Saves the full results dict into a CSV under `scan_results/`
-    6) Returns a tuple (score_for_‘filename’, result_csv_filename)
+    5) Saves the full results dict into a Parquet file under `scan_results/`
+    6) Returns a tuple (score_for_‘filename’, result_filename)
+    With `profiler` ("cprofile"/"pyinstrument") the scan is profiled and the
+    report is written to `scan_results/profiles/<result stem>.txt`.
+    `progress_callback(done, total, pdf_path_str, details)` is forwarded to the scanner.
+    With `time_budget_s` the scan returns once the budget is spent, with
+    the CVs it did not finish marked by `scan_status` (the target file is
+    scanned first); `finish_in_background` queues a job that completes them.
     """
     # -- load and filter records.csv --
     df = pd.read_csv(records_csv_path)
@@ -32,7 +226,9 @@ def scan_record_score(
 
     # -- choose pdf list based on score_all flag --
     if score_all:
-        pdf_list: List[str] = df_filtered["name pdf"].dropna().tolist()
+        # exact duplicate uploads share one stored PDF; scan it once.
+        # The target goes first so a time budget never leaves it unscored.
+        pdf_list: List[str] = list(dict.fromkeys([filename] + df_filtered["name pdf"].dropna().tolist()))
     else:
         # only scan the single target file
         all_names = df_filtered["name pdf"].dropna().tolist()
@@ -42,40 +238,11 @@ def scan_record_score(
             )
         pdf_list = [filename]
 
-    # -- run the CV scanner on only those PDFs --
-    if user_skill_weight is not None and user_experience_weight is not None:
-        results: Dict[str, Dict] = run_cv_scanner(
-            skills_file_path=skills_file_path,
-            job_description=job_description,
-            pdf_folder=pdf_folder,
-            pdf_list=pdf_list,
-            user_skill_weight=user_skill_weight,
-            user_experience_weight=user_experience_weight,
-            job_title=job_title
-        )
-    else:
-        results: Dict[str, Dict] = run_cv_scanner(
-            skills_file_path=skills_file_path,
-            job_description=job_description,
-            pdf_folder=pdf_folder,
-            pdf_list=pdf_list,
-            job_title=job_title
-        )
-
-    # -- prepare scan_results folder and filename --
-    scan_dir = Path("scan_results")
-    scan_dir.mkdir(parents=True, exist_ok=True)
-
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    safe_title = job_title.replace(" ", "_")
-    result_filename = f"[{safe_title}]_{timestamp}_{len(pdf_list)}.csv"
-    result_path = scan_dir / result_filename
-
-    # -- save full results dict to CSV --
-    # convert { pdf_path: { ...details... } } into a DataFrame
-    df_results = pd.DataFrame.from_dict(results, orient="index").reset_index()
-    df_results.rename(columns={"index": "pdf_path"}, inplace=True)
-    df_results.to_csv(result_path, index=False)
+    results, result_filename = _scan_and_save(
+        pdf_list, job_title, job_description, pdf_folder, skills_file_path,
+        user_skill_weight, user_experience_weight, profiler, progress_callback,
+        time_budget_s, finish_in_background,
+    )
 
     # -- extract and return the score for our target filename --
     for path_str, detail in results.items():
@@ -86,3 +253,35 @@ def scan_record_score(
     raise FileNotFoundError(
         f"Filename '{filename}' not found among scanned PDFs: {pdf_list}"
     )
+
+
+def scan_batch(
+    filenames: List[str],
+    job_title: str,
+    job_description: str,
+    pdf_folder: Union[str, Path] = "folder_pdf",
+    skills_file_path: Union[str, Path] = "data/list_skills.csv",
+    user_skill_weight: Optional[float] = None,
+    user_experience_weight: Optional[float] = None,
+    profiler: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int, str, Dict], None]] = None,
+    time_budget_s: Optional[float] = None,
+    finish_in_background: bool = False,
+) -> Tuple[Optional[str], Optional[float], str]:
+    """
+    Scan exactly `filenames` (e.g. one bulk upload) as a single run.
+    Returns (best filename, best score, result_filename). `time_budget_s`
+    and `finish_in_background` work as in scan_record_score.
+    """
+    pdf_list = list(dict.fromkeys(filenames))
+    if not pdf_list:
+        raise ValueError("No PDFs to scan")
+    results, result_filename = _scan_and_save(
+        pdf_list, job_title, job_description, pdf_folder, skills_file_path,
+        user_skill_weight, user_experience_weight, profiler, progress_callback,
+        time_budget_s, finish_in_background,
+    )
+    if not results:
+        return None, None, result_filename
+    best_path, best = next(iter(results.items()))   # results are sorted by score
+    return Path(best_path).name, best.get("score", 0.0), result_filename
@@ -0,0 +1,319 @@
+# Standalone HTTP scoring service around a warm CVScanner, for tools that
+# need ATS scores without the Streamlit UI. Requests that arrive together
+# are merged into micro-batches (up to `serve_max_batch` CVs, waiting at
+# most `serve_max_wait_ms` for a batch to fill) so the embedding model
+# encodes them in one call.
+#
+#   python -m services.score_server --port 8600
+#
+#   POST /score   {"job_description": "...", "job_title": "...",      (job_title optional)
+#                  "cv_text": "..." | "pdf_base64": "...",
+#                  "skill_weight": 0.8, "experience_weight": 0.2}      (weights optional)
+#              -> {"score": .., "details": {..}, "timing": {"queue_ms", "inference_ms", "batch_size", ...}}
+#   POST /score   with Content-Type: application/pdf and ?job_description=...&job_title=...
+#   GET  /healthz, GET /metrics (Prometheus text)
+import argparse
+import base64
+import json
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+from internal.cv_scanner import get_scanner, scoring_params
+from internal.pdf_text import extract_pdf_text
+from utils import metrics_utils
+from utils.config_utils import config_snapshot, load_config
+from utils.skill_utils import load_skills
+
+DEFAULT_PORT = 8600
+MAX_BODY_BYTES = 20 << 20
+
+metrics_utils.METRICS.update({
+    "ads_serve_queue_seconds": ("histogram", "Time a scoring request waited for its micro-batch.", metrics_utils.LATENCY_BUCKETS),
+    "ads_serve_inference_seconds": ("histogram", "Time to score one micro-batch.", metrics_utils.LATENCY_BUCKETS),
+    "ads_serve_batch_size": ("histogram", "CVs per micro-batch.", (1, 2, 4, 8, 16, 32, 64, 128)),
+    "ads_serve_requests_total": ("counter", "Scoring requests, by HTTP status.", None),
+})
+
+
+class MicroBatcher:
+    """
+    Collects submitted items on a queue and hands them to `process_batch` in
+    lists of at most `max_batch`, waiting at most `max_wait_s` after the
+    first item for more to arrive. Each submit() returns a Future.
+    `process_batch` may return an exception in an item's place to fail
+    only that item's future.
+    """
+
+    def __init__(self, process_batch: Callable[[List], List], max_batch: int = 32, max_wait_s: float = 0.01):
+        self.process_batch = process_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait_s = max(0.0, max_wait_s)
+        self._queue: "queue.Queue[Tuple[object, Future, float]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="score-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item) -> Future:
+        future: Future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _collect(self) -> List[Tuple[object, Future, float]]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            start = time.perf_counter()
+            try:
+                results = self.process_batch([item for item, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            inference_s = time.perf_counter() - start
+            metrics_utils.observe("ads_serve_inference_seconds", inference_s)
+            metrics_utils.observe("ads_serve_batch_size", len(batch))
+            for (_, future, enqueued), result in zip(batch, results):
+                queue_s = start - enqueued
+                metrics_utils.observe("ads_serve_queue_seconds", queue_s)
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                    continue
+                future.set_result((result, {
+                    "queue_ms": round(queue_s * 1000, 3),
+                    "inference_ms": round(inference_s * 1000, 3),
+                    "batch_size": len(batch),
+                }))
+
+
+class ScoringService:
+    """Scores (JD, CV text) requests in batches with one warm scanner."""
+
+    def __init__(self, model_id: Optional[str] = None, spacy_model: Optional[str] = None, max_batch: Optional[int] = None, max_wait_ms: Optional[float] = None):
+        cfg = load_config()
+        self.scanner = get_scanner(model_id or cfg["model_id"], spacy_model or cfg["spacy_model"])
+        self.skills_map = load_skills()
+        self._targets: "OrderedDict[Tuple, Tuple[Optional[str], List[str]]]" = OrderedDict()
+        max_batch = int(cfg.get("serve_max_batch", 32)) if max_batch is None else max_batch
+        max_wait_ms = float(cfg.get("serve_max_wait_ms", 10)) if max_wait_ms is None else max_wait_ms
+        self.batcher = MicroBatcher(self.score_batch, max_batch, max_wait_ms / 1000)
+
+    def _target_skills(self, job_description: str, job_title: Optional[str], params: Dict) -> Tuple[Optional[str], List[str]]:
+        # resolved once per (JD, title, config): title matching is fuzzy and chatty
+        key = (job_description, job_title, params["config_version"])
+        if key not in self._targets:
+            self._targets[key] = self.scanner.resolve_target_skills(job_description, self.skills_map, job_title, params)
+            if len(self._targets) > 256:
+                self._targets.popitem(last=False)
+        self._targets.move_to_end(key)
+        return self._targets[key]
+
+    def score_batch(self, requests: List[Dict]) -> List[Union[Dict, Exception]]:
+        """
+        Score a micro-batch; JD similarities of all requests come from one
+        encode call. A request that fails gets its exception in its place,
+        so it does not fail the rest of the batch.
+        """
+        snapshot = config_snapshot()
+        scanner = self.scanner
+        results: List[Union[Dict, Exception, None]] = [None] * len(requests)
+        prepared: Dict[int, Tuple] = {}
+        for i, req in enumerate(requests):
+            try:
+                params = scoring_params(snapshot, req.get("skill_weight"), req.get("experience_weight"))
+                prepared[i] = (
+                    params,
+                    self._target_skills(req["job_description"], req.get("job_title"), params),
+                    scanner.normalize_cv_text(req["job_description"]),
+                    scanner.normalize_cv_text(req["cv_text"]),
+                )
+            except Exception as e:
+                results[i] = e
+        if not prepared:
+            return results
+        order = list(prepared)
+        batch_params = prepared[order[0]][0]   # chunk settings are per config snapshot, shared by the batch
+        try:
+            similarities = dict(zip(order, scanner.calculate_pair_similarities(
+                [prepared[i][2] for i in order], [prepared[i][3] for i in order], batch_params,
+            )))
+        except Exception as e:
+            # leave the batched encode to each request so only the offending one fails
+            print(f"Warning: batched similarity failed ({e}); scoring requests one by one.", file=sys.stderr)
+            similarities = {}
+        coverage: Dict[int, Dict] = {}
+        if batch_params["requirement_coverage"]:
+            # one coverage pass per distinct JD in the batch
+            by_jd: Dict[str, List[int]] = {}
+            for i in order:
+                by_jd.setdefault(requests[i]["job_description"], []).append(i)
+            for job_description, indices in by_jd.items():
+                try:
+                    coverage.update(zip(indices, scanner.requirement_coverage(
+                        job_description, [requests[i]["cv_text"] for i in indices], batch_params
+                    )))
+                except Exception as e:
+                    print(f"Warning: requirement coverage failed: {e}", file=sys.stderr)
+        for i in order:
+            params, (matched_title, relevant_skills), normalized_jd, _ = prepared[i]
+            details = {
+                'file_path': None,
+                'matched_skills_map_title': matched_title,
+                'target_skills_list': relevant_skills,
+                'error': None,
+            }
+            try:
+                results[i] = scanner.score_cv_text(
+                    requests[i]["cv_text"], normalized_jd, relevant_skills, details,
+                    jd_similarity=similarities.get(i), empty_error="CV text empty", params=params,
+                )
+            except Exception as e:
+                results[i] = e
+                continue
+            if i in coverage:
+                results[i].update(coverage[i])
+        return results
+
+    def score(self, request: Dict, timeout: Optional[float] = None) -> Dict:
+        """Queue one request and wait for its batch; returns the response body."""
+        received = time.perf_counter()
+        details, timing = self.batcher.submit(request).result(timeout=timeout)
+        timing["total_ms"] = round((time.perf_counter() - received) * 1000, 3)
+        return {"score": details.get("score", 0.0), "details": details, "timing": timing}
+
+
+def parse_request(body: bytes, content_type: str, query: Dict[str, List[str]]) -> Dict:
+    """
+    Turn an HTTP body into a scoring request (PDFs are parsed here, outside
+    the batch). Raises ValueError for anything a 400 should reject.
+    """
+    if content_type.startswith("application/pdf"):
+        request = {k: v[-1] for k, v in query.items()}
+        pdf_bytes = body
+    else:
+        request = json.loads(body or b"{}")
+        if not isinstance(request, dict):
+            raise ValueError("Body must be a JSON object")
+        pdf_base64 = request.pop("pdf_base64", None)
+        if pdf_base64 is not None and not isinstance(pdf_base64, str):
+            raise ValueError("`pdf_base64` must be a string")
+        pdf_bytes = base64.b64decode(pdf_base64) if pdf_base64 else None
+    if pdf_bytes is not None:
+        request["cv_text"] = extract_pdf_text(pdf_bytes)
+    if not request.get("job_description") or not isinstance(request["job_description"], str):
+        raise ValueError("`job_description` is required and must be a string")
+    if "cv_text" not in request:
+        raise ValueError("Send `cv_text`, `pdf_base64` or an application/pdf body")
+    if not isinstance(request["cv_text"], str):
+        raise ValueError("`cv_text` must be a string")
+    if request.get("job_title") is not None and not isinstance(request["job_title"], str):
+        raise ValueError("`job_title` must be a string")
+    for key in ("skill_weight", "experience_weight"):
+        if request.get(key) is not None:
+            try:
+                request[key] = float(request[key])
+            except (TypeError, ValueError):
+                raise ValueError(f"`{key}` must be a number")
+    return request
+
+
+def _json_default(value):
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def make_handler(service: ScoringService, timeout: float):
+    class ScoreHandler(BaseHTTPRequestHandler):
+        def _reply(self, status: int, payload: Dict):
+            metrics_utils.inc("ads_serve_requests_total", status=status)
+            body = json.dumps(payload, default=_json_default).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == "/healthz":
+                self._reply(200, {"status": "ok", "queue_depth": service.batcher.depth()})
+            elif path == "/metrics":
+                body = metrics_utils.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self.send_error(404)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/score":
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY_BYTES:
+                self._reply(413, {"error": f"Body larger than {MAX_BODY_BYTES} bytes"})
+                return
+            try:
+                request = parse_request(self.rfile.read(length), self.headers.get("Content-Type", ""), parse_qs(url.query))
+            except (ValueError, KeyError) as e:
+                self._reply(400, {"error": str(e)})
+                return
+            try:
+                self._reply(200, service.score(request, timeout=timeout))
+            except Exception as e:
+                print(f"Error: scoring request failed: {e}", file=sys.stderr)
+                self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoreHandler
+
+
+def serve(port: int = DEFAULT_PORT, host: str = "127.0.0.1", max_batch: Optional[int] = None, max_wait_ms: Optional[float] = None, timeout: float = 120.0):
+    service = ScoringService(max_batch=max_batch, max_wait_ms=max_wait_ms)
+    server = ThreadingHTTPServer((host, port), make_handler(service, timeout))
+    server.daemon_threads = True
+    print(f"Info: Scoring service on http://{host}:{port}/score "
+          f"(max batch {service.batcher.max_batch}, max wait {service.batcher.max_wait_s * 1000:.0f} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv: Optional[List[str]] = None):
+    cfg = load_config()
+    parser = argparse.ArgumentParser(description="HTTP ATS scoring service with micro-batching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(cfg.get("serve_port", DEFAULT_PORT)))
+    parser.add_argument("--max-batch", type=int, default=None, help="CVs per micro-batch (default: serve_max_batch)")
+    parser.add_argument("--max-wait-ms", type=float, default=None, help="Longest wait for a batch to fill (default: serve_max_wait_ms)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds a request may wait for its result")
+    args = parser.parse_args(argv)
+    serve(args.port, args.host, args.max_batch, args.max_wait_ms, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+# Scale-out scanning: a coordinator splits a job title's CV pool into shards
+# in a SQLite queue (data/shards.db) and any number of worker processes,
+# each holding a warm CVScanner, lease shards, score them and store the
+# ranked results. A lease a worker stops renewing (crash, kill, lost host)
+# expires and the shard goes to another worker. The coordinator merges the
+# per-shard rankings into one result file like any other scan.
+#
+#   python -m services.shards worker                      # on each host / core
+#   python -m services.shards scan --job-title "Data Scientist" --shard-size 50
+#   python -m services.shards scan --job-title "Data Scientist" --local-workers 4
+#
+# Workers on other hosts need the same working directory contents (data/,
+# folder_pdf/) on a shared filesystem with working SQLite locking.
+import argparse
+import heapq
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+import pandas as pd
+
+SHARDS_DB_PATH = Path("data/shards.db")
+
+DEFAULT_SHARD_SIZE = 50
+LEASE_S = 60                # a shard whose lease is not renewed for this long is reassigned
+MAX_ATTEMPTS = 3            # leases per shard before it is marked failed
+POLL_INTERVAL_S = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    scan_id      TEXT PRIMARY KEY,
+    job_title    TEXT NOT NULL,
+    params       TEXT NOT NULL,
+    shard_count  INTEGER NOT NULL,
+    status       TEXT NOT NULL,
+    result_file  TEXT,
+    created_at   TEXT NOT NULL,
+    finished_at  TEXT
+);
+CREATE TABLE IF NOT EXISTS shards (
+    scan_id      TEXT NOT NULL REFERENCES scans(scan_id),
+    shard_no     INTEGER NOT NULL,
+    status       TEXT NOT NULL,
+    names        TEXT NOT NULL,
+    worker_id    TEXT,
+    lease_until  TEXT,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    result       TEXT,
+    error        TEXT,
+    updated_at   TEXT NOT NULL,
+    PRIMARY KEY (scan_id, shard_no)
+);
+CREATE INDEX IF NOT EXISTS idx_shards_queue ON shards(status, lease_until);
+"""
+
+
+def _connect(db_path: Union[str, Path] = SHARDS_DB_PATH) -> sqlite3.Connection:
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _now(offset_s: float = 0.0) -> str:
+    return (datetime.now() + timedelta(seconds=offset_s)).isoformat(timespec="milliseconds")
+
+
+def _json_default(value):
+    # numpy scalars from the scanner
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def _rank_key(item: Tuple[str, Dict]):
+    return item[1].get("scan_status") == "unscored", -(item[1].get("score") or 0.0)
+
+
+# ---------- coordinator side ----------
+
+def names_for_title(job_title: str, records_csv_path: Union[str, Path] = "data/records.csv") -> List[str]:
+    """Distinct `name pdf` values of active records for a job title."""
+    df = pd.read_csv(records_csv_path)
+    df = df[(df["job_title"] == job_title) & (df.get("status", "active") != "deleted")]
+    return list(dict.fromkeys(df["name pdf"].dropna()))
+
+
+def submit_scan(
+    job_title: str,
+    job_description: str,
+    names: List[str],
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    pdf_folder: Union[str, Path] = "folder_pdf",
+    skills_file_path: Union[str, Path] = "data/list_skills.csv",
+    user_skill_weight: Optional[float] = None,
+    user_experience_weight: Optional[float] = None,
+    db_path: Union[str, Path] = SHARDS_DB_PATH,
+) -> str:
+    """Split `names` into shards of `shard_size` and queue them. Returns the scan id."""
+    from internal.cv_scanner import scoring_params
+
+    if not names:
+        raise ValueError(f"No PDFs to scan for job title '{job_title}'")
+    scan_id = uuid.uuid4().hex
+    params = {
+        "job_title": job_title,
+        "job_description": job_description,
+        "pdf_folder": str(pdf_folder),
+        "skills_file_path": str(skills_file_path),
+        "user_skill_weight": user_skill_weight,
+        "user_experience_weight": user_experience_weight,
+        # workers warn if their config.yaml differs from the coordinator's
+        "config_version": scoring_params()["config_version"],
+    }
+    shards = [names[i:i + shard_size] for i in range(0, len(names), shard_size)]
+    now = _now()
+    with closing(_connect(db_path)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO scans (scan_id, job_title, params, shard_count, status, created_at) "
+                "VALUES (?, ?, ?, ?, 'running', ?)",
+                (scan_id, job_title, json.dumps(params), len(shards), now),
+            )
+            conn.executemany(
+                "INSERT INTO shards (scan_id, shard_no, status, names, updated_at) VALUES (?, ?, 'queued', ?, ?)",
+                [(scan_id, no, json.dumps(shard), now) for no, shard in enumerate(shards)],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    print(f"Info: Scan {scan_id}: {len(names)} PDFs in {len(shards)} shards.")
+    return scan_id
+
+
+def shard_progress(scan_id: str, db_path: Union[str, Path] = SHARDS_DB_PATH) -> Dict[str, int]:
+    """{status: shard count} for one scan."""
+    with closing(_connect(db_path)) as conn:
+        rows = conn.execute(
+            "SELECT status, COUNT(*) AS n FROM shards WHERE scan_id = ? GROUP BY status", (scan_id,)
+        ).fetchall()
+    return {row["status"]: row["n"] for row in rows}
+
+
+def _shard_rankings(scan_id: str, db_path: Union[str, Path]) -> Iterator[List[Tuple[str, Dict]]]:
+    with closing(_connect(db_path)) as conn:
+        for row in conn.execute(
+            "SELECT result FROM shards WHERE scan_id = ? AND status = 'done' ORDER BY shard_no", (scan_id,)
+        ):
+            yield [tuple(item) for item in json.loads(row["result"])]
+
+
+def merge_scan(scan_id: str, db_path: Union[str, Path] = SHARDS_DB_PATH) -> Tuple[Dict[str, Dict], str]:
+    """
+    Merge the ranked results of all finished shards into one result file
+    (shards are already sorted, so this is a k-way merge). Failed shards'
+    CVs are kept as unscored rows. Returns (results, result_filename).
+    """
+    from internal.cv_scanner import unscored_details
+    from services.scanner import result_filename_for, save_and_index
+
+    with closing(_connect(db_path)) as conn:
+        scan = conn.execute("SELECT * FROM scans WHERE scan_id = ?", (scan_id,)).fetchone()
+        failed = conn.execute(
+            "SELECT names, error FROM shards WHERE scan_id = ? AND status = 'failed'", (scan_id,)
+        ).fetchall()
+    if scan is None:
+        raise KeyError(f"Unknown scan '{scan_id}'")
+    params = json.loads(scan["params"])
+
+    leftovers = []
+    for row in failed:
+        for name in json.loads(row["names"]):
+            details = unscored_details(Path(params["pdf_folder"]) / name, None, [], params)
+            details["error"] = f"Shard failed: {(row['error'] or 'unknown').splitlines()[0]}"
+            leftovers.append((str(Path(params["pdf_folder"]) / name), details))
+
+    ranked = heapq.merge(*_shard_rankings(scan_id, db_path), leftovers, key=_rank_key)
+    results = dict(ranked)
+
+    result_filename = result_filename_for(scan["job_title"], len(results))
+    save_and_index(results, Path("scan_results") / result_filename, scan["job_title"],
+                   params["user_skill_weight"], params["user_experience_weight"])
+    with closing(_connect(db_path)) as conn:
+        conn.execute(
+            "UPDATE scans SET status = ?, result_file = ?, finished_at = ? WHERE scan_id = ?",
+            ("failed" if failed else "done", result_filename, _now(), scan_id),
+        )
+    return results, result_filename
+
+
+def wait_and_merge(
+    scan_id: str,
+    on_progress: Optional[Callable[[Dict[str, int]], None]] = None,
+    poll_interval: float = POLL_INTERVAL_S,
+    timeout: Optional[float] = None,
+    db_path: Union[str, Path] = SHARDS_DB_PATH,
+) -> Tuple[Dict[str, Dict], str]:
+    """Wait until no shard is queued or leased (or `timeout`), then merge_scan()."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        progress = shard_progress(scan_id, db_path)
+        if on_progress is not None:
+            on_progress(progress)
+        if not progress.get("queued") and not progress.get("leased"):
+            break
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"Scan {scan_id} not finished after {timeout}s: {progress}")
+        time.sleep(poll_interval)
+    return merge_scan(scan_id, db_path)
+
+
+# ---------- worker side ----------
+
+def claim_shard(worker_id: str, lease_s: float = LEASE_S, db_path: Union[str, Path] = SHARDS_DB_PATH) -> Optional[Dict]:
+    """
+    Lease the oldest queued shard, or one whose lease expired (its worker
+    is gone). Shards that used up MAX_ATTEMPTS leases are marked failed.
+    """
+    now = _now()
+    with closing(_connect(db_path)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE shards SET status = 'failed', error = 'Lease expired too often (worker lost)', updated_at = ? "
+                "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, now, MAX_ATTEMPTS),
+            )
+            row = conn.execute(
+                "SELECT s.*, c.params FROM shards s JOIN scans c ON c.scan_id = s.scan_id "
+                "WHERE s.status = 'queued' OR (s.status = 'leased' AND s.lease_until < ?) "
+                "ORDER BY c.created_at, s.shard_no LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                if row["status"] == "leased":
+                    print(f"Warning: Reassigning shard {row['shard_no']} of scan {row['scan_id']} "
+                          f"from lost worker {row['worker_id']}.", file=sys.stderr)
+                conn.execute(
+                    "UPDATE shards SET status = 'leased', worker_id = ?, lease_until = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE scan_id = ? AND shard_no = ?",
+                    (worker_id, _now(lease_s), now, row["scan_id"], row["shard_no"]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    if row is None:
+        return None
+    return {"scan_id": row["scan_id"], "shard_no": row["shard_no"],
+            "names": json.loads(row["names"]), "params": json.loads(row["params"])}
+
+
+def _outstanding(db_path: Union[str, Path]) -> int:
+    with closing(_connect(db_path)) as conn:
+        return conn.execute("SELECT COUNT(*) FROM shards WHERE status IN ('queued', 'leased')").fetchone()[0]
+
+
+def renew_lease(shard: Dict, worker_id: str, lease_s: float = LEASE_S, db_path: Union[str, Path] = SHARDS_DB_PATH) -> bool:
+    """Extend our lease; False if the shard was reassigned meanwhile."""
+    with closing(_connect(db_path)) as conn:
+        cur = conn.execute(
+            "UPDATE shards SET lease_until = ? WHERE scan_id = ? AND shard_no = ? AND status = 'leased' AND worker_id = ?",
+            (_now(lease_s), shard["scan_id"], shard["shard_no"], worker_id),
+        )
+    return cur.rowcount > 0
+
+
+def _finish_shard(shard: Dict, worker_id: str, db_path: Union[str, Path], **fields) -> bool:
+    assignments = ", ".join(f"{k} = ?" for k in fields)
+    with closing(_connect(db_path)) as conn:
+        cur = conn.execute(
+            f"UPDATE shards SET {assignments}, updated_at = ? "
+            "WHERE scan_id = ? AND shard_no = ? AND status = 'leased' AND worker_id = ?",
+            (*fields.values(), _now(), shard["scan_id"], shard["shard_no"], worker_id),
+        )
+    return cur.rowcount > 0
+
+
+def run_shard(shard: Dict) -> List[Tuple[str, Dict]]:
+    """Score one shard's PDFs with this process's warm scanner; ranked (path, details) pairs."""
+    from internal.cv_scanner import scoring_params
+    from services.scanner import scan_names
+
+    params = dict(shard["params"])
+    expected_version = params.pop("config_version", None)
+    if expected_version and expected_version != scoring_params()["config_version"]:
+        print(f"Warning: config.yaml here ({scoring_params()['config_version']}) differs from the "
+              f"coordinator's ({expected_version}); scores may not be comparable.", file=sys.stderr)
+    results = scan_names(shard["names"], **params)
+    return sorted(results.items(), key=_rank_key)
+
+
+def run_worker(
+    poll_interval: float = POLL_INTERVAL_S,
+    once: bool = False,
+    lease_s: float = LEASE_S,
+    db_path: Union[str, Path] = SHARDS_DB_PATH,
+) -> int:
+    """
+    Lease and score shards until interrupted (or until none is left with
+    `once`). The lease is renewed from a side thread while a shard runs.
+    Returns the number of shards completed.
+    """
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    print(f"Info: Shard worker {worker_id} waiting for shards in '{db_path}'.")
+    completed = 0
+    while True:
+        shard = claim_shard(worker_id, lease_s, db_path)
+        if shard is None:
+            # with `once`, stay around while a lost worker's lease may still expire
+            if once and not _outstanding(db_path):
+                return completed
+            time.sleep(poll_interval)
+            continue
+
+        print(f"Info: Scoring shard {shard['shard_no']} of scan {shard['scan_id']} ({len(shard['names'])} PDFs).")
+        stop = threading.Event()
+
+        def keep_leased(shard=shard, stop=stop):
+            while not stop.wait(lease_s / 3):
+                if not renew_lease(shard, worker_id, lease_s, db_path):
+                    print(f"Warning: lost the lease on shard {shard['shard_no']}.", file=sys.stderr)
+                    return
+
+        threading.Thread(target=keep_leased, name="shard-lease", daemon=True).start()
+        try:
+            ranked = run_shard(shard)
+        except Exception as e:
+            print(f"Error: shard {shard['shard_no']} of scan {shard['scan_id']} failed: {e}", file=sys.stderr)
+            _finish_shard(shard, worker_id, db_path, status="failed", error=f"{type(e).__name__}: {e}")
+            continue
+        finally:
+            stop.set()
+        if _finish_shard(shard, worker_id, db_path, status="done",
+                         result=json.dumps(ranked, default=_json_default)):
+            completed += 1
+        else:
+            # the lease expired and another worker took over; its result wins
+            print(f"Warning: dropped result of shard {shard['shard_no']} (reassigned).", file=sys.stderr)
+
+
+def spawn_local_workers(count: int, db_path: Union[str, Path] = SHARDS_DB_PATH) -> List[subprocess.Popen]:
+    """Start `count` worker processes on this host (each loads its own models)."""
+    return [
+        subprocess.Popen([sys.executable, "-m", "services.shards", "worker", "--once", "--db", str(db_path)])
+        for _ in range(count)
+    ]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Sharded scans across worker processes.")
+    parser.add_argument("--db", default=str(SHARDS_DB_PATH))
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker = sub.add_parser("worker", help="Run a shard worker")
+    worker.add_argument("--poll-interval", type=float, default=POLL_INTERVAL_S)
+    worker.add_argument("--lease", type=float, default=LEASE_S, help="Lease length in seconds")
+    worker.add_argument("--once", action="store_true", help="Exit when no shard is left")
+    worker.add_argument("--db", default=argparse.SUPPRESS)
+    scan = sub.add_parser("scan", help="Shard a job title's CVs, wait for workers and merge")
+    scan.add_argument("--job-title", required=True)
+    scan.add_argument("--jd", help="Job description file (default: the title's description in records.csv)")
+    scan.add_argument("--records", default="data/records.csv")
+    scan.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    scan.add_argument("--local-workers", type=int, default=0, help="Also start this many workers here")
+    scan.add_argument("--db", default=argparse.SUPPRESS)
+    status = sub.add_parser("status", help="Show shard counts of recent scans")
+    status.add_argument("--db", default=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    db_path = Path(args.db)
+
+    if args.command == "worker":
+        run_worker(poll_interval=args.poll_interval, once=args.once, lease_s=args.lease, db_path=db_path)
+    elif args.command == "scan":
+        if args.jd:
+            job_description = Path(args.jd).read_text(encoding="utf-8")
+        else:
+            df = pd.read_csv(args.records)
+            job_description = df.loc[df["job_title"] == args.job_title, "job_description"].dropna().iloc[-1]
+        scan_id = submit_scan(args.job_title, job_description, names_for_title(args.job_title, args.records),
+                              shard_size=args.shard_size, db_path=db_path)
+        workers = spawn_local_workers(args.local_workers, db_path)
+        start = time.perf_counter()
+        results, result_file = wait_and_merge(
+            scan_id, on_progress=lambda p: print(f"Info: shards {json.dumps(p)}"), db_path=db_path
+        )
+        for proc in workers:
+            proc.wait()
+        print(f"Scored {len(results)} CVs in {time.perf_counter() - start:.1f}s -> scan_results/{result_file}")
+    else:
+        with closing(_connect(db_path)) as conn:
+            for scan in conn.execute("SELECT * FROM scans ORDER BY created_at DESC LIMIT 20"):
+                print(f"{scan['created_at']}  {scan['status']:<8} {scan['job_title']:<30} "
+                      f"{json.dumps(shard_progress(scan['scan_id'], db_path))}  {scan['result_file'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
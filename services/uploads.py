@@ -0,0 +1,127 @@
+# Bulk ingestion of uploaded resumes: any mix of PDFs and ZIP archives of
+# PDFs. Every file is streamed into the blob store in fixed-size chunks
+# (hashed on the way for duplicate detection); the blob manifest, duplicate
+# fingerprints and records.csv rows of the whole batch are each written once.
+import csv
+import datetime
+import os
+import threading
+import uuid
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple, Union
+from services.blob_store import blob_path, put_stream, register_many, resolve_pdf
+from services.dedup import PendingUploads
+from services.evaluate import extract_text_from_pdf
+from utils.cache_utils import store_text
+from utils.file_utils import make_filename
+
+RECORD_HEADER = [
+    "id",
+    "name pdf",
+    "job_title",
+    "job_description",
+    "skill",
+    "experience",
+    "created_at",
+    "updated_at",
+    "status",
+]
+MAX_MEMBER_BYTES = 50 * 1024 * 1024     # skip absurdly large ZIP members (zip bombs)
+
+_records_lock = threading.Lock()
+
+
+def append_records(rows: List[List], csv_path: Union[str, Path] = "data/records.csv"):
+    """Append many record rows to records.csv in a single write."""
+    if not rows:
+        return
+    csv_path = Path(csv_path)
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    with _records_lock:
+        write_header = not csv_path.exists()
+        with csv_path.open("a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(RECORD_HEADER)
+            writer.writerows(rows)
+
+
+def iter_pdf_sources(uploaded_files: Iterable) -> Iterator[Tuple[str, BinaryIO]]:
+    """
+    (original name, readable binary stream) for each PDF in `uploaded_files`
+    (objects with `.name` and file-like reads, e.g. Streamlit UploadedFile);
+    ZIP archives are expanded member by member without extracting them whole.
+    """
+    for uploaded in uploaded_files:
+        name = getattr(uploaded, "name", "upload.pdf")
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(uploaded) as archive:
+                for info in archive.infolist():
+                    member = Path(info.filename).name   # never trust paths inside the archive
+                    if info.is_dir() or not member.lower().endswith(".pdf") or member.startswith("."):
+                        continue
+                    if info.file_size > MAX_MEMBER_BYTES:
+                        print(f"Warning: skipping '{info.filename}' in '{name}' ({info.file_size} bytes)")
+                        continue
+                    with archive.open(info) as stream:
+                        yield member, stream
+        elif name.lower().endswith(".pdf"):
+            if hasattr(uploaded, "seek"):
+                uploaded.seek(0)
+            yield name, uploaded
+
+
+def ingest_batch(
+    uploaded_files: Iterable,
+    job_title: str,
+    job_description: str,
+    skill_weight: float,
+    experience_weight: float,
+    folder: Union[str, Path] = "folder_pdf",
+    records_csv_path: Union[str, Path] = "data/records.csv",
+) -> List[Dict]:
+    """
+    Store every PDF of the batch and record it. Exact duplicates of stored
+    PDFs (or of earlier files in the batch) reuse the existing record name;
+    near-duplicates are kept but flagged. Returns one dict per PDF:
+    record_id, filename, original_name, sha256 and the duplicate check's
+    match, duplicate_of, original_pdf and similarity.
+    """
+    folder = Path(folder)
+    now = datetime.datetime.now().isoformat()
+    rows: List[List] = []
+    ingested: List[Dict] = []
+    manifest: List[Tuple[str, str, str, None]] = []
+    pending = PendingUploads(folder)
+    names_taken = set()
+
+    for original_name, stream in iter_pdf_sources(uploaded_files):
+        record_id = str(uuid.uuid4())
+        filename = make_filename(job_title, original_name)
+        # make_filename has one-second resolution; keep names unique within the batch
+        if filename in names_taken or resolve_pdf(filename, folder).exists():
+            stem, ext = os.path.splitext(filename)
+            filename = f"{stem}_{record_id[:8]}{ext}"
+        sha256 = put_stream(stream, folder)
+
+        dup = pending.check(sha256)
+        if dup["match"] == "exact":
+            filename = dup["original_pdf"]
+        else:
+            cv_text = extract_text_from_pdf(blob_path(sha256, folder))
+            store_text(sha256, cv_text)
+            dup = pending.check(sha256, cv_text)
+        names_taken.add(filename)
+        manifest.append((record_id, filename, sha256, None))
+        pending.add(record_id, filename, dup)
+
+        rows.append([record_id, filename, job_title, job_description,
+                     skill_weight, experience_weight, now, now, "active"])
+        ingested.append({"record_id": record_id, "filename": filename, "original_name": original_name,
+                         **{key: dup[key] for key in ("sha256", "match", "duplicate_of", "original_pdf", "similarity")}})
+
+    register_many(manifest, folder)
+    pending.register()
+    append_records(rows, records_csv_path)
+    return ingested
@@ -0,0 +1,39 @@
+from pathlib import Path
+import pytest
+from services import blob_store
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # the manifest lives under data/ relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_migrate_moves_flat_pdfs_into_the_store(workdir):
+    folder = workdir / "folder_pdf"
+    folder.mkdir()
+    (folder / "a.pdf").write_bytes(b"%PDF-a")
+    (folder / "b.pdf").write_bytes(b"%PDF-a")   # same content: stored once
+    (workdir / "data").mkdir()
+    (workdir / "data" / "records.csv").write_text("id,name pdf\nr1,a.pdf\nr2,b.pdf\n", encoding="utf-8")
+
+    stats = blob_store.migrate("folder_pdf")
+    assert stats == {"files": 2, "stored": 1, "deduplicated": 1, "records": 2}
+    assert not (folder / "a.pdf").exists()
+    assert blob_store.resolve_pdf("a.pdf") == blob_store.resolve_pdf("b.pdf")
+    assert blob_store.resolve_pdf("a.pdf").read_bytes() == b"%PDF-a"
+
+
+def test_locate_pdf_follows_paths_stored_before_migration(workdir):
+    folder = workdir / "folder_pdf"
+    folder.mkdir()
+    (folder / "a.pdf").write_bytes(b"%PDF-a")
+    assert blob_store.locate_pdf("folder_pdf/a.pdf") == Path("folder_pdf/a.pdf")
+
+    blob_store.migrate("folder_pdf")
+    located = blob_store.locate_pdf("folder_pdf/a.pdf")
+    assert located == blob_store.resolve_pdf("a.pdf")
+    assert located.read_bytes() == b"%PDF-a"
+    assert blob_store.locate_pdf("folder_pdf/missing.pdf") is None
+    assert blob_store.locate_pdf("") is None
@@ -0,0 +1,70 @@
+import re
+import numpy as np
+import pytest
+from internal.chunk_embedding import ChunkEmbedder, pool_similarities
+
+TEXT = " ".join(f"w{i}" for i in range(300))
+
+
+class WordTokenizer:
+    """Fast-tokenizer stand-in: one token per whitespace-separated word."""
+
+    is_fast = True
+
+    def __call__(self, text, **kwargs):
+        return {"offset_mapping": [m.span() for m in re.finditer(r"\S+", text)]}
+
+
+class FakeModel:
+    max_seq_length = 66   # 64 tokens once [CLS]/[SEP] are reserved
+
+    def __init__(self, tokenizer=None):
+        self.tokenizer = tokenizer
+
+
+def _embedder(tmp_path, tokenizer=None, **kwargs):
+    return ChunkEmbedder(FakeModel(tokenizer), "fake", "cpu", cache_dir=tmp_path, **kwargs)
+
+
+def test_window_settings_are_clamped_to_the_model(tmp_path):
+    embedder = _embedder(tmp_path, max_tokens=1000, overlap=500)
+    assert embedder.max_tokens == 64
+    assert embedder.overlap == 32
+    assert _embedder(tmp_path, max_tokens=16, overlap=4).max_tokens == 16
+
+
+def test_short_or_empty_text_is_one_chunk_or_none(tmp_path):
+    for tokenizer in (None, WordTokenizer()):
+        embedder = _embedder(tmp_path, tokenizer)
+        assert embedder.chunk_text("") == []
+        assert embedder.chunk_text("a short resume") == ["a short resume"]
+
+
+def test_token_windows_cover_the_whole_text_with_overlap(tmp_path):
+    embedder = _embedder(tmp_path, WordTokenizer(), max_tokens=64, overlap=16)
+    chunks = [chunk.split() for chunk in embedder.chunk_text(TEXT)]
+    assert all(len(chunk) <= 64 for chunk in chunks)
+    assert chunks[0][0] == "w0" and chunks[-1][-1] == "w299"
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert prev[-16:] == nxt[:16]
+    assert {w for chunk in chunks for w in chunk} == set(TEXT.split())
+
+
+def test_word_windows_without_fast_tokenizer_cover_the_whole_text(tmp_path):
+    embedder = _embedder(tmp_path, max_tokens=64, overlap=16)
+    chunks = [chunk.split() for chunk in embedder.chunk_text(TEXT)]
+    assert all(len(chunk) <= 48 for chunk in chunks)   # ~0.75 words per token
+    assert chunks[0][0] == "w0" and chunks[-1][-1] == "w299"
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert prev[-12:] == nxt[:12]
+    assert {w for chunk in chunks for w in chunk} == set(TEXT.split())
+
+
+def test_pooling_methods():
+    sims = np.array([[0.1, 0.9], [0.5, 0.2], [0.3, 0.4]])
+    np.testing.assert_allclose(pool_similarities(sims, "max"), [0.5, 0.9])
+    np.testing.assert_allclose(pool_similarities(sims, "mean"), [0.3, 0.5])
+    np.testing.assert_allclose(pool_similarities(sims, "topk", top_k=2), [0.4, 0.65])
+    np.testing.assert_allclose(pool_similarities(sims, "topk", top_k=10), [0.3, 0.5])
+    with pytest.raises(ValueError):
+        pool_similarities(sims, "median")
@@ -0,0 +1,89 @@
+import pytest
+from services import dedup
+
+TEXT = " ".join(f"Built {i} reporting pipelines in Python and SQL for the finance team." for i in range(40))
+UNRELATED = " ".join(f"Cared for {i} patients per shift in a busy intensive care unit." for i in range(40))
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # resolve_pdf looks originals up in the blob manifest under data/
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def folder(tmp_path):
+    # originals only count while their PDF exists; flat files in the folder are enough
+    folder = tmp_path / "folder_pdf"
+    folder.mkdir()
+    for name in ("a.pdf", "b.pdf"):
+        (folder / name).write_bytes(b"%PDF")
+    return folder
+
+
+@pytest.fixture
+def db(tmp_path):
+    return tmp_path / "dedup.db"
+
+
+def test_signature_of_empty_text_is_none():
+    assert dedup.minhash_signature("") is None
+    assert dedup.minhash_signature("   ") is None
+
+
+def test_similarity_tracks_jaccard_of_the_shingles():
+    sig = dedup.minhash_signature(TEXT)
+    assert dedup.estimate_similarity(sig, dedup.minhash_signature(TEXT)) == 1.0
+    # a one-word edit changes a handful of shingles: still a near duplicate, and an LSH candidate
+    edited = dedup.minhash_signature(TEXT.replace("Built 7 ", "Built seven ", 1))
+    assert dedup.estimate_similarity(sig, edited) >= 0.8
+    assert set(dedup._band_buckets(sig)) & set(dedup._band_buckets(edited))
+    other = dedup.minhash_signature(UNRELATED)
+    assert dedup.estimate_similarity(sig, other) < 0.2
+    assert not set(dedup._band_buckets(sig)) & set(dedup._band_buckets(other))
+
+
+def test_check_upload_finds_exact_and_near_duplicates(folder, db):
+    first = dedup.check_upload("sha-a", TEXT, folder, db)
+    assert first["match"] is None
+    dedup.register_upload("r1", "a.pdf", first, db)
+
+    exact = dedup.check_upload("sha-a", None, folder, db)
+    assert (exact["match"], exact["duplicate_of"], exact["original_pdf"]) == ("exact", "r1", "a.pdf")
+    near = dedup.check_upload("sha-b", TEXT.replace("Built 7 ", "Built seven ", 1), folder, db)
+    assert (near["match"], near["duplicate_of"]) == ("near", "r1")
+    assert 0.8 <= near["similarity"] < 1.0
+    assert dedup.check_upload("sha-c", UNRELATED, folder, db)["match"] is None
+
+
+def test_originals_whose_pdf_is_gone_do_not_count(folder, db):
+    dedup.register_upload("r1", "a.pdf", dedup.check_upload("sha-a", TEXT, folder, db), db)
+    (folder / "a.pdf").unlink()
+    assert dedup.check_upload("sha-a", None, folder, db)["match"] is None
+    assert dedup.check_upload("sha-b", TEXT, folder, db)["match"] is None
+
+
+def test_near_duplicate_threshold_comes_from_config(folder, db, monkeypatch):
+    dedup.register_upload("r1", "a.pdf", dedup.check_upload("sha-a", TEXT, folder, db), db)
+    edited = TEXT.replace("Built 7 ", "Built seven ", 1)
+    monkeypatch.setattr(dedup, "load_config", lambda: {"near_duplicate_threshold": 1.0})
+    assert dedup.check_upload("sha-b", edited, folder, db)["match"] is None
+
+
+def test_pending_uploads_match_each_other_before_registering(folder, db):
+    pending = dedup.PendingUploads(folder, db)
+    first = pending.check("sha-a", TEXT)
+    pending.add("r1", "a.pdf", first)
+
+    copy = pending.check("sha-a")
+    assert (copy["match"], copy["duplicate_of"], copy["original_pdf"]) == ("exact", "r1", "a.pdf")
+    pending.add("r2", "a.pdf", copy)
+    near = pending.check("sha-b", TEXT.replace("Built 7 ", "Built seven ", 1))
+    assert (near["match"], near["duplicate_of"]) == ("near", "r1")
+    pending.add("r3", "b.pdf", near)
+    assert dedup.duplicate_flags(db) == {}
+
+    pending.register()
+    flags = dedup.duplicate_flags(db)
+    assert set(flags) == {"r2", "r3"}
@@ -0,0 +1,114 @@
+from contextlib import closing
+import pytest
+from services import jobs
+
+
+@pytest.fixture
+def db(tmp_path):
+    db_path = tmp_path / "jobs.db"
+    jobs._heartbeat("w1", db_path)  # the worker most tests claim with is alive
+    return db_path
+
+
+def test_interactive_lane_runs_before_bulk_and_lanes_are_fifo(db):
+    bulk = jobs.enqueue("scan_batch", {}, lane="bulk", db_path=db)
+    first = jobs.enqueue("scan", {"n": 1}, db_path=db)
+    second = jobs.enqueue("scan", {"n": 2}, db_path=db)
+    assert jobs.queue_position(bulk, db) == 2
+    assert jobs.queue_position(second, db) == 1
+
+    claimed = [jobs.claim_next("w1", db)["job_id"] for _ in range(3)]
+    assert claimed == [first, second, bulk]
+    assert jobs.claim_next("w1", db) is None
+
+
+def test_claim_marks_running_and_counts_attempts(db):
+    job_id = jobs.enqueue("scan", {"record_id": "r1"}, db_path=db)
+    job = jobs.claim_next("w1", db)
+    assert job["job_id"] == job_id
+    assert job["params"] == {"record_id": "r1"}
+    assert job["status"] == "running"
+    assert job["attempts"] == 1
+    stored = jobs.get_job(job_id, db)
+    assert (stored["status"], stored["worker_id"], stored["attempts"]) == ("running", "w1", 1)
+    assert jobs.queue_position(job_id, db) == 0
+
+
+def test_cancel_only_affects_queued_jobs(db):
+    queued = jobs.enqueue("scan", {}, db_path=db)
+    running = jobs.enqueue("scan", {}, db_path=db)
+    jobs.claim_next("w1", db)  # takes `queued`, the older one
+    assert jobs.cancel_job(queued, db) is False
+    assert jobs.cancel_job(running, db) is True
+    assert jobs.get_job(running, db)["status"] == "cancelled"
+    assert jobs.claim_next("w1", db) is None
+
+
+def test_job_of_live_worker_is_not_requeued(db):
+    jobs._heartbeat("alive", db)
+    job_id = jobs.enqueue("scan", {}, db_path=db)
+    jobs.claim_next("alive", db)
+    assert jobs.requeue_orphaned(db) == 0
+    assert jobs.claim_next("other", db) is None
+    assert jobs.get_job(job_id, db)["worker_id"] == "alive"
+
+
+def test_orphaned_job_is_reclaimed_by_a_running_worker(db):
+    job_id = jobs.enqueue("scan", {}, db_path=db)
+    jobs.claim_next("dead", db)   # "dead" never sends a heartbeat
+    jobs._heartbeat("alive", db)
+    job = jobs.claim_next("alive", db)
+    assert job["job_id"] == job_id
+    assert job["attempts"] == 2
+    assert jobs.get_job(job_id, db)["worker_id"] == "alive"
+
+
+def test_stale_heartbeat_counts_as_dead(db, monkeypatch):
+    jobs._heartbeat("stale", db)
+    job_id = jobs.enqueue("scan", {}, db_path=db)
+    jobs.claim_next("stale", db)
+    monkeypatch.setattr(jobs, "HEARTBEAT_TIMEOUT_S", -1)
+    assert jobs.requeue_orphaned(db) == 1
+    assert jobs.get_job(job_id, db)["status"] == "queued"
+    assert not jobs.worker_alive(db)
+
+
+def test_job_that_keeps_losing_its_worker_fails_after_max_attempts(db):
+    job_id = jobs.enqueue("scan", {}, db_path=db)
+    for attempt in range(1, jobs.MAX_ATTEMPTS + 1):
+        job = jobs.claim_next(f"dead-{attempt}", db)
+        assert job["job_id"] == job_id
+        assert job["attempts"] == attempt
+    assert jobs.claim_next("next", db) is None
+    failed = jobs.get_job(job_id, db)
+    assert failed["status"] == "failed"
+    assert str(jobs.MAX_ATTEMPTS) in failed["error"]
+
+
+def test_run_job_stores_result_or_error(db, monkeypatch):
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "scan", lambda job, report: report({"done": 1}) or {"score": 0.5})
+    ok = jobs.enqueue("scan", {}, db_path=db)
+    jobs.run_job(jobs.claim_next("w1", db), "w1", db)
+    assert jobs.get_job(ok, db)["status"] == "done"
+    assert jobs.get_job(ok, db)["result"] == {"score": 0.5}
+    assert jobs.get_job(ok, db)["progress"] == {"done": 1}
+
+    def boom(job, report):
+        raise RuntimeError("scan exploded")
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "scan", boom)
+    bad = jobs.enqueue("scan", {}, db_path=db)
+    jobs.run_job(jobs.claim_next("w1", db), "w1", db)
+    assert jobs.get_job(bad, db)["status"] == "failed"
+    assert "scan exploded" in jobs.get_job(bad, db)["error"]
+
+
+def test_worker_once_drains_the_queue(db, monkeypatch):
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "scan", lambda job, report: {})
+    for _ in range(3):
+        jobs.enqueue("scan", {}, db_path=db)
+    assert jobs.run_worker(poll_interval=0.01, once=True, db_path=db) == 3
+    assert jobs.queue_depths(db)["interactive"] == {"done": 3}
+    with closing(jobs._connect(db)) as conn:  # the worker deregisters on exit
+        assert [row["worker_id"] for row in conn.execute("SELECT worker_id FROM workers")] == ["w1"]
+
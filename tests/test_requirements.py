@@ -0,0 +1,39 @@
+from internal.cv_scanner import split_requirements, split_sentences
+
+
+def test_split_sentences_drops_short_parts_and_cuts_run_ons():
+    text = "Built data pipelines in Python. Ok. • Led a team of five engineers\nMentored two interns on SQL!"
+    assert split_sentences(text) == [
+        "Built data pipelines in Python.",
+        "Led a team of five engineers",
+        "Mentored two interns on SQL!",
+    ]
+    run_on = " ".join(f"w{i}" for i in range(100))
+    pieces = split_sentences(run_on, max_words=40)
+    assert [len(piece.split()) for piece in pieces] == [40, 40, 20]
+    assert " ".join(pieces) == run_on
+    assert split_sentences("") == []
+
+
+def test_split_requirements_takes_bullets_and_lines():
+    jd = """Job title: Data Scientist
+Requirements:
+- 3+ years of Python experience
+* Strong SQL and data modelling skills
+1. Experience with cloud data warehouses
+2) Experience with cloud data warehouses
+Benefits:"""
+    assert split_requirements(jd) == [
+        "3+ years of Python experience",
+        "Strong SQL and data modelling skills",
+        "Experience with cloud data warehouses",
+    ]
+
+
+def test_split_requirements_of_a_single_paragraph_uses_sentences():
+    jd = "We need a data scientist with strong Python skills. You will build models in SQL and Spark."
+    assert split_requirements(jd) == [
+        "We need a data scientist with strong Python skills.",
+        "You will build models in SQL and Spark.",
+    ]
+    assert split_requirements("") == []
@@ -0,0 +1,93 @@
+import base64
+import json
+import threading
+import pytest
+from services.score_server import MicroBatcher, parse_request
+
+
+def _submit_together(batcher, items):
+    futures = [None] * len(items)
+    barrier = threading.Barrier(len(items))
+
+    def submit(i):
+        barrier.wait()
+        futures[i] = batcher.submit(items[i])
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(items))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return futures
+
+
+def test_micro_batcher_merges_concurrent_requests():
+    batches = []
+    batcher = MicroBatcher(lambda items: batches.append(len(items)) or [x * 2 for x in items], max_batch=8, max_wait_s=0.2)
+    futures = _submit_together(batcher, list(range(8)))
+    results = [f.result(timeout=5) for f in futures]
+    assert [result for result, _ in results] == [x * 2 for x in range(8)]
+    assert sum(batches) == 8
+    assert len(batches) < 8
+    assert sorted(timing["batch_size"] for _, timing in results) == sorted(n for n in batches for _ in range(n))
+
+
+def test_micro_batcher_respects_max_batch():
+    batches = []
+    batcher = MicroBatcher(lambda items: batches.append(len(items)) or list(items), max_batch=3, max_wait_s=0.2)
+    futures = _submit_together(batcher, list(range(10)))
+    assert [f.result(timeout=5)[0] for f in futures] == list(range(10))
+    assert max(batches) <= 3
+    assert sum(batches) == 10
+
+
+def test_micro_batcher_fails_only_the_failing_item():
+    def process(items):
+        return [ValueError(f"bad {x}") if x == 2 else x for x in items]
+
+    batcher = MicroBatcher(process, max_batch=8, max_wait_s=0.2)
+    futures = _submit_together(batcher, [1, 2, 3])
+    by_item = {}
+    for f in futures:
+        try:
+            by_item[f.result(timeout=5)[0]] = "ok"
+        except ValueError as e:
+            by_item[str(e)] = "failed"
+    assert by_item == {1: "ok", 3: "ok", "bad 2": "failed"}
+
+
+def test_micro_batcher_fails_whole_batch_when_process_raises():
+    batcher = MicroBatcher(lambda items: 1 / 0, max_batch=4, max_wait_s=0.0)
+    with pytest.raises(ZeroDivisionError):
+        batcher.submit("x").result(timeout=5)
+
+
+def test_parse_request_json():
+    body = json.dumps({"job_description": "Python developer", "cv_text": "I write Python", "skill_weight": "0.7"}).encode()
+    request = parse_request(body, "application/json", {})
+    assert request["cv_text"] == "I write Python"
+    assert request["skill_weight"] == 0.7
+
+
+def test_parse_request_pdf_base64(monkeypatch):
+    monkeypatch.setattr("services.score_server.extract_pdf_text", lambda data: data.decode())
+    body = json.dumps({"job_description": "jd", "pdf_base64": base64.b64encode(b"cv text").decode()}).encode()
+    assert parse_request(body, "application/json", {})["cv_text"] == "cv text"
+
+
+@pytest.mark.parametrize("payload", [
+    [],
+    "text",
+    {"cv_text": "cv"},
+    {"job_description": 5, "cv_text": "cv"},
+    {"job_description": "jd"},
+    {"job_description": "jd", "cv_text": None},
+    {"job_description": "jd", "cv_text": 123},
+    {"job_description": "jd", "cv_text": "cv", "job_title": ["x"]},
+    {"job_description": "jd", "cv_text": "cv", "skill_weight": "heavy"},
+    {"job_description": "jd", "cv_text": "cv", "experience_weight": [1]},
+    {"job_description": "jd", "pdf_base64": 42},
+])
+def test_parse_request_rejects_bad_input(payload):
+    with pytest.raises(ValueError):
+        parse_request(json.dumps(payload).encode(), "application/json", {})
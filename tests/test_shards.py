@@ -0,0 +1,104 @@
+import json
+import pytest
+from services import shards
+
+
+@pytest.fixture
+def db(tmp_path):
+    return tmp_path / "shards.db"
+
+
+def _submit(db, names, shard_size=2):
+    return shards.submit_scan("Data Scientist", "Python and SQL", names, shard_size=shard_size,
+                              pdf_folder="folder_pdf", db_path=db)
+
+
+def _ranked(*scores):
+    return [(f"folder_pdf/{name}", {"score": score, "scan_status": "scored"}) for name, score in scores]
+
+
+def test_submit_splits_names_into_shards(db):
+    scan_id = _submit(db, [f"cv{i}.pdf" for i in range(5)])
+    assert shards.shard_progress(scan_id, db) == {"queued": 3}
+    claimed = [shards.claim_shard("w1", db_path=db) for _ in range(3)]
+    assert [s["shard_no"] for s in claimed] == [0, 1, 2]
+    assert [s["names"] for s in claimed] == [["cv0.pdf", "cv1.pdf"], ["cv2.pdf", "cv3.pdf"], ["cv4.pdf"]]
+    assert claimed[0]["params"]["job_description"] == "Python and SQL"
+    assert shards.claim_shard("w1", db_path=db) is None
+
+
+def test_submit_without_names_fails(db):
+    with pytest.raises(ValueError):
+        _submit(db, [])
+
+
+def test_leased_shard_is_not_handed_out_twice(db):
+    _submit(db, ["a.pdf"])
+    assert shards.claim_shard("w1", lease_s=60, db_path=db) is not None
+    assert shards.claim_shard("w2", lease_s=60, db_path=db) is None
+    assert shards._outstanding(db) == 1
+
+
+def test_expired_lease_is_reassigned_and_the_old_worker_loses_it(db):
+    scan_id = _submit(db, ["a.pdf"])
+    lost = shards.claim_shard("w1", lease_s=-1, db_path=db)      # lease already expired
+    taken = shards.claim_shard("w2", lease_s=60, db_path=db)
+    assert (taken["scan_id"], taken["shard_no"]) == (lost["scan_id"], lost["shard_no"])
+
+    assert not shards.renew_lease(lost, "w1", db_path=db)
+    assert not shards._finish_shard(lost, "w1", db, status="done", result="[]")
+    assert shards.renew_lease(taken, "w2", db_path=db)
+    assert shards._finish_shard(taken, "w2", db, status="done", result="[]")
+    assert shards.shard_progress(scan_id, db) == {"done": 1}
+    assert shards._outstanding(db) == 0
+
+
+def test_renewed_lease_is_kept(db):
+    _submit(db, ["a.pdf"])
+    shard = shards.claim_shard("w1", lease_s=-1, db_path=db)
+    assert shards.renew_lease(shard, "w1", lease_s=60, db_path=db)
+    assert shards.claim_shard("w2", db_path=db) is None
+
+
+def test_shard_fails_after_max_attempts(db):
+    scan_id = _submit(db, ["a.pdf"])
+    for attempt in range(shards.MAX_ATTEMPTS):
+        assert shards.claim_shard(f"w{attempt}", lease_s=-1, db_path=db) is not None
+    assert shards.claim_shard("last", db_path=db) is None
+    assert shards.shard_progress(scan_id, db) == {"failed": 1}
+
+
+def test_merge_is_a_ranked_k_way_merge_with_failed_shards_last(db, monkeypatch):
+    saved = {}
+    monkeypatch.setattr("services.scanner.result_filename_for", lambda title, n: f"{title}_{n}.parquet")
+    monkeypatch.setattr("services.scanner.save_and_index", lambda results, path, *args: saved.update(results=results, path=path))
+
+    scan_id = _submit(db, ["a.pdf", "b.pdf", "c.pdf", "d.pdf", "e.pdf"])
+    first, second, third = (shards.claim_shard("w1", db_path=db) for _ in range(3))
+    shards._finish_shard(first, "w1", db, status="done", result=json.dumps(_ranked(("a.pdf", 90.0), ("b.pdf", 40.0))))
+    shards._finish_shard(second, "w1", db, status="done", result=json.dumps(_ranked(("c.pdf", 70.0), ("d.pdf", 10.0))))
+    shards._finish_shard(third, "w1", db, status="failed", error="RuntimeError: out of memory\ntraceback")
+
+    results, result_file = shards.merge_scan(scan_id, db)
+    assert [path.split("/")[-1] for path in results] == ["a.pdf", "c.pdf", "b.pdf", "d.pdf", "e.pdf"]
+    assert results["folder_pdf/e.pdf"]["scan_status"] == "unscored"
+    assert results["folder_pdf/e.pdf"]["error"] == "Shard failed: RuntimeError: out of memory"
+    assert result_file == "Data Scientist_5.parquet"
+    assert saved["results"] == results
+
+
+def test_worker_once_scores_every_shard(db, monkeypatch):
+    monkeypatch.setattr(shards, "run_shard", lambda shard: _ranked(*[(name, 1.0) for name in shard["names"]]))
+    scan_id = _submit(db, [f"cv{i}.pdf" for i in range(5)])
+    assert shards.run_worker(poll_interval=0.01, once=True, db_path=db) == 3
+    assert shards.shard_progress(scan_id, db) == {"done": 3}
+
+
+def test_worker_marks_a_crashing_shard_failed(db, monkeypatch):
+    def boom(shard):
+        raise RuntimeError("bad pdf")
+
+    monkeypatch.setattr(shards, "run_shard", boom)
+    scan_id = _submit(db, ["a.pdf"])
+    assert shards.run_worker(poll_interval=0.01, once=True, db_path=db) == 0
+    assert shards.shard_progress(scan_id, db) == {"failed": 1}
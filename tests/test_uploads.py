@@ -0,0 +1,84 @@
+import csv
+import io
+import sqlite3
+import zipfile
+from contextlib import closing
+from pathlib import Path
+import pymupdf
+import pytest
+from services.uploads import ingest_batch
+
+RESUME = " ".join(f"Led project {i} building Python and SQL data pipelines for team {i % 7}." for i in range(60))
+
+
+def _pdf(text: str) -> bytes:
+    doc = pymupdf.open()
+    doc.new_page().insert_textbox(pymupdf.Rect(40, 40, 560, 800), text, fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _upload(name: str, data: bytes) -> io.BytesIO:
+    f = io.BytesIO(data)
+    f.name = name
+    return f
+
+
+def _count(db: str, table: str) -> int:
+    with closing(sqlite3.connect(db)) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # blob store, dedup db, text cache and records.csv all live under relative paths
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("utils.cache_utils.TEXT_CACHE_DIR", tmp_path / ".cache" / "text")
+    return tmp_path
+
+
+def test_batch_is_recorded_once_per_file():
+    data = _pdf(RESUME)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("nested/other.pdf", _pdf("Registered nurse with ten years of intensive care experience. " * 20))
+        zf.writestr("notes.txt", "not a pdf")
+    archive.seek(0)
+    archive.name = "more.zip"
+
+    ingested = ingest_batch([_upload("cv.pdf", data), archive], "Data Scientist", "Python and SQL", 0.6, 0.4)
+    assert [item["original_name"] for item in ingested] == ["cv.pdf", "other.pdf"]
+    assert [item["match"] for item in ingested] == [None, None]
+    assert _count("data/blobs.db", "manifest") == 2
+    assert _count("data/dedup.db", "documents") == 2
+    with open("data/records.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["name pdf"] for row in rows] == [item["filename"] for item in ingested]
+    assert {row["job_title"] for row in rows} == {"Data Scientist"}
+
+
+def test_duplicates_within_a_batch_are_detected_before_it_is_registered():
+    data = _pdf(RESUME)
+    edited = _pdf(RESUME.replace("project 3 ", "project three "))
+    first, copy, near = ingest_batch(
+        [_upload("a.pdf", data), _upload("b.pdf", data), _upload("c.pdf", edited)], "Data Scientist", "jd", 0.5, 0.5
+    )
+    assert copy["match"] == "exact"
+    assert copy["filename"] == first["filename"]
+    assert copy["duplicate_of"] == first["record_id"]
+    assert near["match"] == "near"
+    assert near["duplicate_of"] == first["record_id"]
+    assert near["filename"] != first["filename"]
+    # the exact copy shares the original's blob
+    assert _count("data/dedup.db", "documents") == 3
+    assert len(list(Path("folder_pdf").rglob("*.pdf"))) == 2
+
+
+def test_reupload_in_a_later_batch_reuses_the_stored_pdf():
+    data = _pdf(RESUME)
+    (original,) = ingest_batch([_upload("cv.pdf", data)], "Data Scientist", "jd", 0.5, 0.5)
+    (again,) = ingest_batch([_upload("cv_copy.pdf", data)], "Data Scientist", "jd", 0.5, 0.5)
+    assert again["match"] == "exact"
+    assert again["filename"] == original["filename"]
+    assert again["sha256"] == original["sha256"]
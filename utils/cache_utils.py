@@ -0,0 +1,115 @@
+import copy
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+# Module-level LRU of parsed files, keyed by (path, loader) and validated
+# against the file's (mtime_ns, size) on every lookup.
+MAX_ENTRIES = 64
+
+_cache: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], Any]]" = OrderedDict()
+_lock = threading.Lock()
+_stats: Dict[str, int] = {"hits": 0, "misses": 0, "text_hits": 0, "text_misses": 0}
+
+# Extracted PDF text, keyed by the PDF's content hash so renamed or
+# re-uploaded copies of the same file are parsed only once. ADS_TEXT_CACHE_DIR
+# moves it (inherited by parse workers), e.g. for cold-cache benchmarks.
+TEXT_CACHE_DIR = Path(os.environ.get("ADS_TEXT_CACHE_DIR", ".cache/text"))
+
+
+def file_signature(path: Union[str, Path]) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_cached(path: Union[str, Path], loader: Callable[[Path], Any]) -> Any:
+    """
+    Return `loader(path)`, re-running it only when the file changed since
+    the last call. Callers get a copy, so mutating the result is safe.
+    """
+    path = Path(path)
+    key = (str(path.resolve()), f"{loader.__module__}.{loader.__qualname__}")
+    signature = file_signature(path)
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and signature is not None and entry[0] == signature:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return copy.deepcopy(entry[1])
+        _stats["misses"] += 1
+
+    value = loader(path)
+
+    if signature is not None:
+        with _lock:
+            _cache[key] = (signature, value)
+            _cache.move_to_end(key)
+            while len(_cache) > MAX_ENTRIES:
+                _cache.popitem(last=False)
+    return copy.deepcopy(value)
+
+
+def invalidate(path: Optional[Union[str, Path]] = None):
+    """Forget cached parses of `path` (or of every file when omitted)."""
+    with _lock:
+        if path is None:
+            _cache.clear()
+            return
+        resolved = str(Path(path).resolve())
+        for key in [k for k in _cache if k[0] == resolved]:
+            del _cache[key]
+
+
+def cache_stats() -> Dict[str, int]:
+    with _lock:
+        return {**_stats, "entries": len(_cache)}
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_sha256(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_text(sha256: str, text: str):
+    """Remember the extracted text of a PDF with content hash `sha256`."""
+    if not text:
+        return
+    TEXT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    target = TEXT_CACHE_DIR / f"{sha256}.txt"
+    # unique per thread: sessions in one process may cache the same text at once
+    tmp_path = target.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, target)
+
+
+def cached_text(path: Union[str, Path], extract: Callable[[Path], str]) -> str:
+    """`extract(path)`, skipped when a file with the same content was extracted before."""
+    try:
+        sha256 = file_sha256(path)
+    except OSError:
+        return extract(Path(path))
+    target = TEXT_CACHE_DIR / f"{sha256}.txt"
+    if target.exists():
+        with _lock:
+            _stats["text_hits"] += 1
+        return target.read_text(encoding="utf-8")
+    with _lock:
+        _stats["text_misses"] += 1
+    text = extract(Path(path))
+    store_text(sha256, text)
+    return text
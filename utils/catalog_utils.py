@@ -0,0 +1,41 @@
+from typing import Dict, Optional
+import streamlit as st
+from services.catalog import (
+    is_synced, sync_directory, list_runs, list_job_titles, runs_for_candidate, run_label,
+)
+
+def select_run(kind: str) -> Optional[Dict]:
+    """
+    Catalog-backed run picker: filter by job title or candidate name and
+    return the selected run (or None when nothing matches).
+    """
+    # first use: index whatever is already on disk
+    if not is_synced(kind):
+        sync_directory(kind)
+
+    filter_cols = st.columns([3, 3, 1])
+    titles = list_job_titles(kind)
+    title = filter_cols[0].selectbox("Job title", ["All"] + titles, key=f"{kind}_title_filter")
+    candidate = filter_cols[1].text_input("Candidate (PDF name contains)", key=f"{kind}_candidate_filter")
+    if filter_cols[2].button("🔄 Re-index", key=f"{kind}_reindex"):
+        added = sync_directory(kind)
+        st.toast(f"Indexed {added} new result files.")
+
+    if candidate.strip():
+        runs = runs_for_candidate(candidate.strip(), kind=kind)
+        if title != "All":
+            runs = [r for r in runs if r["job_title"] == title]
+        if runs:
+            st.markdown(f"**History for '{candidate.strip()}':**")
+            st.dataframe(
+                [{"run": run_label(r), "candidate": r["candidate"], "score": r["score"]} for r in runs],
+                hide_index=True,
+            )
+        # one entry per run even if several PDFs matched
+        runs = list({r["run_id"]: r for r in runs}.values())
+    else:
+        runs = list_runs(kind, job_title=None if title == "All" else title)
+
+    if not runs:
+        return None
+    return st.selectbox("Select a run:", runs, format_func=run_label, key=f"{kind}_run_select")
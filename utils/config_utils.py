@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+import yaml
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple, Union
+from utils.cache_utils import file_signature, load_cached, invalidate
+
+CONFIG_PATH = Path(__file__).parent.parent / "config.yaml"
+
+def _read_yaml(path: Path) -> dict:
+    with path.open('r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+# Load YAML configuration from a file (cached until the file changes)
+def load_config(path: Union[str, Path] = CONFIG_PATH) -> dict:
+    return load_cached(path, _read_yaml)
+
+# Persist configuration to a file (write-then-rename, so readers never see a partial file)
+def save_config(path: Union[str, Path], config: dict):
+    path = Path(path)
+    # unique per call: two config-page sessions may save at once
+    tmp_path = path.with_suffix(f".{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with tmp_path.open('w', encoding='utf-8') as f:
+            yaml.dump(config, f, default_flow_style=False)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    invalidate(path)
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Immutable view of config.yaml as of one file version."""
+    version: str
+    values: Mapping[str, Any] = field(repr=False)
+    signature: Optional[Tuple[int, int]] = field(default=None, repr=False, compare=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.values.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.values[key]
+
+
+_snapshots: dict = {}
+_snapshot_lock = threading.Lock()
+
+
+def config_snapshot(path: Union[str, Path] = CONFIG_PATH) -> ConfigSnapshot:
+    """
+    Latest snapshot of `path`, re-read only when its (mtime, size) changed.
+    Take one snapshot per scan and pass it along; a save in the middle of a
+    scan then only affects the next one.
+    """
+    key = str(Path(path).resolve())
+    signature = file_signature(path)
+    with _snapshot_lock:
+        current = _snapshots.get(key)
+        if current is not None and current.signature == signature:
+            return current
+
+    values = _read_yaml(Path(path))
+    digest = hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:10]
+    snapshot = ConfigSnapshot(version=digest, values=MappingProxyType(values), signature=signature)
+    with _snapshot_lock:
+        _snapshots[key] = snapshot
+    return snapshot
@@ -0,0 +1,93 @@
+import os
+import threading
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Optional, Union
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.cache_utils import load_cached
+
+# Columnar copy of a large CSV dataset, split into small row groups so a page
+# of rows can be read without touching the rest of the file.
+CACHE_DIR = Path(".cache/datasets")
+ROW_GROUP_SIZE = 100
+INDEX_COLUMNS = ["ID", "Category"]
+
+
+def columnar_path(source: Union[str, Path]) -> Path:
+    return CACHE_DIR / f"{Path(source).stem}.parquet"
+
+
+def ensure_columnar(source: Union[str, Path], row_group_size: int = ROW_GROUP_SIZE) -> Path:
+    """
+    Convert `source` CSV to Parquet once (again only when the CSV changes),
+    streaming it in row-group sized chunks. Every column is stored as a
+    string, so chunks that are all-empty or look numeric in one column keep
+    the same schema. Returns the Parquet path.
+    """
+    source = Path(source)
+    target = columnar_path(source)
+    if target.exists() and target.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+        return target
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    schema = pa.schema([(name, pa.string()) for name in pd.read_csv(source, nrows=0).columns])
+    # unique per writer: two sessions may convert the same dataset at once
+    tmp_path = target.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    rows = 0
+    try:
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for chunk in pd.read_csv(source, dtype=str, chunksize=row_group_size):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False), row_group_size=row_group_size)
+                rows += len(chunk)
+        if not rows:
+            raise ValueError(f"Dataset '{source}' is empty")
+        os.replace(tmp_path, target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return target
+
+
+def _read_index(path: Path) -> pd.DataFrame:
+    available = set(pq.read_schema(path).names)
+    df = pq.read_table(path, columns=[c for c in INDEX_COLUMNS if c in available]).to_pandas()
+    df.insert(0, "row", range(len(df)))
+    return df
+
+
+def load_index(path: Union[str, Path]) -> pd.DataFrame:
+    """Row number plus the small lookup columns (ID, Category), cached per file version."""
+    return load_cached(path, _read_index)
+
+
+def read_rows(path: Union[str, Path], rows: List[int], columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read only the row groups holding `rows`, and only `columns`."""
+    pf = pq.ParquetFile(path)
+    if columns is not None:
+        available = set(pf.schema_arrow.names)
+        columns = [c for c in columns if c in available]
+
+    # starting row of each row group
+    starts = []
+    offset = 0
+    for i in range(pf.num_row_groups):
+        starts.append(offset)
+        offset += pf.metadata.row_group(i).num_rows
+
+    groups = sorted({bisect_right(starts, r) - 1 for r in rows})
+    if not groups:
+        return pd.DataFrame(columns=columns or pf.schema_arrow.names)
+    table = pf.read_row_groups(groups, columns=columns)
+
+    # map global row numbers to positions inside the concatenated groups
+    local = {}
+    pos = 0
+    for g in groups:
+        n = pf.metadata.row_group(g).num_rows
+        for k in range(n):
+            local[starts[g] + k] = pos + k
+        pos += n
+    df = table.take(pa.array([local[r] for r in rows])).to_pandas()
+    df.index = rows
+    return df
@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from utils.config_utils import load_config
+
+# Process metrics in Prometheus text format (version 0.0.4). Counters,
+# gauges and histograms live in this module; cache, queue and governor
+# figures are pulled at export time from collectors their modules
+# register. Exported on http://127.0.0.1:<metrics_port>/metrics and/or
+# written to `metrics_file` (for a node_exporter textfile collector), as
+# set in config.yaml.
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# name -> (type, help, buckets)
+METRICS: Dict[str, Tuple[str, str, Optional[Tuple[float, ...]]]] = {
+    "ads_scan_seconds": ("histogram", "Wall time of one scan run (all CVs of the run).", LATENCY_BUCKETS),
+    "ads_cv_scan_seconds": ("histogram", "Wall time to score one CV, parsing included.", LATENCY_BUCKETS),
+    "ads_scan_stage_seconds": ("histogram", "Wall time of one scan stage for one CV.", LATENCY_BUCKETS),
+    "ads_evaluation_seconds": ("histogram", "Wall time of one resume evaluation.", LATENCY_BUCKETS),
+    "ads_pdfs_scanned_total": ("counter", "CVs scored.", None),
+    "ads_scans_total": ("counter", "Scan runs finished.", None),
+    "ads_evaluations_total": ("counter", "Resume evaluations, by source (gemini or cache).", None),
+    "ads_scan_pdfs_per_second": ("gauge", "Throughput of the most recent scan run.", None),
+    "ads_model_load_seconds": ("gauge", "Time taken to load each model in this process.", None),
+}
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Tuple], float] = {}
+_gauges: Dict[Tuple[str, Tuple], float] = {}
+_histograms: Dict[Tuple[str, Tuple], List] = {}     # [bucket counts..., sum, count]
+_collectors: List[Callable[[], List[Tuple[str, str, str, Dict[str, str], float]]]] = []
+_exporter_started = False
+
+
+def _key(name: str, labels: Dict[str, str]) -> Tuple[str, Tuple]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, amount: float = 1.0, **labels):
+    with _lock:
+        key = _key(name, labels)
+        _counters[key] = _counters.get(key, 0.0) + amount
+
+
+def set_gauge(name: str, value: float, **labels):
+    with _lock:
+        _gauges[_key(name, labels)] = float(value)
+
+
+def observe(name: str, value: float, **labels):
+    """Add one observation to histogram `name` (declared in METRICS)."""
+    buckets = METRICS[name][2]
+    with _lock:
+        entry = _histograms.setdefault(_key(name, labels), [0] * len(buckets) + [0.0, 0])
+        idx = bisect_left(buckets, value)
+        if idx < len(buckets):
+            entry[idx] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+
+@contextmanager
+def timed(name: str, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def register_collector(collector: Callable[[], List[Tuple[str, str, str, Dict[str, str], float]]]):
+    """
+    Add a callable run at export time; it returns (name, type, help, labels,
+    value) samples for figures owned elsewhere (caches, queues).
+    """
+    with _lock:
+        if collector not in _collectors:
+            _collectors.append(collector)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels) -> str:
+    items = labels.items() if isinstance(labels, dict) else labels
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _cache_samples() -> List[Tuple[str, str, str, Dict[str, str], float]]:
+    """Hit ratios of the parsed-file and extracted-text caches."""
+    from utils.cache_utils import cache_stats
+
+    stats = cache_stats()
+    samples = cache_samples("file", stats["hits"], stats["misses"]) + cache_samples("text", stats["text_hits"], stats["text_misses"])
+    samples.append(("ads_cache_entries", "gauge", "Entries held in memory.", {"cache": "file"}, stats["entries"]))
+    return samples
+
+
+def cache_samples(cache: str, hits: int, misses: int) -> List[Tuple[str, str, str, Dict[str, str], float]]:
+    """Collector samples for one cache: hit and miss counters plus the hit ratio."""
+    lookups = hits + misses
+    return [
+        ("ads_cache_hits_total", "counter", "Cache hits.", {"cache": cache}, hits),
+        ("ads_cache_misses_total", "counter", "Cache misses.", {"cache": cache}, misses),
+        ("ads_cache_hit_ratio", "gauge", "Hits over lookups since process start.", {"cache": cache},
+         hits / lookups if lookups else 0.0),
+    ]
+
+
+def render_prometheus() -> str:
+    """All metrics of this process in Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = {k: list(v) for k, v in _histograms.items()}
+        collectors = list(_collectors)
+
+    samples: List[Tuple[str, str, str, Dict[str, str], float]] = []
+    for collect in [_cache_samples] + collectors:
+        try:
+            samples.extend(collect())
+        except Exception as e:
+            print(f"Warning: metrics collector {getattr(collect, '__name__', collect)} failed: {e}")
+
+    families: Dict[str, Dict] = {}
+
+    def family(name: str, kind: str, help_text: str) -> List[str]:
+        return families.setdefault(name, {"type": kind, "help": help_text, "lines": []})["lines"]
+
+    for (name, labels), value in sorted(counters.items()):
+        family(name, "counter", METRICS.get(name, ("", name))[1]).append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+    for (name, labels), value in sorted(gauges.items()):
+        family(name, "gauge", METRICS.get(name, ("", name))[1]).append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+    for (name, labels), entry in sorted(histograms.items()):
+        lines = family(name, "histogram", METRICS[name][1])
+        cumulative = 0
+        for bound, count in zip(METRICS[name][2] + (float("inf"),), entry[:-2] + [entry[-1] - sum(entry[:-2])]):
+            cumulative += count
+            lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', _fmt_value(bound)),))} {cumulative}")
+        lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_value(entry[-2])}")
+        lines.append(f"{name}_count{_fmt_labels(labels)} {entry[-1]}")
+    for name, kind, help_text, labels, value in samples:
+        family(name, kind, help_text).append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+
+    out = []
+    for name, fam in families.items():
+        out.append(f"# HELP {name} {fam['help']}")
+        out.append(f"# TYPE {name} {fam['type']}")
+        out.extend(fam["lines"])
+    return "\n".join(out) + "\n"
+
+
+def write_metrics(path: Union[str, Path]):
+    """Write the current metrics to `path` atomically (textfile collector style)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(render_prometheus(), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_exporter(port: Optional[int] = None, file: Optional[str] = None, interval_s: Optional[float] = None):
+    """
+    Start the configured exporters once per process: the HTTP endpoint on
+    `metrics_port` (0 = off) and a thread rewriting `metrics_file` every
+    `metrics_file_interval_s` seconds ("" = off). Arguments override config.
+    """
+    global _exporter_started
+    cfg = load_config()
+    port = int(cfg.get("metrics_port", 0) or 0) if port is None else port
+    file = (cfg.get("metrics_file") or "") if file is None else file
+    interval_s = float(cfg.get("metrics_file_interval_s", 15) or 15) if interval_s is None else interval_s
+    with _lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+    if port:
+        try:
+            serve_metrics(port)
+            print(f"Info: Serving metrics on http://127.0.0.1:{port}/metrics")
+        except OSError as e:
+            print(f"Warning: metrics endpoint not started on port {port}: {e}")
+    if file:
+        def write_loop():
+            while True:
+                try:
+                    write_metrics(file)
+                except OSError as e:
+                    print(f"Warning: could not write metrics to '{file}': {e}")
+                time.sleep(interval_s)
+
+        threading.Thread(target=write_loop, name="metrics-file", daemon=True).start()
@@ -1,6 +1,14 @@
-import os, base64, urllib.request
+import os, base64, hashlib, urllib.request, uuid
+from pathlib import Path
+from typing import Optional
+import pymupdf
 import streamlit as st
 
+# On-disk cache of first-page thumbnails, bounded by total size (LRU by mtime)
+THUMBNAIL_DIR = Path(".cache/thumbnails")
+THUMBNAIL_CACHE_MAX_BYTES = 200 * 1024 * 1024
+THUMBNAIL_WIDTH = 300
+
 def show_pdf(path_or_url: str, width='100%', height='800'):
     """Embed a PDF from a URL or local path into an iframe."""
     try:
@@ -24,3 +32,88 @@ def show_pdf(path_or_url: str, width='100%', height='800'):
             width="{width}" height="{height}" style="border:none;"></iframe>
     '''
     st.markdown(iframe, unsafe_allow_html=True)
+
+
+def _thumbnail_key(abs_path: str, width: int) -> str:
+    stat = os.stat(abs_path)
+    raw = f"{abs_path}|{stat.st_mtime_ns}|{stat.st_size}|{width}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _evict_thumbnails(max_bytes: int = THUMBNAIL_CACHE_MAX_BYTES):
+    """Drop least recently used thumbnails until the cache fits in `max_bytes`."""
+    entries = []
+    total = 0
+    for p in THUMBNAIL_DIR.glob("*.png"):
+        try:
+            stat = p.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, p))
+        total += stat.st_size
+    if total <= max_bytes:
+        return
+    for _, size, p in sorted(entries):
+        try:
+            p.unlink()
+        except OSError:
+            continue
+        total -= size
+        if total <= max_bytes:
+            break
+
+
+def render_thumbnail(pdf_path: str, width: int = THUMBNAIL_WIDTH) -> Optional[Path]:
+    """
+    Render the first page of `pdf_path` to a PNG in the thumbnail cache.
+    Returns the cached PNG path, or None if the PDF cannot be rendered.
+    """
+    abs_path = os.path.abspath(pdf_path)
+    if not os.path.exists(abs_path):
+        return None
+
+    THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
+    thumb_path = THUMBNAIL_DIR / f"{_thumbnail_key(abs_path, width)}.png"
+    if thumb_path.exists():
+        # touch so eviction treats it as recently used
+        os.utime(thumb_path, None)
+        return thumb_path
+
+    try:
+        doc = pymupdf.open(abs_path)
+        try:
+            if len(doc) == 0:
+                return None
+            page = doc.load_page(0)
+            zoom = width / page.rect.width if page.rect.width else 1.0
+            pix = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+        finally:
+            doc.close()
+        # unique per call: sessions and processes may render the same thumbnail at once
+        tmp_path = thumb_path.with_suffix(f".{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            pix.save(str(tmp_path), output="png")
+            os.replace(tmp_path, thumb_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    except Exception as e:
+        print(f"Error rendering thumbnail for '{pdf_path}': {e}")
+        return None
+
+    _evict_thumbnails()
+    return thumb_path
+
+
+def show_pdf_preview(pdf_path: str, key: str, width: int = THUMBNAIL_WIDTH):
+    """
+    Show a cached first-page thumbnail; the full PDF is only embedded
+    once the user explicitly asks for it.
+    """
+    thumb = render_thumbnail(pdf_path, width=width)
+    if thumb is not None:
+        st.image(str(thumb), width=width)
+    else:
+        st.warning("Preview not available for this PDF.")
+
+    if st.toggle("Open full PDF", key=f"open_pdf_{key}"):
+        show_pdf(pdf_path)
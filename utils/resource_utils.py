@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from utils.config_utils import load_config
+from utils import metrics_utils
+
+# CPU resource governor: thread limits for torch / HF tokenizers, the size
+# of the PDF parsing process pool, and a process-wide cap on concurrent
+# scans (excess scans block until a slot frees; which waiting scan gets
+# it is up to the semaphore, not arrival order). All limits come from
+# config.yaml; 0 means "leave the library default".
+
+_lock = threading.Lock()
+_applied: Dict[str, int] = {}
+_slots: Optional[threading.Semaphore] = None
+_slots_size = 0
+_state = {"active": 0, "waiting": 0, "completed": 0, "wait_s_total": 0.0, "busy_since": None, "busy_s": 0.0}
+_started = time.monotonic()
+_cpu_started = time.process_time()
+
+
+def governor_settings() -> Dict[str, int]:
+    cfg = load_config()
+    return {
+        "torch_intra_op_threads": int(cfg.get("torch_intra_op_threads", 0) or 0),
+        "torch_inter_op_threads": int(cfg.get("torch_inter_op_threads", 0) or 0),
+        "tokenizers_parallelism": bool(cfg.get("tokenizers_parallelism", False)),
+        "parse_workers": int(cfg.get("parse_workers", 0) or 0),
+        "max_concurrent_scans": int(cfg.get("max_concurrent_scans", 1) or 0),
+    }
+
+
+def apply_thread_limits():
+    """
+    Apply torch/tokenizer thread settings once per process, before models
+    load. torch only accepts the inter-op count before its first parallel op.
+    """
+    import torch
+
+    settings = governor_settings()
+    with _lock:
+        os.environ["TOKENIZERS_PARALLELISM"] = "true" if settings["tokenizers_parallelism"] else "false"
+        intra = settings["torch_intra_op_threads"]
+        if intra > 0 and _applied.get("intra") != intra:
+            torch.set_num_threads(intra)
+            _applied["intra"] = intra
+        inter = settings["torch_inter_op_threads"]
+        if inter > 0 and "inter" not in _applied:
+            try:
+                torch.set_num_interop_threads(inter)
+                _applied["inter"] = inter
+            except RuntimeError as e:
+                print(f"Warning: torch inter-op threads already fixed ({e})")
+                _applied["inter"] = torch.get_num_interop_threads()
+
+
+def parse_workers() -> int:
+    """Processes used to extract PDF text (<= 1 means parse in the scanning thread)."""
+    return governor_settings()["parse_workers"]
+
+
+def _semaphore() -> Optional[threading.Semaphore]:
+    global _slots, _slots_size
+    size = governor_settings()["max_concurrent_scans"]
+    with _lock:
+        if size <= 0:
+            return None
+        if _slots is None or size != _slots_size:
+            # a resized cap applies to scans that start after the change
+            _slots, _slots_size = threading.Semaphore(size), size
+        return _slots
+
+
+@contextmanager
+def scan_slot():
+    """Hold one of `max_concurrent_scans` slots for the duration of a scan."""
+    slots = _semaphore()
+    with _lock:
+        _state["waiting"] += 1
+    wait0 = time.monotonic()
+    if slots is not None:
+        slots.acquire()
+    with _lock:
+        _state["waiting"] -= 1
+        _state["wait_s_total"] += time.monotonic() - wait0
+        if _state["active"] == 0:
+            _state["busy_since"] = time.monotonic()
+        _state["active"] += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _state["active"] -= 1
+            _state["completed"] += 1
+            if _state["active"] == 0 and _state["busy_since"] is not None:
+                _state["busy_s"] += time.monotonic() - _state["busy_since"]
+                _state["busy_since"] = None
+        if slots is not None:
+            slots.release()
+
+
+def _scan_slot_metrics():
+    with _lock:
+        state = dict(_state)
+    return [
+        ("ads_scans_active", "gauge", "Scans holding a scan slot.", {}, state["active"]),
+        ("ads_scans_waiting", "gauge", "Scans waiting for a scan slot.", {}, state["waiting"]),
+        ("ads_scan_slot_wait_seconds_total", "counter", "Time scans spent waiting for a slot.", {}, state["wait_s_total"]),
+    ]
+
+
+metrics_utils.register_collector(_scan_slot_metrics)
+
+
+def utilization() -> Dict:
+    """Current governor limits plus scan slot usage and CPU load of this process."""
+    import torch
+
+    with _lock:
+        state = dict(_state)
+    uptime = time.monotonic() - _started
+    busy = state["busy_s"] + (time.monotonic() - state["busy_since"] if state["busy_since"] else 0.0)
+    cpus = os.cpu_count() or 1
+    try:
+        load1, load5, _ = os.getloadavg()
+    except OSError:
+        load1 = load5 = None
+    return {
+        **governor_settings(),
+        "torch_threads": torch.get_num_threads(),
+        "torch_interop_threads": torch.get_num_interop_threads(),
+        "active_scans": state["active"],
+        "waiting_scans": state["waiting"],
+        "completed_scans": state["completed"],
+        "mean_wait_s": state["wait_s_total"] / state["completed"] if state["completed"] else 0.0,
+        "scan_busy_share": busy / uptime if uptime > 0 else 0.0,
+        "process_cpu_share": (time.process_time() - _cpu_started) / (uptime * cpus) if uptime > 0 else 0.0,
+        "cpu_count": cpus,
+        "load_avg_1m": load1,
+        "load_avg_5m": load5,
+    }
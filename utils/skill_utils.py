@@ -2,6 +2,7 @@ from pathlib import Path
 import csv
 from typing import Dict, List, Tuple
 import sys
+from utils.cache_utils import load_cached
 
 skills_file_path: Path = Path("data/list_skills.csv")
 
@@ -15,9 +16,12 @@ def normalize_text(txt: str) -> str:
 def load_job_titles() -> List[Tuple[int, str]]:
     if not skills_file_path.exists():
         raise FileNotFoundError(f"Skills file not found: {skills_file_path}")
+    return load_cached(skills_file_path, _read_job_titles)
 
+
+def _read_job_titles(path: Path) -> List[Tuple[int, str]]:
     titles: List[Tuple[int, str]] = []
-    with skills_file_path.open("r", encoding="utf-8") as f:
+    with path.open("r", encoding="utf-8") as f:
         reader = csv.DictReader(f)  
         for idx, row in enumerate(reader):
             status = row.get('status', '').strip().lower()
@@ -32,9 +36,12 @@ def load_job_titles() -> List[Tuple[int, str]]:
 def load_skills() -> Dict[str, List[str]]:
     if not skills_file_path.exists():
         raise FileNotFoundError(f"Skills file not found: {skills_file_path}")
+    return load_cached(skills_file_path, _read_skills)
+
 
+def _read_skills(path: Path) -> Dict[str, List[str]]:
     job_skills: Dict[str, List[str]] = {}
-    with skills_file_path.open("r", encoding="utf-8") as f:
+    with path.open("r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
             status = row.get('status', '').strip().lower()
@@ -56,6 +63,6 @@ def load_skills() -> Dict[str, List[str]]:
             job_skills[title] = sorted(set(skills))
 
     if not job_skills:
-        print(f"Warning: no active skills loaded from '{skills_file_path}'", file=sys.stderr)
+        print(f"Warning: no active skills loaded from '{path}'", file=sys.stderr)
 
     return job_skills
@@ -0,0 +1,131 @@
+import cProfile
+import importlib.util
+import io
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Union
+import streamlit as st
+
+# Per-stage wall/CPU timers for the scan pipeline. CPU time is process CPU,
+# so it includes torch/tokenizer worker threads used by a stage.
+
+# pyinstrument is optional; it is only offered when installed
+PROFILERS = ("cprofile", "pyinstrument") if importlib.util.find_spec("pyinstrument") else ("cprofile",)
+
+class StageTimer:
+    def __init__(self):
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def add(self, name: str, wall: float, cpu: float):
+        entry = self.timings.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+        entry["wall"] += wall
+        entry["cpu"] += cpu
+
+    @contextmanager
+    def stage(self, name: str):
+        wall0 = time.perf_counter()
+        cpu0 = time.process_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall0, time.process_time() - cpu0)
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize_timings(per_cv_timings: Iterable[Optional[Dict[str, Dict[str, float]]]]) -> Dict[str, Dict[str, float]]:
+    """
+    Aggregate per-CV `details['timings']` dicts into a per-stage summary:
+    total/mean/p95 wall seconds, total CPU seconds and share of wall time.
+    """
+    walls: Dict[str, list] = {}
+    cpus: Dict[str, float] = {}
+    for timings in per_cv_timings:
+        for name, t in (timings or {}).items():
+            walls.setdefault(name, []).append(t.get("wall") or 0.0)
+            cpus[name] = cpus.get(name, 0.0) + (t.get("cpu") or 0.0)
+
+    grand_total = sum(sum(v) for v in walls.values())
+    summary = {}
+    for name, values in sorted(walls.items(), key=lambda kv: -sum(kv[1])):
+        values = sorted(values)
+        total = sum(values)
+        summary[name] = {
+            "cvs": len(values),
+            "wall_total_s": total,
+            "wall_mean_ms": total / len(values) * 1000,
+            "wall_p95_ms": _percentile(values, 0.95) * 1000,
+            "cpu_total_s": cpus[name],
+            "share": total / grand_total if grand_total else 0.0,
+        }
+    return summary
+
+
+def profile_call(fn: Callable, report_path: Union[str, Path], profiler: str = "cprofile", **kwargs):
+    """
+    Run `fn(**kwargs)` under cProfile or pyinstrument and write a
+    text report to `report_path` (cProfile also keeps the raw .prof file).
+    Falls back to cProfile when pyinstrument is not installed.
+    """
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if profiler == "pyinstrument" and profiler not in PROFILERS:
+        print("Warning: pyinstrument is not installed, profiling with cProfile instead.", file=sys.stderr)
+        profiler = "cprofile"
+    if profiler == "pyinstrument":
+        from pyinstrument import Profiler  # optional dependency
+        prof = Profiler()
+        prof.start()
+        try:
+            return fn(**kwargs)
+        finally:
+            prof.stop()
+            report_path.write_text(prof.output_text(unicode=True, color=False), encoding="utf-8")
+            report_path.with_suffix(".html").write_text(prof.output_html(), encoding="utf-8")
+
+    prof = cProfile.Profile()
+    try:
+        return prof.runcall(fn, **kwargs)
+    finally:
+        prof.dump_stats(str(report_path.with_suffix(".prof")))
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(40)
+        report_path.write_text(buf.getvalue(), encoding="utf-8")
+
+
+def render_performance_panel(per_cv_timings: Iterable[Optional[Dict[str, Dict[str, float]]]], report_path: Optional[Union[str, Path]] = None):
+    """Collapsible per-stage timing table (plus profiler report, if one was written)."""
+    summary = summarize_timings(per_cv_timings)
+    with st.expander("⏱ Performance", expanded=False):
+        if not summary:
+            st.info("No timing data recorded for this scan.")
+        else:
+            st.dataframe(
+                [
+                    {
+                        "stage": name,
+                        "CVs": s["cvs"],
+                        "wall total (s)": round(s["wall_total_s"], 3),
+                        "wall mean (ms)": round(s["wall_mean_ms"], 1),
+                        "wall p95 (ms)": round(s["wall_p95_ms"], 1),
+                        "CPU total (s)": round(s["cpu_total_s"], 3),
+                        "share": f"{s['share']:.0%}",
+                    }
+                    for name, s in summary.items()
+                ],
+                hide_index=True,
+            )
+        if report_path is not None and Path(report_path).exists():
+            st.markdown(f"**Profiler report:** `{report_path}`")
+            st.code(Path(report_path).read_text(encoding="utf-8")[:20000])